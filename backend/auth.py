@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -26,6 +26,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(
 )
 JWT_EXPIRE_MINUTES = ACCESS_TOKEN_EXPIRE_MINUTES  # alias for code that still expects the old name
 
+# Stream tokens travel in URLs (EventSource cannot send headers), so they
+# only open a stream and expire quickly; open streams outlive them.
+STREAM_TOKEN_SCOPE = "stream"
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.environ.get("STREAM_TOKEN_EXPIRE_SECONDS", "60"))
+
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -67,17 +72,30 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> dict:
-    """Verify JWT token and return payload."""
+def create_stream_token(user_id: str) -> str:
+    """Create a short-lived token that only authenticates streaming endpoints."""
+    return create_access_token(
+        {"sub": user_id, "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS)
+    )
+
+def verify_token(token: str, scope: Optional[str] = None) -> dict:
+    """Verify JWT token and return payload.
+
+    Access tokens carry no scope; scoped tokens (e.g. stream tokens) are only
+    accepted where that ``scope`` is asked for.
+    """
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
-    except JWTError as e:
+    except JWTError:
+        payload = None
+    if payload is None or payload.get("scope") != scope:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return payload
 
 async def get_user_by_email(db, email: str) -> Optional[UserInDB]:
     """Get user by email from database."""
@@ -145,6 +163,34 @@ async def get_current_user(
     
     return user
 
+async def get_current_user_for_stream(
+    request: Request,
+    stream_token: Optional[str] = None,
+    db = Depends(get_database)
+) -> UserInDB:
+    """Authenticate streaming endpoints; browsers' EventSource cannot send an
+    Authorization header, so they pass a ``stream_token`` (see
+    ``create_stream_token``) in the query string instead of the access token."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = verify_token(token)
+    elif stream_token:
+        payload = verify_token(stream_token, scope=STREAM_TOKEN_SCOPE)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    
+    user_id = payload.get("sub")
+    user = await get_user_by_id(db, user_id) if user_id else None
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    return user
+
 async def get_current_admin_user(
     current_user: UserInDB = Depends(get_current_user)
 ) -> UserInDB:
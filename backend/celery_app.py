@@ -10,7 +10,7 @@ celery_app = Celery(
     "fsp_navigator",
     broker=CELERY_BROKER_URL,
     backend=CELERY_RESULT_BACKEND,
-    include=["backend.tasks.backup_tasks"]
+    include=["backend.tasks.backup_tasks", "backend.tasks.gdpr_tasks"]
 )
 
 # Celery configuration
@@ -30,4 +30,20 @@ celery_app.conf.update(
 # Optional: Configure task routing
 celery_app.conf.task_routes = {
     "backend.tasks.backup_tasks.*": {"queue": "backup"},
-}
\ No newline at end of file
+}
+
+# Periodic tasks (run with `celery -A backend.celery_app beat`)
+celery_app.conf.beat_schedule = {
+    "verify-backup-catalog": {
+        "task": "backend.tasks.backup_tasks.verify_backup_catalog_task",
+        "schedule": 6 * 60 * 60,  # every 6 hours
+    },
+    "cleanup-expired-gdpr-exports": {
+        "task": "backend.tasks.gdpr_tasks.cleanup_expired_exports_task",
+        "schedule": 24 * 60 * 60,  # daily
+    },
+    "process-account-deletions": {
+        "task": "backend.tasks.gdpr_tasks.process_account_deletions_task",
+        "schedule": 60 * 60,  # hourly
+    },
+}
@@ -1,25 +1,189 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+"""
+MongoDB access for FSP Navigator.
+
+The API process holds exactly one Motor client, built from settings with
+configurable pool sizing, idle timeout, read preference and wire
+compression; routes get the database through ``get_database``. Pool
+checkouts are observed by a PyMongo pool listener so connection
+starvation shows up as checkout wait time in ``get_mongo_pool_stats``;
+command round trips go to the Prometheus metrics.
+Code that runs its own event loop (Celery tasks) builds a client with the
+same options through ``create_client``. Core collection indexes are
+declared here; see ``services/index_registry.py``.
+"""
+
+import threading
 from pathlib import Path
+from typing import Any, Dict, Optional
+
 from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+from backend.settings import settings  # noqa: E402  (reads the .env loaded above)
+from backend.services.index_registry import register_indexes  # noqa: E402
+from backend.services.metrics import command_metrics  # noqa: E402
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters and checkout wait times for all clients of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections_open = 0
+            self.checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.pool_clears = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+
+    def _record_wait(self, duration: Optional[float]):
+        wait_ms = (duration or 0.0) * 1000
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        bucket = next((i for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS) if wait_ms <= bound), -1)
+        self.wait_buckets[bucket] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open = max(0, self.connections_open - 1)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = self.checkouts + self.checkout_failures
+            return {
+                "max_pool_size": settings.mongo_max_pool_size,
+                "min_pool_size": settings.mongo_min_pool_size,
+                "connections_open": self.connections_open,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "checkout_wait_avg_ms": round(self.wait_total_ms / waits, 3) if waits else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max_ms, 3),
+                "checkout_wait_total_ms": round(self.wait_total_ms, 3),
+                "checkout_wait_buckets_ms": dict(zip(
+                    [*map(str, CHECKOUT_WAIT_BUCKETS_MS), "+Inf"], self.wait_buckets
+                )),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def client_options() -> Dict[str, Any]:
+    """Keyword arguments shared by every Motor/PyMongo client of the app."""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "readPreference": settings.mongo_read_preference,
+        "event_listeners": [pool_metrics, command_metrics],
+    }
+    if settings.mongo_max_idle_time_ms:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+
+def create_client() -> AsyncIOMotorClient:
+    """A new Motor client with the app's options; the API itself uses ``client``."""
+    return AsyncIOMotorClient(settings.mongo_url, **client_options())
+
+
+# The one client of the API process
+client = create_client()
+db = client[settings.db_name]
 
 async def get_database():
     """Dependency to get database instance."""
     return db
 
-async def init_database():
-    """Initialize database with indexes."""
-    # Create indexes for better performance
-    await db.users.create_index("email", unique=True)
-    await db.users.create_index("id", unique=True)
-    await db.user_progress.create_index("user_id")
-    await db.personal_files.create_index("user_id")
-    print("Database indexes created successfully")
\ No newline at end of file
+def get_mongo_pool_stats() -> Dict[str, Any]:
+    return pool_metrics.snapshot()
+
+# Indexes of the core collections; feature modules register their own
+CORE_INDEXES = register_indexes({
+    "users": [
+        ([("email", 1)], {"unique": True}),
+        ([("id", 1)], {"unique": True}),
+    ],
+    "user_progress": [([("user_id", 1)], {})],
+    "personal_files": [([("user_id", 1)], {})],
+    "documents": [([("user_id", 1)], {})],
+    "fsp_progress": [([("user_id", 1)], {})],
+    "subscriptions": [([("user_id", 1)], {})],
+    "badges": [([("badge_id", 1)], {"unique": True})],
+    "user_badges": [
+        ([("user_id", 1)], {}),
+        ([("user_id", 1), ("badge_id", 1)], {"unique": True}),
+    ],
+    "user_activity": [
+        ([("user_id", 1)], {}),
+        ([("user_id", 1), ("activity_type", 1)], {}),
+        ([("created_at", 1)], {}),
+    ],
+    "user_login_streak": [([("user_id", 1)], {"unique": True})],
+    "user_stats": [([("user_id", 1)], {"unique": True})],
+    "data_deletion_requests": [
+        ([("status", 1), ("request_date", 1)], {}),
+        ([("batch_id", 1)], {}),
+    ],
+    "node_content": [
+        ([("node_id", 1)], {}),
+        ([("node_type", 1), ("created_at", -1)], {}),
+        ([("title", "text"), ("description", "text")], {"default_language": "none", "name": "node_content_text"}),
+    ],
+    "content_previews": [([("content_id", 1), ("expires_at", 1)], {})],
+    "content_stats": [([("content_id", 1)], {})],
+})
@@ -3,26 +3,84 @@ IP Security Middleware
 Provides IP-based access control for admin functions
 """
 
+import time
+import bisect
+import logging
 import ipaddress
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional, Tuple
 from fastapi import Request, HTTPException, status
+from pymongo import ASCENDING, DESCENDING
 from backend.database import get_database
 from backend.models import UserInDB
+from backend.services.audit_sink import get_access_log_sink
+from backend.services.index_registry import register_indexes
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Allowlists are cached per admin; changes made through set_admin_allowlist
+# apply at once in this worker, other workers pick them up within this time
+ALLOWLIST_CACHE_SECONDS = 30.0
+
+IP_SECURITY_INDEXES = register_indexes({
+    "admin_security_config": [([("admin_email", ASCENDING)], {"unique": True})],
+    "admin_access_logs": [([("admin_email", ASCENDING), ("timestamp", DESCENDING)], {})],
+})
+
+
+class AdminAllowlist:
+    """Allowed networks of one admin, parsed once into sorted, merged
+    address ranges per IP version and searched with bisect."""
+    
+    def __init__(self, allowed_ips: Iterable[str]):
+        spans: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for entry in allowed_ips:
+            try:
+                network = ipaddress.ip_network(entry, strict=False)
+            except ValueError:
+                logger.warning(f"Ignoring invalid admin allowlist entry: {entry!r}")
+                continue
+            spans[network.version].append((int(network.network_address), int(network.broadcast_address)))
+        
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        for version, ranges in spans.items():
+            merged: List[List[int]] = []
+            for start, end in sorted(ranges):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self._starts[version] = [start for start, _ in merged]
+            self._ends[version] = [end for _, end in merged]
+    
+    def allows(self, client_ip: str) -> bool:
+        try:
+            address = ipaddress.ip_address(client_ip)
+        except ValueError:
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        value = int(address)
+        i = bisect.bisect_right(self._starts[address.version], value) - 1
+        return i >= 0 and value <= self._ends[address.version][i]
+
+
 class IPSecurityMiddleware:
-    def __init__(self):
+    def __init__(self, cache_seconds: float = ALLOWLIST_CACHE_SECONDS):
         self.db = None
+        self.cache_seconds = cache_seconds
+        # admin email -> (expires at, allowlist or None when unrestricted)
+        self._allowlists: Dict[str, Tuple[float, Optional[AdminAllowlist]]] = {}
     
     async def initialize_database(self):
         """Initialize database connection"""
         if not self.db:
             try:
-                # Get database connection properly
-                db_gen = get_database()
-                self.db = await db_gen.__anext__()
+                # Shared database of the process (same dependency the routes use)
+                self.db = await get_database()
             except Exception as e:
-                print(f"Error initializing database: {e}")
+                logger.error(f"Error initializing database: {e}")
                 raise
     
     def validate_ip_address(self, ip_str: str) -> bool:
@@ -33,57 +91,61 @@ class IPSecurityMiddleware:
         except ValueError:
             return False
     
+    async def get_allowlist(self, admin_email: str) -> Optional[AdminAllowlist]:
+        """Cached allowlist of an admin; None when the admin has no IP restrictions"""
+        now = time.monotonic()
+        cached = self._allowlists.get(admin_email)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        await self.initialize_database()
+        ip_config = await self.db.admin_security_config.find_one(
+            {"admin_email": admin_email}, {"_id": 0, "allowed_ips": 1}
+        )
+        allowed_ips = (ip_config or {}).get("allowed_ips") or []
+        # A configured list without a single valid entry still denies every IP
+        allowlist = AdminAllowlist(allowed_ips) if allowed_ips else None
+        self._allowlists[admin_email] = (now + self.cache_seconds, allowlist)
+        return allowlist
+    
+    def invalidate_allowlist(self, admin_email: Optional[str] = None):
+        """Drop the cached allowlist of one admin (or of all admins)"""
+        if admin_email is None:
+            self._allowlists.clear()
+        else:
+            self._allowlists.pop(admin_email, None)
+    
+    async def set_admin_allowlist(self, admin_email: str, allowed_ips: List[str]):
+        """Store an admin's allowed IPs/networks; an empty list lifts the restriction"""
+        invalid = [ip for ip in allowed_ips if not self.validate_ip_address(ip)]
+        if invalid:
+            raise ValueError(f"Invalid IP addresses or networks: {', '.join(invalid)}")
+        
+        await self.initialize_database()
+        await self.db.admin_security_config.update_one(
+            {"admin_email": admin_email},
+            {"$set": {"allowed_ips": allowed_ips, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        self.invalidate_allowlist(admin_email)
+    
     async def is_admin_ip_allowed(self, admin_email: str, client_ip: str) -> bool:
         """Check if admin's client IP is in allowed list"""
         try:
-            await self.initialize_database()
-            
-            # Get admin security configuration
-            ip_config = await self.db.admin_security_config.find_one({"admin_email": admin_email})
-            if not ip_config:
-                return False  # No IP restrictions configured
-            
-            allowed_ips = ip_config.get("allowed_ips", [])
-            if not allowed_ips:
-                return True  # No IP restrictions
-            
-            # Check if client IP is in allowed list
-            try:
-                client_ip_obj = ipaddress.ip_address(client_ip)
-                for allowed_ip in allowed_ips:
-                    network = ipaddress.ip_network(allowed_ip, strict=False)
-                    if client_ip_obj in network:
-                        return True
-                return False
-            except ValueError:
-                return False
-                
+            allowlist = await self.get_allowlist(admin_email)
+            return allowlist is None or allowlist.allows(client_ip)
         except Exception as e:
-            print(f"Error checking IP access: {e}")
+            logger.error(f"Error checking IP access: {e}")
             return False
     
     async def verify_admin_access(self, request: Request, admin_user: UserInDB) -> bool:
         """Verify admin access with IP restrictions"""
-        try:
-            # Initialize database if not already done
-            await self.initialize_database()
-            
-            # Get client IP
-            client_ip = self.get_client_ip(request)
-            if not client_ip:
-                return False
-            
-            # Check if admin has IP restrictions
-            ip_config = await self.db.admin_security_config.find_one({"admin_email": admin_user.email})
-            if not ip_config:
-                return True  # No IP restrictions for this admin
-            
-            # Verify IP access
-            return await self.is_admin_ip_allowed(admin_user.email, client_ip)
-            
-        except Exception as e:
-            print(f"Error verifying admin access: {e}")
+        # Get client IP
+        client_ip = self.get_client_ip(request)
+        if not client_ip:
             return False
+        
+        return await self.is_admin_ip_allowed(admin_user.email, client_ip)
     
     def get_client_ip(self, request: Request) -> Optional[str]:
         """Extract client IP from request"""
@@ -107,8 +169,6 @@ class IPSecurityMiddleware:
     async def log_admin_access_attempt(self, admin_email: str, client_ip: str, allowed: bool, request: Request = None):
         """Log admin access attempts for security monitoring"""
         try:
-            await self.initialize_database()
-            
             log_entry = {
                 "admin_email": admin_email,
                 "client_ip": client_ip,
@@ -118,10 +178,16 @@ class IPSecurityMiddleware:
                 "access_type": "admin_panel"
             }
             
-            await self.db.admin_access_logs.insert_one(log_entry)
+            # Batched with the audit log writes when the API server runs
+            sink = get_access_log_sink()
+            if sink is not None:
+                await sink.submit(log_entry)
+            else:
+                await self.initialize_database()
+                await self.db.admin_access_logs.insert_one(log_entry)
             
         except Exception as e:
-            print(f"Error logging admin access: {e}")
+            logger.error(f"Error logging admin access: {e}")
 
 # Global instance
 ip_security = IPSecurityMiddleware()
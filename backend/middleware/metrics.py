@@ -0,0 +1,56 @@
+"""
+Request Metrics Middleware
+Pure-ASGI timing of every HTTP request per route template, with the
+MongoDB commands the request issued (see backend/services/metrics.py)
+and optional query budget checks (backend/services/query_budget.py)
+"""
+
+import time
+from typing import Optional
+
+from backend.services.metrics import RequestStats, current_request_stats, observe_request, route_label
+from backend.services.query_budget import enforce_query_budget
+from backend.settings import settings
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and database work of each HTTP request.
+
+    Added as the outermost middleware so the measured time includes the
+    rest of the stack. The route label is read after the request has been
+    routed, from the matched route's path template. Unless the query budget
+    mode is "off", the request's queries are checked against the budget
+    declared with ``backend.services.query_budget.query_budget``.
+    """
+
+    def __init__(self, app, query_budget_mode: Optional[str] = None):
+        self.app = app
+        self.query_budget_mode = query_budget_mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        budget_mode = self.query_budget_mode or settings.query_budget_mode
+        stats = RequestStats(trace=budget_mode != "off")
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            route = route_label(scope)
+            observe_request(scope["method"], route, status, elapsed, stats)
+
+        if stats.shapes is not None:
+            enforce_query_budget(scope, route, stats.queries, stats.shapes, budget_mode)
@@ -0,0 +1,326 @@
+"""
+Rate Limiting Middleware
+Pure-ASGI rate limiter backed by atomic Redis sliding-window counters,
+with an in-process token bucket fallback when Redis is unavailable
+"""
+
+import json
+import math
+import re
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from backend.redis_config import get_rate_limit_config
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying Redis after a failure
+REDIS_RETRY_INTERVAL = 5.0
+
+UNIT_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 60 * 60,
+    "day": 24 * 60 * 60,
+}
+
+_LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*(?:per|/)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+
+# Sliding-window counter over two fixed buckets per window, evaluated for
+# every limit of a policy and committed only if all of them allow the hit.
+#   KEYS[2i-1], KEYS[2i]  current / previous bucket of limit i
+#   ARGV[1]               now (seconds)
+#   ARGV[2i], ARGV[2i+1]  limit / window of limit i
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local n = #KEYS / 2
+local allowed = 1
+local remaining = nil
+local retry_after = 0
+for i = 1, n do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    local elapsed = now % window
+    local weighted = previous * (window - elapsed) / window + current
+    if weighted + 1 > limit then
+        allowed = 0
+        if window - elapsed > retry_after then
+            retry_after = window - elapsed
+        end
+    end
+    local left = math.floor(limit - weighted - 1)
+    if remaining == nil or left < remaining then
+        remaining = left
+    end
+end
+if allowed == 1 then
+    for i = 1, n do
+        local window = tonumber(ARGV[2 * i + 1])
+        redis.call('INCR', KEYS[2 * i - 1])
+        redis.call('EXPIRE', KEYS[2 * i - 1], window * 2)
+    end
+end
+if allowed == 0 or remaining < 0 then
+    remaining = 0
+end
+return {allowed, remaining, math.ceil(retry_after)}
+"""
+
+
+def parse_rate_limit(limit_string: str) -> Tuple[Tuple[int, int], ...]:
+    """Parse "200 per day, 50 per hour" / "10/minute" into ((count, window_seconds), ...)."""
+    limits = []
+    for part in re.split(r"[,;]", limit_string):
+        if not part.strip():
+            continue
+        match = _LIMIT_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {part.strip()!r}")
+        count, multiplier, unit = match.groups()
+        limits.append((int(count), int(multiplier or 1) * UNIT_SECONDS[unit.lower()]))
+    if not limits:
+        raise ValueError(f"Invalid rate limit: {limit_string!r}")
+    return tuple(limits)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limits: Tuple[Tuple[int, int], ...]
+
+    @property
+    def limit(self) -> int:
+        """The most restrictive count, reported in X-RateLimit-Limit."""
+        return min(count for count, _ in self.limits)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int
+
+
+def resolve_policy(budget: str, config: Optional[Dict[str, str]] = None) -> RateLimitPolicy:
+    """Resolve a budget name from ``get_rate_limit_config()`` or a literal limit string."""
+    config = config if config is not None else get_rate_limit_config()
+    if budget in config:
+        return RateLimitPolicy(name=budget, limits=parse_rate_limit(config[budget]))
+    limits = parse_rate_limit(budget)
+    return RateLimitPolicy(name=re.sub(r"[^a-z0-9]+", "_", budget.lower()).strip("_"), limits=limits)
+
+
+class TokenBucketLimiter:
+    """
+    Per-process token buckets used while Redis is unavailable.
+
+    Each (key, window) pair gets a bucket of ``count`` tokens refilled at
+    ``count / window`` tokens per second. The number of tracked keys is
+    bounded; the least recently used buckets are evicted first.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Tuple[str, int], List[float]]" = OrderedDict()
+
+    def _bucket(self, key: Tuple[str, int], capacity: int, now: float) -> List[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(capacity), now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def hit(self, key: str, policy: RateLimitPolicy, now: Optional[float] = None) -> RateLimitResult:
+        now = time.monotonic() if now is None else now
+        buckets = []
+        allowed = True
+        retry_after = 0.0
+
+        for count, window in policy.limits:
+            bucket = self._bucket((key, window), count, now)
+            rate = count / window
+            bucket[0] = min(count, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                allowed = False
+                retry_after = max(retry_after, (1 - bucket[0]) / rate)
+            buckets.append(bucket)
+
+        if allowed:
+            for bucket in buckets:
+                bucket[0] -= 1
+
+        remaining = min(int(bucket[0]) for bucket in buckets)
+        return RateLimitResult(allowed, policy.limit, max(remaining, 0), math.ceil(retry_after))
+
+
+class RateLimitMiddleware:
+    """
+    Pure-ASGI rate limiting for routes that declare a budget with
+    ``backend.security.safe_rate_limit``.
+
+    Requests are keyed by user id when they carry a valid bearer token and
+    by client IP otherwise. Each check is a single EVALSHA round trip; if
+    Redis fails the in-process token bucket takes over until Redis answers
+    again.
+    """
+
+    def __init__(
+        self,
+        app,
+        redis_factory: Optional[Callable[[], Awaitable]] = None,
+        config: Optional[Dict[str, str]] = None,
+        key_prefix: str = "rl",
+        fallback_max_keys: int = 10000,
+    ):
+        self.app = app
+        self.redis_factory = redis_factory
+        self.config = config
+        self.key_prefix = key_prefix
+        self.fallback = TokenBucketLimiter(max_keys=fallback_max_keys)
+
+        self._redis = None
+        self._script = None
+        self._redis_retry_at = 0.0
+        self._static_routes: Optional[Dict[Tuple[str, str], RateLimitPolicy]] = None
+        self._dynamic_routes: List[Tuple[str, "re.Pattern", RateLimitPolicy]] = []
+
+    # Route table
+
+    def _build_route_table(self, app):
+        """Collect budgets declared on endpoints; static paths go into a dict."""
+        config = self.config if self.config is not None else get_rate_limit_config()
+        static, dynamic = {}, []
+        for route in getattr(app, "routes", []):
+            budget = getattr(getattr(route, "endpoint", None), "__rate_limit__", None)
+            if not budget:
+                continue
+            policy = resolve_policy(budget, config)
+            for method in route.methods or ():
+                if "{" in route.path:
+                    dynamic.append((method, route.path_regex, policy))
+                else:
+                    static[(method, route.path)] = policy
+        self._static_routes = static
+        self._dynamic_routes = dynamic
+        logger.info(f"Rate limiting {len(static) + len(dynamic)} route(s)")
+
+    def _match_policy(self, scope) -> Optional[RateLimitPolicy]:
+        if self._static_routes is None:
+            self._build_route_table(scope.get("app"))
+        method, path = scope["method"], scope["path"]
+        policy = self._static_routes.get((method, path))
+        if policy is None and self._dynamic_routes:
+            for route_method, regex, candidate in self._dynamic_routes:
+                if route_method == method and regex.match(path):
+                    return candidate
+        return policy
+
+    # Identity
+
+    @staticmethod
+    def _identity(scope) -> str:
+        """User id for authenticated requests, client IP otherwise."""
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    from backend.auth import JWT_SECRET, JWT_ALGORITHM
+                    try:
+                        user_id = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM]).get("sub")
+                    except JWTError:
+                        user_id = None
+                    if user_id:
+                        return f"user:{user_id}"
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    # Backends
+
+    async def _get_redis(self):
+        if self._redis is not None:
+            return self._redis
+        if self.redis_factory is None or time.monotonic() < self._redis_retry_at:
+            return None
+        self._redis = await self.redis_factory()
+        if self._redis is None:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+            return None
+        self._script = self._redis.register_script(SLIDING_WINDOW_LUA)
+        return self._redis
+
+    async def _hit_redis(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        now = time.time()
+        keys, args = [], [now]
+        for count, window in policy.limits:
+            bucket = int(now // window)
+            keys.append(f"{key}:{window}:{bucket}")
+            keys.append(f"{key}:{window}:{bucket - 1}")
+            args.extend((count, window))
+        allowed, remaining, retry_after = await self._script(keys=keys, args=args)
+        return RateLimitResult(bool(allowed), policy.limit, int(remaining), int(retry_after))
+
+    async def check(self, identity: str, policy: RateLimitPolicy) -> RateLimitResult:
+        key = f"{self.key_prefix}:{policy.name}:{identity}"
+        try:
+            if await self._get_redis() is not None:
+                return await self._hit_redis(key, policy)
+        except Exception as e:
+            logger.warning(f"Redis rate limiting failed, using local token bucket: {e}")
+            self._redis = None
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+        return self.fallback.hit(key, policy)
+
+    # ASGI
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        policy = self._match_policy(scope)
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        result = await self.check(self._identity(scope), policy)
+        limit_headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+
+        if not result.allowed:
+            body = json.dumps({
+                "error": "Rate limit exceeded",
+                "detail": "Too many requests. Please try again later.",
+                "retry_after": result.retry_after
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(result.retry_after).encode()),
+                    *limit_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *limit_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
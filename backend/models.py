@@ -177,6 +177,9 @@ class ProgressUpdate(BaseModel):
     completed: bool
     viewed: bool = True
 
+class ProgressBatchUpdate(BaseModel):
+    updates: List[ProgressUpdate] = Field(..., min_length=1, max_length=200)
+
 # Personal Files Models
 class PersonalFile(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -302,6 +305,9 @@ class UserStats(BaseModel):
     referrals_made: int = 0
     tutorial_completed: bool = False
     hospitation_uploaded: bool = False
+    # Per activity_type counters maintained by log_user_activity
+    activity_counts: Dict[str, int] = {}
+    activity_counts_backfilled: bool = False
     
     # Existing gamification stats
     total_points: int = 0
@@ -372,6 +378,7 @@ class UserActivity(BaseModel):
     activity_type: str  # "ai_message", "email_generated", "search", "feedback", etc.
     activity_data: Optional[Dict[str, Any]] = {}
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = None  # removed by the user_activity TTL index
 
 class UserLoginStreak(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -450,6 +457,7 @@ class GameResult(BaseModel):
     correct_answers: int
     time_spent_seconds: int
     streak: Optional[int] = None
+    correct_item_ids: List[str] = []  # cases/terms answered correctly (kept out of the next rounds)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
@@ -488,6 +496,7 @@ class GameResultCreate(BaseModel):
     correct_answers: int
     time_spent_seconds: int
     streak: Optional[int] = None
+    correct_item_ids: List[str] = Field(default=[], max_length=200)
     
     class Config:
         use_enum_values = True
@@ -531,6 +540,26 @@ class UserGameStats(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class TermReviewAnswer(BaseModel):
+    term_id: str
+    grade: int = Field(..., ge=0, le=5)  # SM-2 recall quality, 0 = blackout, 5 = perfect
+
+class TermReviewBatch(BaseModel):
+    answers: List[TermReviewAnswer] = Field(..., min_length=1, max_length=200)
+
+class TermReviewState(BaseModel):
+    term_id: str
+    ease: float
+    interval_days: int
+    repetitions: int
+    lapses: int = 0
+    due_at: datetime
+    last_reviewed_at: Optional[datetime] = None
+
+class DueTerm(BaseModel):
+    term: FachbegriffTerm
+    review: TermReviewState
+
 class Leaderboard(BaseModel):
     rank: int
     user_id: str
@@ -542,6 +571,17 @@ class Leaderboard(BaseModel):
     class Config:
         use_enum_values = True
 
+class LeaderboardPosition(BaseModel):
+    game_type: GameType
+    rank: Optional[int] = None  # None until the user has played this game
+    total_players: int
+    score: Optional[int] = None
+    average_score: Optional[float] = None
+    games_played: int = 0
+    
+    class Config:
+        use_enum_values = True
+
 # --- Reddit-Style Forum Models ---
 class AttachmentType(str, Enum):
     IMAGE = "image"
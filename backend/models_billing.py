@@ -82,6 +82,23 @@ class AuditLog(BaseModel):
     user_agent: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
+class BackupCatalogEntry(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    filename: str
+    type: str  # database, files
+    local_path: Optional[str] = None
+    size: int = 0
+    checksum: Optional[str] = None
+    checksum_algorithm: str = "sha256"
+    s3_url: Optional[str] = None
+    s3_bucket: Optional[str] = None
+    s3_key: Optional[str] = None
+    parent_id: Optional[str] = None  # previous snapshot of the same type
+    status: str = "available"  # available, deleted, corrupt, missing
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    verified_at: Optional[datetime] = None
+    deleted_at: Optional[datetime] = None
+
 class ErrorReport(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: Optional[str] = None
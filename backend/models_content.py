@@ -46,11 +46,14 @@ class NodeContent(BaseModel):
     updated_by: str
 
 class NodeContentVersion(BaseModel):
-    """Version history for node content"""
+    """Version history for node content (see services/content_versions.py)"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     content_id: str
     version_number: int
-    content_snapshot: NodeContent
+    content_snapshot: Optional[NodeContent] = None  # keyframes only
+    patch: Optional[List[Dict[str, Any]]] = None  # JSON patch against base_version
+    base_version: Optional[int] = None
+    chain_length: int = 0  # patches since the last keyframe
     change_description: Optional[str] = None
     changed_by: str
     changed_at: datetime = Field(default_factory=datetime.utcnow)
@@ -6,6 +6,9 @@ for the FSP Navigator application.
 """
 
 import os
+import time
+import asyncio
+import weakref
 import redis.asyncio as redis
 from typing import Optional
 import logging
@@ -24,46 +27,126 @@ RATE_LIMIT_LOGIN = os.environ.get('RATE_LIMIT_LOGIN', '10 per minute')
 RATE_LIMIT_REGISTER = os.environ.get('RATE_LIMIT_REGISTER', '5 per hour')
 RATE_LIMIT_UPLOAD = os.environ.get('RATE_LIMIT_UPLOAD', '20 per hour')
 RATE_LIMIT_PASSWORD_RESET = os.environ.get('RATE_LIMIT_PASSWORD_RESET', '3 per hour')
+RATE_LIMIT_CHECKOUT = os.environ.get('RATE_LIMIT_CHECKOUT', '5 per hour')
+RATE_LIMIT_ADMIN_DELETE_USER = os.environ.get('RATE_LIMIT_ADMIN_DELETE_USER', '10 per hour')
+RATE_LIMIT_ADMIN_INITIALIZE = os.environ.get('RATE_LIMIT_ADMIN_INITIALIZE', '1 per day')
+
+# Seconds to wait after a failed connect before trying again
+REDIS_RECONNECT_INTERVAL = 5.0
+
+class _LoopRedis:
+    """Connection pool of one event loop. Pooled connections belong to the
+    loop that opened them, so every loop (the server's, or the one each
+    Celery task starts with ``asyncio.run``) gets its own."""
+    
+    def __init__(self):
+        self.pool: Optional[redis.ConnectionPool] = None
+        self.client: Optional[redis.Redis] = None
+        self.lock = asyncio.Lock()
+        self.retry_at = 0.0
+
+# App-scoped connection pool shared by caching, rate limiting and pub/sub.
+# Created in the server lifespan (or lazily on first use outside it); the
+# state of a loop is dropped together with the loop.
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopRedis]" = weakref.WeakKeyDictionary()
+
+def _loop_state() -> _LoopRedis:
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None:
+        state = _loop_states[loop] = _LoopRedis()
+    return state
+
+def _build_connection_pool() -> redis.ConnectionPool:
+    """Build the shared connection pool from the Redis settings."""
+    pool_kwargs = dict(
+        db=REDIS_DB,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        decode_responses=True,
+        retry_on_timeout=True,
+        socket_keepalive=True
+    )
+    if REDIS_PASSWORD:
+        # If password is provided separately, pass it alongside the URL
+        pool_kwargs["password"] = REDIS_PASSWORD
+    return redis.ConnectionPool.from_url(REDIS_URL, **pool_kwargs)
+
+async def init_redis_pool() -> Optional[redis.Redis]:
+    """
+    Create the shared Redis pool and verify it with a single PING.
+    
+    Returns:
+        Redis client bound to the shared pool, or None if Redis is unreachable
+    """
+    state = _loop_state()
+    async with state.lock:
+        if state.client is not None:
+            return state.client
+        if time.monotonic() < state.retry_at:
+            return None
+        
+        pool = _build_connection_pool()
+        client = redis.Redis(connection_pool=pool)
+        try:
+            await client.ping()
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {e}")
+            state.retry_at = time.monotonic() + REDIS_RECONNECT_INTERVAL
+            await pool.disconnect()
+            return None
+        
+        state.pool, state.client = pool, client
+        logger.info(f"Redis connection pool established (max {REDIS_MAX_CONNECTIONS} connections)")
+        return state.client
+
+async def close_redis_pool():
+    """Close the Redis pool of the running loop (server shutdown, end of a task's loop)."""
+    state = _loop_states.pop(asyncio.get_running_loop(), None)
+    if state is not None and state.client is not None:
+        await state.client.aclose()
+        await state.pool.disconnect()
+        logger.info("Redis connection pool closed")
 
 async def get_redis_client() -> Optional[redis.Redis]:
     """
-    Get Redis client with connection pooling and error handling.
+    Get the shared Redis client.
     
     Returns:
         Redis client instance or None if connection fails
     """
+    state = _loop_states.get(asyncio.get_running_loop())
+    if state is not None and state.client is not None:
+        return state.client
+    return await init_redis_pool()
+
+async def get_redis() -> Optional[redis.Redis]:
+    """Dependency to get the shared Redis client (None when Redis is unavailable)."""
+    return await get_redis_client()
+
+def get_redis_pool_stats() -> dict:
+    """
+    Get size and usage of the running loop's shared pool.
+    
+    Returns:
+        Dictionary with pool metrics
+    """
     try:
-        # Parse Redis URL
-        if REDIS_PASSWORD:
-            # If password is provided separately, construct URL
-            redis_client = redis.from_url(
-                REDIS_URL,
-                password=REDIS_PASSWORD,
-                db=REDIS_DB,
-                max_connections=REDIS_MAX_CONNECTIONS,
-                decode_responses=True,
-                retry_on_timeout=True,
-                socket_keepalive=True
-            )
-        else:
-            # Use URL as-is (password may be in URL)
-            redis_client = redis.from_url(
-                REDIS_URL,
-                db=REDIS_DB,
-                max_connections=REDIS_MAX_CONNECTIONS,
-                decode_responses=True,
-                retry_on_timeout=True,
-                socket_keepalive=True
-            )
-        
-        # Test connection
-        await redis_client.ping()
-        logger.info("Redis connection established successfully")
-        return redis_client
-        
-    except Exception as e:
-        logger.error(f"Failed to connect to Redis: {e}")
-        return None
+        state = _loop_states.get(asyncio.get_running_loop())
+    except RuntimeError:
+        state = None
+    pool = state.pool if state is not None else None
+    if pool is None:
+        return {'initialized': False, 'max_connections': REDIS_MAX_CONNECTIONS}
+    
+    in_use = len(pool._in_use_connections)
+    idle = len(pool._available_connections)
+    return {
+        'initialized': True,
+        'max_connections': pool.max_connections,
+        'created_connections': in_use + idle,
+        'in_use_connections': in_use,
+        'idle_connections': idle
+    }
 
 async def test_redis_connection() -> bool:
     """
@@ -76,7 +159,6 @@ async def test_redis_connection() -> bool:
     if client:
         try:
             await client.ping()
-            await client.close()
             return True
         except Exception:
             return False
@@ -94,13 +176,16 @@ def get_rate_limit_config() -> dict:
         'login': RATE_LIMIT_LOGIN,
         'register': RATE_LIMIT_REGISTER,
         'upload': RATE_LIMIT_UPLOAD,
-        'password_reset': RATE_LIMIT_PASSWORD_RESET
+        'password_reset': RATE_LIMIT_PASSWORD_RESET,
+        'checkout': RATE_LIMIT_CHECKOUT,
+        'admin_delete_user': RATE_LIMIT_ADMIN_DELETE_USER,
+        'admin_initialize': RATE_LIMIT_ADMIN_INITIALIZE
     }
 
 # Health check function
 async def redis_health_check() -> dict:
     """
-    Perform Redis health check.
+    Perform Redis health check on the shared pool.
     
     Returns:
         Dictionary with Redis health status
@@ -108,16 +193,15 @@ async def redis_health_check() -> dict:
     try:
         client = await get_redis_client()
         if client:
-            await client.ping()
             info = await client.info()
-            await client.close()
             
             return {
                 'status': 'healthy',
                 'version': info.get('redis_version', 'unknown'),
                 'connected_clients': info.get('connected_clients', 0),
                 'used_memory_human': info.get('used_memory_human', 'unknown'),
-                'uptime_in_seconds': info.get('uptime_in_seconds', 0)
+                'uptime_in_seconds': info.get('uptime_in_seconds', 0),
+                'pool': get_redis_pool_stats()
             }
         else:
             return {
@@ -128,4 +212,4 @@ async def redis_health_check() -> dict:
         return {
             'status': 'error',
             'error': str(e)
-        }
\ No newline at end of file
+        }
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from typing import List, Dict, Optional, Any
 from backend.models_billing import (
     AdminUserResponse, AdminStatsResponse, AuditLog, ErrorReport,
@@ -9,6 +9,10 @@ from backend.database import get_database
 from backend.models import UserInDB
 from backend.security import sanitize_regex_pattern, AuditLogger, safe_rate_limit
 from backend.middleware.ip_security import verify_admin_ip_access
+from backend.services.account_deletion import AccountDeletionEngine
+from backend.services.retention import encode_audit_cursor, decode_audit_cursor
+from backend.services.content_cache import invalidate_util_info
+from backend.services.query_budget import query_budget
 from datetime import datetime, timedelta
 import logging
 import os
@@ -95,6 +99,7 @@ async def get_admin_stats(
     )
 
 @router.get("/users", response_model=List[AdminUserResponse])
+@query_budget(5)
 async def get_all_users(
     skip: int = 0,
     limit: int = 50,
@@ -118,15 +123,23 @@ async def get_all_users(
     users_cursor = db.users.find(query).skip(skip).limit(limit).sort("created_at", -1)
     users_data = await users_cursor.to_list(limit)
     
+    # File counts and progress of the whole page: one query each
+    user_ids = [user_data["id"] for user_data in users_data]
+    files_counts = {
+        row["_id"]: row["count"] async for row in db.personal_files.aggregate([
+            {"$match": {"user_id": {"$in": user_ids}}},
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}
+        ])
+    }
+    progress_steps_by_user = {
+        progress["user_id"]: sum(len(step.get("tasks", [])) for step in progress.get("steps", []))
+        async for progress in db.user_progress.find(
+            {"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1, "steps.tasks": 1}
+        )
+    }
+    
     admin_users = []
     for user_data in users_data:
-        # Get additional stats for each user
-        user_files_count = await db.personal_files.count_documents({"user_id": user_data["id"]})
-        user_progress = await db.user_progress.find_one({"user_id": user_data["id"]})
-        progress_steps = 0
-        if user_progress:
-            progress_steps = sum(len(step.get("tasks", [])) for step in user_progress.get("steps", []))
-        
         admin_user_response = AdminUserResponse(
             id=user_data["id"],
             email=user_data["email"],
@@ -135,8 +148,8 @@ async def get_all_users(
             created_at=user_data["created_at"],
             is_active=user_data.get("is_active", True),
             is_admin=user_data.get("is_admin", False),
-            total_files=user_files_count,
-            total_progress_steps=progress_steps
+            total_files=files_counts.get(user_data["id"], 0),
+            total_progress_steps=progress_steps_by_user.get(user_data["id"], 0)
         )
         admin_users.append(admin_user_response)
     
@@ -182,14 +195,21 @@ async def get_all_transactions(
 
 @router.get("/audit-logs", response_model=List[AuditLog])
 async def get_audit_logs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user_id: Optional[str] = None,
     action: Optional[str] = None,
     admin_user: UserInDB = Depends(get_current_admin_user),
     db = Depends(get_database)
 ):
-    """Get audit logs."""
+    """Get audit logs, newest first.
+    
+    Pass the X-Next-Cursor header of a page as ``cursor`` to fetch the next
+    one; ``skip`` is still accepted but gets slower the deeper it pages.
+    ``action`` matches action names by prefix.
+    """
     
     # Limit max results
     limit = min(limit, 100)
@@ -198,13 +218,22 @@ async def get_audit_logs(
     if user_id:
         query["user_id"] = user_id
     if action:
-        # Sanitize action pattern
-        sanitized_action = sanitize_regex_pattern(action)
-        query["action"] = {"$regex": sanitized_action, "$options": "i"}
+        # Anchored prefix so the (action, timestamp) index is used
+        sanitized_action = sanitize_regex_pattern(action.lower())
+        query["action"] = {"$regex": f"^{sanitized_action}"}
+    if cursor:
+        try:
+            query.update(decode_audit_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        skip = 0
     
-    logs_cursor = db.audit_logs.find(query).skip(skip).limit(limit).sort("timestamp", -1)
+    logs_cursor = db.audit_logs.find(query).sort([("timestamp", -1), ("_id", -1)]).skip(skip).limit(limit)
     logs_data = await logs_cursor.to_list(limit)
     
+    if len(logs_data) == limit:
+        response.headers["X-Next-Cursor"] = encode_audit_cursor(logs_data[-1])
+    
     return [AuditLog(**log) for log in logs_data]
 
 @router.get("/errors", response_model=List[ErrorReport])
@@ -363,7 +392,7 @@ async def update_user_admin_status(
     return {"message": f"Admin status {'granted' if is_admin else 'revoked'} successfully"}
 
 @router.delete("/users/{user_id}")
-@safe_rate_limit("10 per hour")  # Rate limit for user deletion
+@safe_rate_limit("admin_delete_user")  # Rate limit for user deletion
 async def delete_user(
     user_id: str,
     request: Request,
@@ -387,23 +416,8 @@ async def delete_user(
             detail="User not found"
         )
     
-    # Delete user data in order
-    collections_to_clean = [
-        "personal_files",
-        "user_progress",
-        "documents",
-        "fsp_progress",
-        "payment_transactions",
-        "subscriptions",
-        "gdpr_consents",
-        "privacy_settings"
-    ]
-    
-    for collection in collections_to_clean:
-        await db[collection].delete_many({"user_id": user_id})
-    
-    # Delete user account
-    result = await db.users.delete_one({"id": user_id})
+    # Delete user data and uploaded files
+    await AccountDeletionEngine(db).purge_users([user_id])
     
     # Log admin action (keep audit logs for compliance)
     audit_logger = AuditLogger(db)
@@ -421,7 +435,7 @@ async def delete_user(
     return {"message": "User deleted successfully"}
 
 @router.post("/initialize-admin")
-@safe_rate_limit("1 per day")  # Rate limit for admin initialization
+@safe_rate_limit("admin_initialize")  # Rate limit for admin initialization
 async def initialize_admin(
     request: Request,
     db = Depends(get_database)
@@ -526,6 +540,7 @@ async def create_util_info_doc(
     )
     
     await db.util_info_documents.insert_one(util_doc.dict())
+    await invalidate_util_info()
     
     # Log admin action
     audit_logger = AuditLogger(db)
@@ -575,6 +590,7 @@ async def update_util_info_doc(
         {"id": doc_id},
         {"$set": update_data}
     )
+    await invalidate_util_info()
     
     # Log admin action
     audit_logger = AuditLogger(db)
@@ -609,6 +625,8 @@ async def delete_util_info_doc(
     if existing_doc.get("file_id"):
         await db.personal_files.delete_one({"id": existing_doc["file_id"]})
     
+    await invalidate_util_info()
+    
     # Log admin action
     audit_logger = AuditLogger(db)
     await audit_logger.log_action(
@@ -644,6 +662,7 @@ async def reorder_util_info_doc(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
+    await invalidate_util_info()
     
     # Log admin action
     audit_logger = AuditLogger(db)
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from backend.auth import get_current_admin_user
 from backend.database import get_database
 from backend.models import UserInDB
+from backend.services.api_probes import PROBES, clear_probe_cache, probe_all, run_probe
 
 router = APIRouter(prefix="/admin", tags=["real-admin"])
 
@@ -226,34 +227,43 @@ async def restore_version(
             detail=f"Error restoring version: {str(e)}"
         )
 
+def is_configured(api_config: Dict[str, Any]) -> bool:
+    """Whether a service has the credentials needed to probe it"""
+    return any(api_config.get(key) for key in (
+        "connection_string", "api_key", "secret_key", "client_secret", "secret_access_key"
+    ))
+
 @router.get("/api-status")
 async def get_api_status(
     admin_user: UserInDB = Depends(get_current_admin_user)
 ):
-    """Get status of all configured APIs"""
+    """Get status of all configured APIs, probing the reachable ones concurrently"""
     try:
         config = load_config()
         apis = config.get("apis", {})
         
         api_status = {}
+        # Results are cached briefly, so the dashboard can poll this endpoint
+        probes = await probe_all({name: api_config for name, api_config in apis.items() if is_configured(api_config)})
         
         # Check each API configuration
         for api_name, api_config in apis.items():
-            if api_name == "mongodb":
+            if api_name in probes:
+                probe = probes[api_name]
                 api_status[api_name] = {
-                    "configured": bool(api_config.get("connection_string")),
-                    "status": "connected" if api_config.get("connection_string") else "not_configured"
+                    "configured": True,
+                    "status": "connected" if probe["success"] else "unreachable",
+                    "message": probe["message"],
+                    "latency_ms": probe["latency_ms"],
+                    "checked_at": probe["checked_at"]
                 }
-            elif api_name in ["openai", "anthropic", "google"]:
+            elif api_name in PROBES:
+                api_status[api_name] = {"configured": False, "status": "not_configured"}
+            elif api_name in ["anthropic", "google"]:
                 api_status[api_name] = {
                     "configured": bool(api_config.get("api_key")),
                     "status": "configured" if api_config.get("api_key") else "not_configured"
                 }
-            elif api_name in ["stripe", "paypal"]:
-                api_status[api_name] = {
-                    "configured": bool(api_config.get("secret_key") or api_config.get("client_secret")),
-                    "status": "configured" if (api_config.get("secret_key") or api_config.get("client_secret")) else "not_configured"
-                }
         
         return {
             "api_status": api_status,
@@ -349,134 +359,9 @@ async def test_api_connection(
                 detail="Service and config are required"
             )
         
-        result = {"success": False, "message": "Unknown service"}
-        
-        if service == "mongodb":
-            # Test MongoDB connection
-            try:
-                from pymongo import MongoClient
-                client = MongoClient(config.get("connection_string"), serverSelectionTimeoutMS=5000)
-                client.admin.command('ping')
-                db_name = config.get("database_name", "test")
-                db = client[db_name]
-                collections = db.list_collection_names()
-                result = {
-                    "success": True, 
-                    "message": f"Connected successfully. Database: {db_name}, Collections: {len(collections)}"
-                }
-            except Exception as e:
-                result = {"success": False, "message": f"MongoDB connection failed: {str(e)}"}
-        
-        elif service == "google_gemini":
-            # Test Google Gemini API
-            try:
-                import requests
-                api_key = config.get("api_key")
-                if not api_key:
-                    result = {"success": False, "message": "API key is required"}
-                else:
-                    # Test with a simple request
-                    url = f"https://generativelanguage.googleapis.com/v1/models?key={api_key}"
-                    response = requests.get(url, timeout=10)
-                    if response.status_code == 200:
-                        result = {"success": True, "message": "Gemini API connected successfully"}
-                    else:
-                        result = {"success": False, "message": f"Gemini API failed: {response.status_code}"}
-            except Exception as e:
-                result = {"success": False, "message": f"Gemini test failed: {str(e)}"}
-        
-        elif service == "cloudflare_r2":
-            # Test Cloudflare R2 connection
-            try:
-                import boto3
-                from botocore.exceptions import ClientError
-                
-                r2_client = boto3.client(
-                    's3',
-                    endpoint_url=config.get("endpoint_url"),
-                    aws_access_key_id=config.get("access_key_id"),
-                    aws_secret_access_key=config.get("secret_access_key"),
-                    region_name='auto'
-                )
-                
-                # Test by listing buckets or checking bucket
-                bucket_name = config.get("bucket_name")
-                if bucket_name:
-                    r2_client.head_bucket(Bucket=bucket_name)
-                    result = {"success": True, "message": f"R2 bucket '{bucket_name}' accessible"}
-                else:
-                    buckets = r2_client.list_buckets()
-                    result = {"success": True, "message": f"R2 connected. Found {len(buckets['Buckets'])} buckets"}
-                    
-            except Exception as e:
-                result = {"success": False, "message": f"R2 connection failed: {str(e)}"}
-        
-        elif service == "stripe":
-            # Test Stripe API
-            try:
-                import requests
-                secret_key = config.get("secret_key")
-                if not secret_key:
-                    result = {"success": False, "message": "Secret key is required"}
-                else:
-                    headers = {"Authorization": f"Bearer {secret_key}"}
-                    response = requests.get("https://api.stripe.com/v1/balance", headers=headers, timeout=10)
-                    if response.status_code == 200:
-                        result = {"success": True, "message": "Stripe API connected successfully"}
-                    else:
-                        result = {"success": False, "message": f"Stripe API failed: {response.status_code}"}
-            except Exception as e:
-                result = {"success": False, "message": f"Stripe test failed: {str(e)}"}
-        
-        elif service == "paypal":
-            # Test PayPal API
-            try:
-                import requests
-                import base64
-                
-                client_id = config.get("client_id")
-                client_secret = config.get("client_secret")
-                mode = config.get("mode", "sandbox")
-                
-                if not client_id or not client_secret:
-                    result = {"success": False, "message": "Client ID and secret are required"}
-                else:
-                    # Get PayPal access token
-                    base_url = "https://api.sandbox.paypal.com" if mode == "sandbox" else "https://api.paypal.com"
-                    auth_url = f"{base_url}/v1/oauth2/token"
-                    
-                    auth_header = base64.b64encode(f"{client_id}:{client_secret}".encode()).decode()
-                    headers = {
-                        "Authorization": f"Basic {auth_header}",
-                        "Content-Type": "application/x-www-form-urlencoded"
-                    }
-                    data = "grant_type=client_credentials"
-                    
-                    response = requests.post(auth_url, headers=headers, data=data, timeout=10)
-                    if response.status_code == 200:
-                        result = {"success": True, "message": f"PayPal API connected successfully ({mode} mode)"}
-                    else:
-                        result = {"success": False, "message": f"PayPal API failed: {response.status_code}"}
-            except Exception as e:
-                result = {"success": False, "message": f"PayPal test failed: {str(e)}"}
-        
-        elif service == "openai":
-            # Test OpenAI API
-            try:
-                import requests
-                api_key = config.get("api_key")
-                if not api_key:
-                    result = {"success": False, "message": "API key is required"}
-                else:
-                    headers = {"Authorization": f"Bearer {api_key}"}
-                    response = requests.get("https://api.openai.com/v1/models", headers=headers, timeout=10)
-                    if response.status_code == 200:
-                        models = response.json().get("data", [])
-                        result = {"success": True, "message": f"OpenAI API connected. Found {len(models)} models"}
-                    else:
-                        result = {"success": False, "message": f"OpenAI API failed: {response.status_code}"}
-            except Exception as e:
-                result = {"success": False, "message": f"OpenAI test failed: {str(e)}"}
+        # Explicit tests always probe; the dashboard's cached result of the service is dropped
+        clear_probe_cache(service)
+        result = await run_probe(service, config)
         
         # Add to history
         add_to_history(
@@ -551,6 +436,8 @@ async def apply_api_config(
                 os.environ["R2_BUCKET_NAME"] = config.get("bucket_name", "")
                 os.environ["R2_ENDPOINT_URL"] = config.get("endpoint_url", "")
             
+            clear_probe_cache(service)
+            
             # Add to history
             add_to_history(
                 action="API Configuration Applied",
@@ -4,8 +4,9 @@ from backend.auth import get_current_user
 from backend.database import get_database
 from backend.models import UserInDB
 from backend.security import AuditLogger
+from backend.services.index_registry import register_indexes, register_queries
 from datetime import datetime
-import google.generativeai as genai
+from functools import lru_cache
 import os
 import logging
 import json
@@ -17,14 +18,26 @@ from backend.routes.badges import log_ai_message, check_and_award_badges
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ai-assistant", tags=["ai_assistant"])
 
+register_indexes({"chat_history": [([("user_id", 1), ("timestamp", -1)], {})]})
+register_queries(("chat_history", {"user_id": "u"}, [("timestamp", -1)]))
+
 # Configure Gemini API
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-pro')
-else:
+if not GEMINI_API_KEY:
     logger.warning("Gemini API key not configured")
-    model = None
+
+@lru_cache(maxsize=1)
+def get_model():
+    """Gemini model, created on first use (google.generativeai is slow to import)."""
+    if not GEMINI_API_KEY:
+        return None
+    try:
+        import google.generativeai as genai
+    except ModuleNotFoundError:
+        logger.warning("google-generativeai not installed - AI assistant unavailable")
+        return None
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel('gemini-pro')
 
 # Request/Response models
 class ChatMessage(BaseModel):
@@ -120,6 +133,7 @@ async def get_user_context(user_id: str, db):
 
 async def generate_ai_response(message: str, context: Dict, language: str = "en") -> ChatResponse:
     """Generate AI response using Gemini API."""
+    model = get_model()
     if not model:
         return ChatResponse(
             response="AI assistant is currently unavailable. Please try again later.",
@@ -358,6 +372,7 @@ async def get_quick_tips(
     
     if not topic_tips:
         # Generate tips using AI if not predefined
+        model = get_model()
         if model:
             prompt = f"Provide 5 practical tips for medical graduates about {topic} in the context of German medical license (Approbation). Language: {language}"
             try:
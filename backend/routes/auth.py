@@ -2,8 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from datetime import timedelta, datetime
 import secrets
 import json
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from backend.models import (
     UserCreate, UserLogin, Token, UserResponse, MessageResponse,
     ForgotPasswordRequest, ResetPasswordRequest
@@ -16,6 +14,7 @@ from backend.database import get_database
 from backend.models import UserInDB, User
 from backend.security import AuditLogger, validate_email, safe_rate_limit
 from backend.services.email_service import send_password_reset_email, send_welcome_email
+from backend.services.leaderboards import forget_display_name
 
 # Import badge functions for login streak tracking
 from backend.routes.badges import update_login_streak, check_and_award_badges
@@ -23,7 +22,7 @@ from backend.routes.badges import update_login_streak, check_and_award_badges
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=Token)
-@safe_rate_limit("5 per hour")  # Strict rate limit for registration
+@safe_rate_limit("register")  # Strict rate limit for registration
 async def register(
     user_data: UserCreate,
     request: Request,
@@ -101,7 +100,7 @@ async def register(
     )
 
 @router.post("/login", response_model=Token)
-@safe_rate_limit("10 per minute")  # Rate limit for login attempts
+@safe_rate_limit("login")  # Rate limit for login attempts
 async def login(
     login_data: UserLogin,
     request: Request,
@@ -184,6 +183,9 @@ async def google_login(
     db = Depends(get_database)
 ):
     """Login with Google OAuth."""
+    from google.oauth2 import id_token
+    from google.auth.transport import requests
+    
     try:
         # Verify the Google token
         idinfo = id_token.verify_oauth2_token(
@@ -315,6 +317,8 @@ async def update_user_profile(
         {"id": current_user.id},
         {"$set": update_data}
     )
+    if "first_name" in update_data or "last_name" in update_data:
+        await forget_display_name(current_user.id)
     
     # Get updated user
     updated_user = await db.users.find_one({"id": current_user.id})
@@ -380,7 +384,7 @@ async def change_password(
     return MessageResponse(message="Password changed successfully")
 
 @router.post("/forgot-password", response_model=MessageResponse)
-@safe_rate_limit("3 per hour")  # Rate limit for password reset requests
+@safe_rate_limit("password_reset")  # Rate limit for password reset requests
 async def forgot_password(
     request: Request,
     request_data: ForgotPasswordRequest,
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from typing import List, Dict
+from typing import List, Dict, Optional
 from backend.models_billing import AuditLog
 from backend.auth import get_current_user, get_current_admin_user
 from backend.database import get_database
 from backend.models import UserInDB
 from backend.services.backup_service import get_backup_service
+from backend.services.backup_catalog import BackupCatalog
+from backend.services.retention import apply_audit_retention
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/backup", tags=["backup"])
@@ -18,19 +18,16 @@ router = APIRouter(prefix="/backup", tags=["backup"])
 
 async def _create_backup_with_logging(admin_user_id: str):
     """Helper function to create backup and log the action."""
-    # Create a fresh DB connection
-    mongo_url = os.environ['MONGO_URL']
-    db_name = os.environ['DB_NAME']
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[db_name]
+    db = await get_database()
     try:
         backup_result = await get_backup_service().create_database_backup()
+        await BackupCatalog(db).record(backup_result)
         audit_log = AuditLog(
             user_id=admin_user_id,
             action="database_backup_created",
             details={"backup_file": backup_result["filename"]}
         )
-        await db.audit_logs.insert_one(audit_log.dict())
+        await db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         logger.info(f"Background database backup completed: {backup_result['filename']}")
     except Exception as e:
         logger.error(f"Background database backup failed: {str(e)}")
@@ -40,26 +37,23 @@ async def _create_backup_with_logging(admin_user_id: str):
                 action="database_backup_failed",
                 details={"error": str(e)}
             )
-            await db.audit_logs.insert_one(audit_log.dict())
+            await db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         except Exception as log_error:
             logger.error(f"Failed to log backup failure: {str(log_error)}")
-    finally:
-        client.close()
 
 async def _create_files_backup_with_logging(admin_user_id: str):
     """Helper function to create files backup and log the action."""
-    mongo_url = os.environ['MONGO_URL']
-    db_name = os.environ['DB_NAME']
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[db_name]
+    db = await get_database()
     try:
         backup_result = await get_backup_service().create_files_backup()
+        if backup_result.get("filename"):
+            await BackupCatalog(db).record(backup_result)
         audit_log = AuditLog(
             user_id=admin_user_id,
             action="files_backup_created",
             details={"backup_file": backup_result.get("filename", "none")}
         )
-        await db.audit_logs.insert_one(audit_log.dict())
+        await db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         logger.info(f"Background files backup completed: {backup_result.get('filename', 'none')}")
     except Exception as e:
         logger.error(f"Background files backup failed: {str(e)}")
@@ -69,11 +63,9 @@ async def _create_files_backup_with_logging(admin_user_id: str):
                 action="files_backup_failed",
                 details={"error": str(e)}
             )
-            await db.audit_logs.insert_one(audit_log.dict())
+            await db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         except Exception as log_error:
             logger.error(f"Failed to log files backup failure: {str(log_error)}")
-    finally:
-        client.close()
 
 # Update background_tasks.add_task calls
 @router.post("/database")
@@ -110,12 +102,13 @@ async def create_files_backup(
 
 @router.get("/status")
 async def get_backup_status(
-    admin_user: UserInDB = Depends(get_current_admin_user)
+    admin_user: UserInDB = Depends(get_current_admin_user),
+    db = Depends(get_database)
 ):
     """Get backup status and list of available backups."""
     
     try:
-        return await get_backup_service().get_backup_status()
+        return await get_backup_service().get_backup_status(BackupCatalog(db))
         
     except Exception as e:
         logger.error(f"Failed to get backup status: {str(e)}")
@@ -141,7 +134,7 @@ async def restore_database(
             action="database_restored",
             details={"backup_file": backup_filename}
         )
-        await db.audit_logs.insert_one(audit_log.dict())
+        await db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         
         return restore_result
         
@@ -154,14 +147,14 @@ async def restore_database(
 
 @router.post("/cleanup")
 async def cleanup_old_backups(
-    keep_days: int = 30,
+    keep_days: Optional[int] = None,
     admin_user: UserInDB = Depends(get_current_admin_user),
     db = Depends(get_database)
 ):
-    """Clean up old backup files."""
+    """Clean up old backups. Applies the GFS retention policy unless keep_days is given."""
     
     try:
-        cleanup_result = await get_backup_service().cleanup_old_backups(keep_days)
+        cleanup_result = await get_backup_service().cleanup_old_backups(BackupCatalog(db), keep_days)
         
         # Log admin action
         audit_log = AuditLog(
@@ -169,7 +162,7 @@ async def cleanup_old_backups(
             action="backup_cleanup",
             details={"deleted_count": cleanup_result["deleted_count"], "keep_days": keep_days}
         )
-        await db.audit_logs.insert_one(audit_log.dict())
+        await db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         
         return cleanup_result
         
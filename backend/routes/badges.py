@@ -5,6 +5,8 @@ from backend.models import (
 )
 from backend.auth import get_current_user
 from backend.database import get_database
+from backend.services.retention import activity_expires_at, backfill_activity_counts
+from backend.services.query_budget import query_budget
 from datetime import datetime, timedelta
 import asyncio
 
@@ -259,29 +261,16 @@ async def get_user_progress_stats(db, user_id: str) -> Dict[str, Any]:
         await db.user_stats.insert_one(default_stats.dict())
         user_stats = default_stats.dict()
     
-    # Get AI messages sent from activity tracking
-    messages_count = await db.user_activity.count_documents({
-        "user_id": user_id,
-        "activity_type": "ai_message"
-    })
-    
-    # Get emails generated from activity tracking
-    emails_count = await db.user_activity.count_documents({
-        "user_id": user_id,
-        "activity_type": "email_generated"
-    })
-    
-    # Get searches performed from activity tracking
-    searches_count = await db.user_activity.count_documents({
-        "user_id": user_id,
-        "activity_type": "search"
-    })
+    # Activity counters are kept on user_stats; raw user_activity entries expire
+    if user_stats.get("activity_counts_backfilled"):
+        activity_counts = user_stats.get("activity_counts", {})
+    else:
+        activity_counts = await backfill_activity_counts(db, user_id)
     
-    # Get feedback submitted from activity tracking
-    feedback_count = await db.user_activity.count_documents({
-        "user_id": user_id,
-        "activity_type": "feedback"
-    })
+    messages_count = activity_counts.get("ai_message", 0)
+    emails_count = activity_counts.get("email_generated", 0)
+    searches_count = activity_counts.get("search", 0)
+    feedback_count = activity_counts.get("feedback", 0)
     
     # Get login streak
     streak_data = await db.user_login_streak.find_one({"user_id": user_id})
@@ -327,16 +316,10 @@ async def get_user_progress_stats(db, user_id: str) -> Dict[str, Any]:
     facebook_groups_joined = user_stats.get("facebook_groups_joined", 0)
     
     # Get Länder applications (if you have application tracking)
-    lander_applications = await db.user_activity.count_documents({
-        "user_id": user_id,
-        "activity_type": "lander_application"
-    })
+    lander_applications = activity_counts.get("lander_application", 0)
     
     # Get FSP simulations passed (if you have FSP simulation system)
-    fsp_simulations_passed = await db.user_activity.count_documents({
-        "user_id": user_id,
-        "activity_type": "fsp_simulation_passed"
-    })
+    fsp_simulations_passed = activity_counts.get("fsp_simulation_passed", 0)
     
     return {
         "documents_uploaded": documents_count,
@@ -487,6 +470,7 @@ async def check_badges(
     }
 
 @router.get("/leaderboard", response_model=List[Dict[str, Any]])
+@query_budget(5)
 async def get_badge_leaderboard(
     limit: int = 10,
     current_user: UserInDB = Depends(get_current_user),
@@ -512,20 +496,36 @@ async def get_badge_leaderboard(
     
     leaderboard_data = await db.user_badges.aggregate(pipeline).to_list(length=None)
     
-    # Get user details and top badges
+    user_ids = [entry["_id"] for entry in leaderboard_data]
+    
+    # User details, each user's 3 most recent badges and the badge details: one query each
+    users = {
+        user["id"]: user async for user in db.users.find(
+            {"id": {"$in": user_ids}}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "email": 1}
+        )
+    }
+    recent_badges = {
+        row["_id"]: row["badges"] async for row in db.user_badges.aggregate([
+            {"$match": {"user_id": {"$in": user_ids}}},
+            {"$sort": {"awarded_at": -1}},
+            {"$group": {"_id": "$user_id", "badges": {"$push": {"badge_id": "$badge_id", "awarded_at": "$awarded_at"}}}},
+            {"$project": {"badges": {"$slice": ["$badges", 3]}}}
+        ])
+    }
+    badge_ids = list({ub["badge_id"] for badges in recent_badges.values() for ub in badges})
+    badges = {
+        badge["badge_id"]: badge async for badge in db.badges.find(
+            {"badge_id": {"$in": badge_ids}}, {"_id": 0, "badge_id": 1, "name": 1, "icon": 1}
+        )
+    }
+    
     result = []
     for entry in leaderboard_data:
-        user_data = await db.users.find_one({"id": entry["_id"]})
+        user_data = users.get(entry["_id"])
         if user_data:
-            # Get user's top 3 most recent badges
-            user_badges = await db.user_badges.find(
-                {"user_id": entry["_id"]}
-            ).sort("awarded_at", -1).limit(3).to_list(length=None)
-            
-            # Get badge details
             top_badges = []
-            for ub in user_badges:
-                badge_data = await db.badges.find_one({"badge_id": ub["badge_id"]})
+            for ub in recent_badges.get(entry["_id"], []):
+                badge_data = badges.get(ub["badge_id"])
                 if badge_data:
                     top_badges.append({
                         "badge_id": badge_data["badge_id"],
@@ -554,7 +554,13 @@ async def log_user_activity(db, user_id: str, activity_type: str, activity_data:
         activity_type=activity_type,
         activity_data=activity_data or {}
     )
+    activity.expires_at = activity_expires_at(activity.created_at)
     await db.user_activity.insert_one(activity.dict())
+    await db.user_stats.update_one(
+        {"user_id": user_id},
+        {"$inc": {f"activity_counts.{activity_type}": 1}},
+        upsert=True
+    )
 
 async def update_login_streak(db, user_id: str):
     """Update user's login streak and return current streak count."""
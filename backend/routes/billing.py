@@ -8,7 +8,7 @@ from backend.auth import get_current_user
 from backend.database import get_database
 from backend.models import UserInDB
 from backend.services.stripe_service import get_stripe_service
-from backend.security import safe_rate_limit
+from backend.security import safe_rate_limit, AuditLogger
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +20,7 @@ async def get_subscription_plans():
     return await get_stripe_service().get_subscription_plans()
 
 @router.post("/checkout", response_model=CheckoutSessionResponse)
-@safe_rate_limit("5 per hour")  # Rate limit for checkout sessions to prevent abuse
+@safe_rate_limit("checkout")  # Rate limit for checkout sessions to prevent abuse
 async def create_checkout_session(
     request: Request,
     checkout_data: CheckoutSessionCreate,
@@ -57,7 +57,7 @@ async def create_checkout_session(
             ip_address=request.client.host,
             user_agent=request.headers.get("user-agent")
         )
-        await db.audit_logs.insert_one(audit_log.dict())
+        await AuditLogger(db).write_entry(audit_log.dict())
         
         return CheckoutSessionResponse(**session_data)
         
@@ -134,7 +134,7 @@ async def cancel_subscription(
             ip_address=request.client.host,
             user_agent=request.headers.get("user-agent")
         )
-        await db.audit_logs.insert_one(audit_log.dict())
+        await AuditLogger(db).write_entry(audit_log.dict())
         
         return {"message": "Subscription cancelled successfully"}
         
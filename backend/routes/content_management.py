@@ -2,7 +2,8 @@
 Content Management API Routes
 Admin routes for editing node content with preview system
 """
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 import os
 import aiofiles
@@ -11,17 +12,28 @@ import json
 import shutil
 import mimetypes
 import uuid
+import asyncio
 
 from backend.models_content import (
     NodeContent, NodeContentCreate, NodeContentUpdate, NodeContentResponse,
     ContentBlock, ContentBlockCreate, ContentBlockUpdate,
-    NodeContentVersion, ContentPreview, PreviewRequest, PublishRequest,
+    ContentPreview, PreviewRequest, PublishRequest,
     UploadedFile, FileUploadRequest, ContentTemplate,
-    ContentStats, ContentUpdateNotification, ContentListResponse
+    ContentUpdateNotification, ContentListResponse
+)
+from backend.auth import (
+    STREAM_TOKEN_EXPIRE_SECONDS, create_stream_token, get_current_admin_user,
+    get_current_user, get_current_user_for_stream
 )
-from backend.auth import get_current_admin_user
 from backend.database import get_database
 from backend.models import UserInDB
+from backend.services.content_versions import ContentVersionStore
+from backend.services import content_cache
+from backend.services.query_budget import query_budget
+from backend.middleware.security_headers import DOWNLOAD_CSP, content_security_policy
+from backend.services.notification_hub import (
+    format_sse, get_missed_notifications, notification_hub, publish_content_notification
+)
 
 router = APIRouter(prefix="/content", tags=["content-management"])
 
@@ -63,7 +75,42 @@ def validate_file_upload(file: UploadFile) -> bool:
     return ext in all_allowed
 
 # Content CRUD Operations
+def _content_enrichment_stages() -> List[Dict[str, Any]]:
+    """Join preview flag and stats onto node_content documents; version_count is stored on the document."""
+    return [
+        {"$lookup": {
+            "from": "content_previews",
+            "let": {"content_id": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$content_id", "$$content_id"]},
+                    {"$gt": ["$expires_at", datetime.utcnow()]}
+                ]}}},
+                {"$limit": 1},
+                {"$project": {"_id": 1}}
+            ],
+            "as": "_previews"
+        }},
+        {"$lookup": {
+            "from": "content_stats",
+            "let": {"content_id": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$content_id", "$$content_id"]}}},
+                {"$limit": 1},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "_stats"
+        }},
+        {"$addFields": {
+            "version_count": {"$ifNull": ["$version_count", 0]},
+            "has_preview": {"$gt": [{"$size": "$_previews"}, 0]},
+            "stats": {"$arrayElemAt": ["$_stats", 0]}
+        }},
+        {"$project": {"_id": 0, "_previews": 0, "_stats": 0}}
+    ]
+
 @router.get("/nodes", response_model=ContentListResponse)
+@query_budget(2)
 async def get_all_node_content(
     page: int = 1,
     per_page: int = 20,
@@ -72,7 +119,7 @@ async def get_all_node_content(
     admin_user: UserInDB = Depends(get_current_admin_user),
     db = Depends(get_database)
 ):
-    """Get all node content with pagination and filtering"""
+    """Get all node content with pagination and filtering (one aggregation per page)"""
     try:
         skip = (page - 1) * per_page
         query = {}
@@ -81,44 +128,22 @@ async def get_all_node_content(
             query["node_type"] = node_type
             
         if search:
-            query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}}
-            ]
-        
-        # Get total count
-        total = await db.node_content.count_documents(query)
-        
-        # Get content with pagination
-        cursor = db.node_content.find(query).skip(skip).limit(per_page).sort("created_at", -1)
-        contents_data = await cursor.to_list(per_page)
-        
-        # Enhance with additional data
-        enhanced_contents = []
-        for content_data in contents_data:
-            # Get version count
-            version_count = await db.content_versions.count_documents({"content_id": content_data["id"]})
-            
-            # Check for preview
-            has_preview = await db.content_previews.count_documents({
-                "content_id": content_data["id"],
-                "expires_at": {"$gt": datetime.utcnow()}
-            }) > 0
-            
-            # Get stats
-            stats_data = await db.content_stats.find_one({"content_id": content_data["id"]})
-            stats = ContentStats(**stats_data) if stats_data else None
-            
-            content_response = NodeContentResponse(
-                **content_data,
-                version_count=version_count,
-                has_preview=has_preview,
-                stats=stats
-            )
-            enhanced_contents.append(content_response)
+            # Word search on the node_content text index (title, description)
+            query["$text"] = {"$search": search}
+        
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"created_at": -1}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "contents": [{"$skip": skip}, {"$limit": per_page}, *_content_enrichment_stages()]
+            }}
+        ]
+        result = (await db.node_content.aggregate(pipeline).to_list(1))[0]
+        total = result["total"][0]["count"] if result["total"] else 0
         
         return ContentListResponse(
-            contents=enhanced_contents,
+            contents=[NodeContentResponse(**content) for content in result["contents"]],
             total=total,
             page=page,
             per_page=per_page,
@@ -140,9 +165,13 @@ async def get_node_content(
 ):
     """Get content for a specific node"""
     try:
-        content_data = await db.node_content.find_one({"node_id": node_id})
+        enriched = await db.node_content.aggregate([
+            {"$match": {"node_id": node_id}},
+            {"$limit": 1},
+            *_content_enrichment_stages()
+        ]).to_list(1)
         
-        if not content_data:
+        if not enriched:
             # Create default content structure if none exists
             default_content = NodeContent(
                 node_id=node_id,
@@ -155,24 +184,9 @@ async def get_node_content(
             )
             
             await db.node_content.insert_one(default_content.dict())
-            content_data = default_content.dict()
+            return NodeContentResponse(**default_content.dict())
         
-        # Get additional data
-        version_count = await db.content_versions.count_documents({"content_id": content_data["id"]})
-        has_preview = await db.content_previews.count_documents({
-            "content_id": content_data["id"],
-            "expires_at": {"$gt": datetime.utcnow()}
-        }) > 0
-        
-        stats_data = await db.content_stats.find_one({"content_id": content_data["id"]})
-        stats = ContentStats(**stats_data) if stats_data else None
-        
-        return NodeContentResponse(
-            **content_data,
-            version_count=version_count,
-            has_preview=has_preview,
-            stats=stats
-        )
+        return NodeContentResponse(**enriched[0])
         
     except Exception as e:
         raise HTTPException(
@@ -180,6 +194,28 @@ async def get_node_content(
             detail=f"Error fetching node content: {str(e)}"
         )
 
+@router.get("/public/nodes/{node_id}")
+async def get_public_node_content(
+    node_id: str,
+    request: Request,
+    db = Depends(get_database)
+):
+    """Published public content for a node (no auth, cached, ETag/304 aware)"""
+    async def load():
+        return await db.node_content.find_one(
+            {"node_id": node_id, "is_published": True, "access_level": "public"},
+            {"_id": 0, "id": 1, "node_id": 1, "node_type": 1, "title": 1, "description": 1,
+             "blocks": 1, "layout": 1, "version": 1, "updated_at": 1}
+        )
+    
+    cached = await content_cache.get_or_load(await content_cache.node_key(node_id), load)
+    if cached is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Node content not found"
+        )
+    return content_cache.cached_response(request, *cached)
+
 @router.put("/nodes/{node_id}")
 async def update_node_content(
     node_id: str,
@@ -198,13 +234,7 @@ async def update_node_content(
             )
         
         # Create version backup before update
-        version = NodeContentVersion(
-            content_id=existing_content["id"],
-            version_number=existing_content.get("version", 1),
-            content_snapshot=NodeContent(**existing_content),
-            changed_by=admin_user.id
-        )
-        await db.content_versions.insert_one(version.dict())
+        await ContentVersionStore(db).record(existing_content, changed_by=admin_user.id)
         
         # Prepare update data
         update_data = content_update.dict(exclude_unset=True)
@@ -219,6 +249,7 @@ async def update_node_content(
             {"node_id": node_id},
             {"$set": update_data}
         )
+        await content_cache.invalidate_node(node_id)
         
         # Send real-time notification
         notification = ContentUpdateNotification(
@@ -227,7 +258,7 @@ async def update_node_content(
             update_type="updated",
             updated_by=admin_user.email
         )
-        await db.content_notifications.insert_one(notification.dict())
+        await publish_content_notification(db, notification.dict())
         
         return {"message": "Content updated successfully", "version": update_data["version"]}
         
@@ -340,14 +371,11 @@ async def publish_preview(
         current_content = await db.node_content.find_one({"id": content_id})
         
         # Create version backup
-        version = NodeContentVersion(
-            content_id=content_id,
-            version_number=current_content.get("version", 1),
-            content_snapshot=NodeContent(**current_content),
-            change_description=publish_request.change_description,
-            changed_by=admin_user.id
+        await ContentVersionStore(db).record(
+            current_content,
+            changed_by=admin_user.id,
+            change_description=publish_request.change_description
         )
-        await db.content_versions.insert_one(version.dict())
         
         # Publish preview content
         preview_content_dict = preview.preview_content.dict()
@@ -360,6 +388,7 @@ async def publish_preview(
             {"id": content_id},
             {"$set": preview_content_dict}
         )
+        await content_cache.invalidate_node(current_content["node_id"])
         
         # Clean up preview
         await db.content_previews.delete_one({"id": preview_id})
@@ -372,7 +401,7 @@ async def publish_preview(
             updated_by=admin_user.email,
             changes_summary=publish_request.change_description
         )
-        await db.content_notifications.insert_one(notification.dict())
+        await publish_content_notification(db, notification.dict())
         
         return {
             "message": "Preview published successfully",
@@ -465,6 +494,7 @@ async def upload_file(
         )
 
 @router.get("/files/{file_id}")
+@content_security_policy(DOWNLOAD_CSP)
 async def serve_file(
     file_id: str,
     db = Depends(get_database)
@@ -520,14 +550,10 @@ async def get_content_versions(
         
         skip = (page - 1) * per_page
         
-        cursor = db.content_versions.find(
-            {"content_id": content_data["id"]}
-        ).skip(skip).limit(per_page).sort("changed_at", -1)
-        
-        versions_data = await cursor.to_list(per_page)
-        total = await db.content_versions.count_documents({"content_id": content_data["id"]})
-        
-        versions = [NodeContentVersion(**v) for v in versions_data]
+        # Metadata only (covered by the listing index); snapshots are rebuilt on revert
+        version_store = ContentVersionStore(db)
+        versions = await version_store.list_versions(content_data["id"], skip=skip, limit=per_page)
+        total = await version_store.count(content_data["id"])
         
         return {
             "versions": versions,
@@ -561,30 +587,24 @@ async def revert_to_version(
                 detail="Node content not found"
             )
         
-        # Find the version to revert to
-        version_data = await db.content_versions.find_one({
-            "content_id": content_data["id"],
-            "version_number": version_number
-        })
+        # Rebuild the version to revert to
+        version_store = ContentVersionStore(db)
+        revert_content = await version_store.get_snapshot(content_data["id"], version_number)
         
-        if not version_data:
+        if not revert_content:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Version not found"
             )
         
         # Create backup of current version
-        current_version = NodeContentVersion(
-            content_id=content_data["id"],
-            version_number=content_data.get("version", 1),
-            content_snapshot=NodeContent(**content_data),
-            change_description=f"Backup before revert to version {version_number}",
-            changed_by=admin_user.id
+        await version_store.record(
+            content_data,
+            changed_by=admin_user.id,
+            change_description=f"Backup before revert to version {version_number}"
         )
-        await db.content_versions.insert_one(current_version.dict())
         
         # Revert to selected version
-        revert_content = version_data["content_snapshot"]
         revert_content["version"] = content_data.get("version", 1) + 1
         revert_content["updated_by"] = admin_user.id
         revert_content["updated_at"] = datetime.utcnow()
@@ -593,6 +613,7 @@ async def revert_to_version(
             {"node_id": node_id},
             {"$set": revert_content}
         )
+        await content_cache.invalidate_node(node_id)
         
         # Send notification
         notification = ContentUpdateNotification(
@@ -602,7 +623,7 @@ async def revert_to_version(
             updated_by=admin_user.email,
             changes_summary=f"Reverted to version {version_number}"
         )
-        await db.content_notifications.insert_one(notification.dict())
+        await publish_content_notification(db, notification.dict())
         
         return {
             "message": f"Content reverted to version {version_number}",
@@ -616,6 +637,57 @@ async def revert_to_version(
         )
 
 # Real-time notifications endpoint
+SSE_KEEPALIVE_SECONDS = 15
+
+@router.post("/notifications/stream-token")
+async def issue_notification_stream_token(user: UserInDB = Depends(get_current_user)):
+    """Short-lived token for opening /notifications/stream from an EventSource"""
+    return {"stream_token": create_stream_token(user.id), "expires_in": STREAM_TOKEN_EXPIRE_SECONDS}
+
+@router.get("/notifications/stream")
+async def stream_content_notifications(
+    request: Request,
+    last_event_id: Optional[int] = None,
+    user: UserInDB = Depends(get_current_user_for_stream),
+    db = Depends(get_database)
+):
+    """Push content update notifications as Server-Sent Events.
+    
+    Reconnecting clients send Last-Event-ID (or ``last_event_id``) and first
+    receive the buffered notifications they missed.
+    """
+    header_id = request.headers.get("last-event-id", "")
+    last_seq = int(header_id) if header_id.isdigit() else (last_event_id or 0)
+    include_author = user.is_admin
+    
+    async def events():
+        nonlocal last_seq
+        # The subscription is confirmed before the buffer is read, so nothing falls in between
+        async with notification_hub.subscribe() as queue:
+            yield "retry: 5000\n\n"
+            if last_seq:
+                for notification in await get_missed_notifications(db, last_seq):
+                    last_seq = notification["seq"]
+                    yield format_sse(notification, include_author)
+            
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                notification = json.loads(message)
+                if notification["seq"] <= last_seq:
+                    continue
+                last_seq = notification["seq"]
+                yield format_sse(notification, include_author)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/notifications")
 async def get_content_notifications(
     since: Optional[datetime] = None,
@@ -623,7 +695,7 @@ async def get_content_notifications(
     admin_user: UserInDB = Depends(get_current_admin_user),
     db = Depends(get_database)
 ):
-    """Get content update notifications for real-time updates"""
+    """Get buffered content update notifications (prefer /notifications/stream)"""
     try:
         query = {}
         if since:
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import Dict, List
 from backend.models import UserInDB
 from backend.auth import get_current_user, get_current_admin_user
@@ -179,44 +180,27 @@ async def toggle_feature_flag(
 async def export_user_data(
     current_user: UserInDB = Depends(get_current_user)
 ):
-    """Export user's data for GDPR compliance."""
+    """Export user's data for GDPR compliance.
+    
+    The JSON document is streamed straight from the database cursors. The
+    complete archive, including uploaded files, is built by /gdpr/export-data.
+    """
     
     from ..database import get_database
+    from ..services.data_export import iter_json_export
     db = await get_database()
     
-    # Collect all user data
-    user_data = {
-        "user_profile": {
-            "id": current_user.id,
-            "email": current_user.email,
-            "created_at": current_user.created_at.isoformat(),
-            "subscription_tier": current_user.subscription_tier
-        },
-        "personal_files": [],
-        "progress": None,
-        "transactions": []
+    user_profile = {
+        "id": current_user.id,
+        "email": current_user.email,
+        "created_at": current_user.created_at.isoformat(),
+        "subscription_tier": current_user.subscription_tier
     }
     
-    # Get personal files
-    files_cursor = db.personal_files.find({"user_id": current_user.id})
-    files_data = await files_cursor.to_list(1000)
-    user_data["personal_files"] = files_data
-    
-    # Get progress data
-    progress_data = await db.user_progress.find_one({"user_id": current_user.id})
-    if progress_data:
-        user_data["progress"] = progress_data
-    
-    # Get transaction history
-    transactions_cursor = db.payment_transactions.find({"user_id": current_user.id})
-    transactions_data = await transactions_cursor.to_list(1000)
-    user_data["transactions"] = transactions_data
-    
-    return {
-        "message": "User data exported successfully",
-        "export_date": datetime.utcnow().isoformat(),
-        "data": user_data
-    }
+    return StreamingResponse(
+        iter_json_export(db, user_profile, current_user.id),
+        media_type="application/json"
+    )
 
 @router.delete("/delete-account")
 async def delete_user_account(
@@ -225,19 +209,12 @@ async def delete_user_account(
     """Delete user account and all associated data (GDPR compliance)."""
     
     from ..database import get_database
+    from ..services.account_deletion import AccountDeletionEngine
     db = await get_database()
     
     try:
-        # Delete user data in order
-        await db.personal_files.delete_many({"user_id": current_user.id})
-        await db.user_progress.delete_many({"user_id": current_user.id})
-        await db.payment_transactions.update_many(
-            {"user_id": current_user.id},
-            {"$set": {"user_id": None, "email": "deleted_user@example.com"}}
-        )
-        
-        # Delete user account
-        await db.users.delete_one({"id": current_user.id})
+        # Delete user data, uploaded files and the account itself
+        await AccountDeletionEngine(db).purge_users([current_user.id])
         
         logger.info(f"User account deleted: {current_user.email}")
         
@@ -5,12 +5,18 @@ from backend.auth import get_current_user
 from backend.database import get_database
 from backend.models import UserInDB
 from backend.security import AuditLogger
+from backend.services import content_cache
+from backend.services.index_registry import register_indexes, register_queries
 from datetime import datetime, timedelta
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+register_indexes({"util_info_documents": [([("is_active", 1), ("order_priority", 1)], {})]})
+register_queries(("util_info_documents", {"is_active": True}, [("order_priority", 1)]))
+
 # Add import for the new model
 from backend.models import UtilInfoDocument
 
@@ -488,54 +494,77 @@ async def verify_document(
     
     return {"message": "Document verified successfully", "status": "verified"}
 
+async def load_util_info_categories(db):
+    """Cached (body, etag) of the active util-info categories with their counts."""
+    
+    async def load():
+        pipeline = [
+            {"$match": {"is_active": True}},
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+            {"$sort": {"_id": 1}}
+        ]
+        
+        categories_cursor = db.util_info_documents.aggregate(pipeline)
+        categories_data = await categories_cursor.to_list(None)
+        
+        return [{"category": cat["_id"], "count": cat["count"]} for cat in categories_data]
+    
+    return await content_cache.get_or_load(await content_cache.util_info_key("categories"), load)
+
 @router.get("/util-info")
 async def get_public_util_info_docs(
+    request: Request,
     category: Optional[str] = None,
     db = Depends(get_database)
 ):
-    """Get public utility information documents (no auth required)."""
+    """Get public utility information documents (no auth required, cacheable)."""
     
-    query = {"is_active": True}
     if category:
-        query["category"] = category
-    
-    docs_cursor = db.util_info_documents.find(query).sort("order_priority", 1)
-    docs_data = await docs_cursor.to_list(None)
-    
-    # Transform for public consumption (hide admin fields)
-    public_docs = []
-    for doc_data in docs_data:
-        public_doc = {
-            "id": doc_data["id"],
-            "title": doc_data["title"],
-            "description": doc_data.get("description"),
-            "category": doc_data["category"],
-            "content_type": doc_data["content_type"],
-            "external_url": doc_data.get("external_url"),
-            "rich_content": doc_data.get("rich_content"),
-            "icon_emoji": doc_data.get("icon_emoji"),
-            "color_theme": doc_data.get("color_theme"),
-            "order_priority": doc_data.get("order_priority", 0)
-        }
-        # Include file download URL if it's a file type
-        if doc_data.get("file_id"):
-            public_doc["download_url"] = f"/api/files/download/{doc_data['file_id']}"
+        # Only known categories get a cache entry; anything else has no documents
+        categories_body, _ = await load_util_info_categories(db)
+        if category not in {cat["category"] for cat in json.loads(categories_body)}:
+            body, etag = content_cache.render([])
+            return content_cache.cached_response(request, body, etag)
+    
+    async def load():
+        query = {"is_active": True}
+        if category:
+            query["category"] = category
         
-        public_docs.append(public_doc)
+        docs_cursor = db.util_info_documents.find(query).sort("order_priority", 1)
+        docs_data = await docs_cursor.to_list(None)
+        
+        # Transform for public consumption (hide admin fields)
+        public_docs = []
+        for doc_data in docs_data:
+            public_doc = {
+                "id": doc_data["id"],
+                "title": doc_data["title"],
+                "description": doc_data.get("description"),
+                "category": doc_data["category"],
+                "content_type": doc_data["content_type"],
+                "external_url": doc_data.get("external_url"),
+                "rich_content": doc_data.get("rich_content"),
+                "icon_emoji": doc_data.get("icon_emoji"),
+                "color_theme": doc_data.get("color_theme"),
+                "order_priority": doc_data.get("order_priority", 0)
+            }
+            # Include file download URL if it's a file type
+            if doc_data.get("file_id"):
+                public_doc["download_url"] = f"/api/files/download/{doc_data['file_id']}"
+            
+            public_docs.append(public_doc)
+        
+        return public_docs
     
-    return public_docs
+    body, etag = await content_cache.get_or_load(
+        await content_cache.util_info_key(f"docs:{category or '*'}"), load
+    )
+    return content_cache.cached_response(request, body, etag)
 
 @router.get("/util-info/categories")
-async def get_util_info_categories(db = Depends(get_database)):
-    """Get all available categories for utility information documents."""
-    
-    pipeline = [
-        {"$match": {"is_active": True}},
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"_id": 1}}
-    ]
-    
-    categories_cursor = db.util_info_documents.aggregate(pipeline)
-    categories_data = await categories_cursor.to_list(None)
+async def get_util_info_categories(request: Request, db = Depends(get_database)):
+    """Get all available categories for utility information documents (cacheable)."""
     
-    return [{"category": cat["_id"], "count": cat["count"]} for cat in categories_data]
\ No newline at end of file
+    body, etag = await load_util_info_categories(db)
+    return content_cache.cached_response(request, body, etag)
\ No newline at end of file
@@ -5,6 +5,7 @@ from backend.models import PersonalFileCreate, PersonalFileResponse, MessageResp
 from backend.auth import get_current_user
 from backend.database import get_database
 from backend.models import UserInDB
+from backend.middleware.security_headers import DOWNLOAD_CSP, content_security_policy
 from backend.security import (
     sanitize_filename, validate_file_type, check_file_size, 
     get_allowed_file_types, AuditLogger, safe_rate_limit
@@ -189,7 +190,7 @@ async def create_personal_file(
     return PersonalFileResponse(**personal_file.dict())
 
 @router.post("/upload", response_model=PersonalFileResponse)
-@safe_rate_limit("20 per hour")  # Rate limit for file uploads
+@safe_rate_limit("upload")  # Rate limit for file uploads
 async def upload_file(
     request: Request,
     file: UploadFile = File(...),
@@ -429,6 +430,7 @@ async def sync_local_files(
     return MessageResponse(message=f"Synced {synced_count} files successfully")
 
 @router.get("/download/{file_id}")
+@content_security_policy(DOWNLOAD_CSP)
 async def download_file(
     file_id: str, 
     current_user: UserInDB = Depends(get_current_user), 
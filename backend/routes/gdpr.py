@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from datetime import datetime, timedelta
-import json
+from bson import ObjectId
 import os
+import logging
 from typing import Optional
 from backend.auth import get_current_user
+from backend.models import UserInDB
+from backend.security import AuditLogger
+from backend.services.account_deletion import AccountDeletionEngine
+from backend.services.data_export import EXCLUDED_FIELDS, EXPORT_TTL_DAYS, iter_s3_archive
 from .models_gdpr import GDPRConsent, DataExportRequest, DataDeletionRequest, PrivacySettings, PRIVACY_POLICY, TERMS_OF_SERVICE
 from backend.database import get_database
-import zipfile
-import io
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/gdpr", tags=["GDPR & Legal"])
 
 @router.get("/privacy-policy")
@@ -63,77 +68,140 @@ async def record_consent(
     
     return {"message": "Consent recorded successfully", "consent_id": str(consent.consent_date)}
 
+# Collections shown inline by /my-data; the full set is in the export archive
+MY_DATA_COLLECTIONS = (
+    ("progress", "user_progress"),
+    ("personal_files", "personal_files"),
+    ("subscriptions", "subscriptions"),
+    ("payment_history", "payment_transactions"),
+    ("gdpr_consents", "gdpr_consents"),
+    ("audit_logs", "audit_logs"),
+)
+MY_DATA_LIMIT = 100
+
 @router.get("/my-data")
-async def get_user_data(user: dict = Depends(get_current_user)):
-    """Get all user data for GDPR data access request"""
+async def get_user_data(user: UserInDB = Depends(get_current_user)):
+    """Get an overview of user data for GDPR data access request.
+    
+    Each collection returns at most MY_DATA_LIMIT entries (newest first) and is
+    listed under ``truncated`` when there is more; the complete data is
+    available through /export-data.
+    """
     db = await get_database()
     
-    # Collect all user data
     user_data = {
-        "user_info": await db.users.find_one({"user_id": user["user_id"]}, {"_id": 0}),
-        "progress": await db.user_progress.find({"user_id": user["user_id"]}, {"_id": 0}).to_list(length=None),
-        "personal_files": await db.personal_files.find({"user_id": user["user_id"]}, {"_id": 0}).to_list(length=None),
-        "subscriptions": await db.subscriptions.find({"user_id": user["user_id"]}, {"_id": 0}).to_list(length=None),
-        "payment_history": await db.payment_transactions.find({"user_id": user["user_id"]}, {"_id": 0}).to_list(length=None),
-        "gdpr_consents": await db.gdpr_consents.find({"user_id": user["user_id"]}, {"_id": 0}).to_list(length=None),
-        "audit_logs": await db.audit_logs.find({"user_id": user["user_id"]}, {"_id": 0}).to_list(length=None)
+        "user_info": await db.users.find_one({"id": user.id}, EXCLUDED_FIELDS),
+        "truncated": [],
+        "full_export": "/api/gdpr/export-data"
     }
+    for key, collection in MY_DATA_COLLECTIONS:
+        docs = await db[collection].find({"user_id": user.id}, EXCLUDED_FIELDS).sort("_id", -1).to_list(length=MY_DATA_LIMIT + 1)
+        if len(docs) > MY_DATA_LIMIT:
+            user_data["truncated"].append(key)
+        user_data[key] = docs[:MY_DATA_LIMIT]
     
     return user_data
 
 @router.post("/export-data")
-async def request_data_export(user: dict = Depends(get_current_user)):
-    """Request complete data export (GDPR Article 20)"""
+async def request_data_export(user: UserInDB = Depends(get_current_user)):
+    """Request complete data export (GDPR Article 20)
+    
+    The archive is built by a background job; poll /export-data/{request_id}
+    for progress and download it from /download-export/{request_id}.
+    """
     db = await get_database()
     
     # Check for existing pending requests
     existing = await db.data_export_requests.find_one({
-        "user_id": user["user_id"],
+        "user_id": user.id,
         "status": {"$in": ["pending", "processing"]}
     })
     
     if existing:
-        return {"message": "Export request already in progress", "request_id": existing["_id"]}
+        return {"message": "Export request already in progress", "request_id": str(existing["_id"])}
     
     # Create new export request
     export_request = DataExportRequest(
-        user_id=user["user_id"],
+        user_id=user.id,
         request_date=datetime.utcnow(),
         status="pending"
     )
     
     result = await db.data_export_requests.insert_one(export_request.dict())
+    request_id = str(result.inserted_id)
     
-    # In a real app, you'd trigger an async job to prepare the export
-    # For now, we'll simulate immediate processing
-    user_data = await get_user_data(user)
-    
-    # Create ZIP file with all user data
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-        zip_file.writestr("user_data.json", json.dumps(user_data, indent=2, default=str))
-        zip_file.writestr("readme.txt", "This is your complete data export as per GDPR Article 20.")
-    
-    # In production, upload to secure storage and provide download link
-    # For now, we'll mark as completed
-    await db.data_export_requests.update_one(
-        {"_id": result.inserted_id},
-        {
-            "$set": {
-                "status": "completed",
-                "export_url": f"/api/gdpr/download-export/{result.inserted_id}",
-                "expiry_date": datetime.utcnow() + timedelta(days=7)
-            }
-        }
-    )
+    from backend.tasks.gdpr_tasks import export_user_data_task
+    try:
+        task = export_user_data_task.delay(request_id, user.id)
+    except Exception as e:
+        # A request left pending would block every later export of this user
+        logger.error(f"Failed to enqueue data export {request_id}: {str(e)}")
+        await db.data_export_requests.update_one(
+            {"_id": result.inserted_id},
+            {"$set": {"status": "failed", "error": "Export could not be started"}}
+        )
+        raise HTTPException(status_code=503, detail="Data export is temporarily unavailable, please try again later")
+    await db.data_export_requests.update_one({"_id": result.inserted_id}, {"$set": {"task_id": task.id}})
+    
+    await AuditLogger(db).log_privacy_action(user.id, "data_export_requested", {"request_id": request_id})
+    
+    return {
+        "message": "Data export started",
+        "request_id": request_id,
+        "status_url": f"/api/gdpr/export-data/{request_id}",
+        "download_url": f"/api/gdpr/download-export/{request_id}",
+        "expires_in": f"{EXPORT_TTL_DAYS} days after completion"
+    }
+
+async def _get_export_request(db, request_id: str, user_id: str) -> dict:
+    if not ObjectId.is_valid(request_id):
+        raise HTTPException(status_code=404, detail="Export request not found")
+    export = await db.data_export_requests.find_one({"_id": ObjectId(request_id), "user_id": user_id})
+    if not export:
+        raise HTTPException(status_code=404, detail="Export request not found")
+    return export
+
+@router.get("/export-data/{request_id}")
+async def get_data_export_status(request_id: str, user: UserInDB = Depends(get_current_user)):
+    """Get status and progress of a data export request"""
+    db = await get_database()
+    export = await _get_export_request(db, request_id, user.id)
     
     return {
-        "message": "Data export prepared successfully",
-        "request_id": str(result.inserted_id),
-        "download_url": f"/api/gdpr/download-export/{result.inserted_id}",
-        "expires_in": "7 days"
+        "request_id": request_id,
+        "status": export["status"],
+        "progress": export.get("progress"),
+        "request_date": export["request_date"],
+        "download_url": export.get("export_url") if export["status"] == "completed" else None,
+        "expiry_date": export.get("expiry_date"),
+        "error": export.get("error")
     }
 
+@router.get("/download-export/{request_id}")
+async def download_data_export(request_id: str, user: UserInDB = Depends(get_current_user)):
+    """Stream a finished data export archive"""
+    db = await get_database()
+    export = await _get_export_request(db, request_id, user.id)
+    
+    if export["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export is {export['status']}")
+    if export.get("expiry_date") and export["expiry_date"] < datetime.utcnow():
+        raise HTTPException(status_code=410, detail="Export has expired")
+    
+    filename = f"fsp-navigator-data-export-{export['request_date']:%Y%m%d}.zip"
+    storage = export.get("storage") or {}
+    if storage.get("storage") == "s3":
+        return StreamingResponse(
+            iter_s3_archive(storage["s3_bucket"], storage["s3_key"]),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    path = storage.get("path")
+    if not path or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Export archive not found")
+    return FileResponse(path, media_type="application/zip", filename=filename)
+
 @router.post("/delete-account")
 async def request_account_deletion(
     reason: Optional[str] = None,
@@ -222,38 +290,11 @@ async def cleanup_expired_data():
         "expiry_date": {"$lt": cutoff_date}
     })
     
-    # Process pending deletion requests (older than 30 days)
+    # Process pending deletion requests (older than 30 days) in batches
     deletion_cutoff = datetime.utcnow() - timedelta(days=30)
-    pending_deletions = await db.data_deletion_requests.find({
-        "request_date": {"$lt": deletion_cutoff},
-        "status": "pending"
-    }).to_list(length=None)
-    
-    for deletion in pending_deletions:
-        user_id = deletion["user_id"]
-        
-        # Delete all user data
-        await db.users.delete_one({"user_id": user_id})
-        await db.user_progress.delete_many({"user_id": user_id})
-        await db.personal_files.delete_many({"user_id": user_id})
-        await db.subscriptions.delete_many({"user_id": user_id})
-        await db.payment_transactions.delete_many({"user_id": user_id})
-        await db.gdpr_consents.delete_many({"user_id": user_id})
-        await db.privacy_settings.delete_many({"user_id": user_id})
-        await db.audit_logs.delete_many({"user_id": user_id})
-        
-        # Mark deletion as completed
-        await db.data_deletion_requests.update_one(
-            {"_id": deletion["_id"]},
-            {
-                "$set": {
-                    "status": "completed",
-                    "deletion_date": datetime.utcnow()
-                }
-            }
-        )
+    result = await AccountDeletionEngine(db).process_pending(deletion_cutoff)
     
-    return {"message": f"Cleaned up expired data. Processed {len(pending_deletions)} deletions."}
+    return {"message": f"Cleaned up expired data. Processed {result['users']} deletions.", **result}
 
 # Legal disclaimers endpoint
 @router.get("/disclaimers")
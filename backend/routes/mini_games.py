@@ -3,15 +3,17 @@ from fastapi.security import HTTPBearer
 from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from pymongo import ReturnDocument
 
 from ..models import (
     GameResult, GameResultCreate, GameResultResponse, ClinicalCase, 
-    FachbegriffTerm, UserGameStats, Leaderboard, GameType, UserInDB
+    FachbegriffTerm, UserGameStats, Leaderboard, LeaderboardPosition, GameType, UserInDB,
+    TermReviewBatch, TermReviewState, DueTerm
 )
 from ..auth import get_current_user, get_current_admin_user
 from ..database import get_database
+from ..services.mini_game_data import fetch_game_results, record_game_result
+from ..services import leaderboards, question_decks, term_reviews
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,22 +22,11 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 security = HTTPBearer()
 
-# MongoDB connection - consistent with main app configuration
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.getenv("DB_NAME", "fsp_navigator")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
-
-# Collections
-game_results_collection = db.game_results
-clinical_cases_collection = db.clinical_cases
-fachbegriffe_collection = db.fachbegriffe_terms
-user_game_stats_collection = db.user_game_stats
-
 @router.post("/game-result", response_model=GameResultResponse)
 async def save_game_result(
     game_result: GameResultCreate,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
 ):
     """Save a game result and update user statistics."""
     try:
@@ -45,14 +36,8 @@ async def save_game_result(
             **game_result.dict()
         )
         
-        # Insert into database
-        result_dict = result.dict()
-        result_dict['created_at'] = result_dict['created_at'].isoformat()
-        
-        await game_results_collection.insert_one(result_dict)
-        
-        # Update user game statistics
-        await update_user_game_stats(current_user.id, result)
+        # Store the result, then fold it into the stats and leaderboard (each an atomic upsert)
+        await record_game_result(db, result)
         
         logger.info(f"Game result saved for user {current_user.id}: {game_result.game_type} - {game_result.score}%")
         
@@ -69,23 +54,13 @@ async def save_game_result(
 async def get_user_game_results(
     game_type: Optional[GameType] = None,
     limit: int = 20,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
 ):
     """Get user's game results with optional filtering."""
     try:
-        query = {"user_id": current_user.id}
-        if game_type:
-            query["game_type"] = game_type.value
-        
-        cursor = game_results_collection.find(query).sort("created_at", -1).limit(limit)
-        results = await cursor.to_list(length=limit)
-        
-        game_results = []
-        for result in results:
-            result['created_at'] = datetime.fromisoformat(result['created_at'])
-            game_results.append(GameResultResponse(**result))
-        
-        return game_results
+        results = await fetch_game_results(db, current_user.id, game_type.value if game_type else None, limit)
+        return [GameResultResponse(**result) for result in results]
         
     except Exception as e:
         logger.error(f"Error fetching game results: {str(e)}")
@@ -96,25 +71,19 @@ async def get_user_game_results(
 
 @router.get("/game-stats", response_model=UserGameStats)
 async def get_user_game_stats(
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
 ):
     """Get user's game statistics."""
     try:
-        stats = await user_game_stats_collection.find_one({"user_id": current_user.id})
-        
-        if not stats:
-            # Create initial stats
-            stats = UserGameStats(user_id=current_user.id)
-            stats_dict = stats.dict()
-            stats_dict['created_at'] = stats_dict['created_at'].isoformat()
-            stats_dict['updated_at'] = stats_dict['updated_at'].isoformat()
-            await user_game_stats_collection.insert_one(stats_dict)
-        else:
-            stats['created_at'] = datetime.fromisoformat(stats['created_at'])
-            stats['updated_at'] = datetime.fromisoformat(stats['updated_at'])
-            stats = UserGameStats(**stats)
-        
-        return stats
+        # Create initial stats on first access without racing concurrent game submissions
+        stats = await db.user_game_stats.find_one_and_update(
+            {"user_id": current_user.id},
+            {"$setOnInsert": UserGameStats(user_id=current_user.id).dict(exclude={"user_id"})},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return UserGameStats(**stats)
         
     except Exception as e:
         logger.error(f"Error fetching game stats: {str(e)}")
@@ -127,41 +96,26 @@ async def get_user_game_stats(
 async def get_leaderboard(
     game_type: GameType,
     limit: int = 10,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
 ):
     """Get leaderboard for a specific game type."""
     try:
-        # Aggregate pipeline to get top users
-        pipeline = [
-            {"$match": {"game_type": game_type.value}},
-            {"$group": {
-                "_id": "$user_id",
-                "best_score": {"$max": "$score"},
-                "total_games": {"$sum": 1},
-                "avg_score": {"$avg": "$score"}
-            }},
-            {"$sort": {"best_score": -1, "avg_score": -1}},
-            {"$limit": limit}
-        ]
-        
-        cursor = game_results_collection.aggregate(pipeline)
-        results = await cursor.to_list(length=limit)
+        limit = max(1, min(limit, 100))
+        entries = await leaderboards.top_entries(db, game_type.value, limit)
+        names = await leaderboards.display_names(db, [entry["user_id"] for entry in entries])
         
-        leaderboard = []
-        for i, result in enumerate(results, 1):
-            # Get user name (simplified - in real implementation, you'd join with users collection)
-            user_name = f"User {result['_id'][:8]}"  # Simplified display
-            
-            leaderboard.append(Leaderboard(
+        return [
+            Leaderboard(
                 rank=i,
-                user_id=result['_id'],
-                user_name=user_name,
-                score=result['best_score'],
-                games_played=result['total_games'],
+                user_id=entry["user_id"],
+                user_name=names[entry["user_id"]],
+                score=entry["best_score"],
+                games_played=entry["games_played"],
                 game_type=game_type
-            ))
-        
-        return leaderboard
+            )
+            for i, entry in enumerate(entries, 1)
+        ]
         
     except Exception as e:
         logger.error(f"Error fetching leaderboard: {str(e)}")
@@ -170,31 +124,48 @@ async def get_leaderboard(
             detail=f"Error fetching leaderboard: {str(e)}"
         )
 
+@router.get("/leaderboard/me", response_model=LeaderboardPosition)
+async def get_my_leaderboard_position(
+    game_type: GameType,
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Get the current user's rank on a game's leaderboard."""
+    try:
+        position = await leaderboards.user_position(db, game_type.value, current_user.id)
+        entry = position["entry"] or {}
+        
+        return LeaderboardPosition(
+            game_type=game_type,
+            rank=position["rank"],
+            total_players=position["total_players"],
+            score=entry.get("best_score"),
+            average_score=entry.get("avg_score"),
+            games_played=entry.get("games_played", 0)
+        )
+        
+    except Exception as e:
+        logger.error(f"Error fetching leaderboard position: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching leaderboard position: {str(e)}"
+        )
+
 @router.get("/clinical-cases", response_model=List[ClinicalCase])
 async def get_clinical_cases(
     category: Optional[str] = None,
     difficulty: Optional[str] = None,
     limit: int = 10,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
 ):
-    """Get clinical cases for the mini-game."""
+    """Get the user's next round of clinical cases (shuffled, skipping recently solved ones)."""
     try:
-        query = {"is_active": True}
-        if category:
-            query["category"] = category
-        if difficulty:
-            query["difficulty"] = difficulty
-        
-        cursor = clinical_cases_collection.find(query).limit(limit)
-        cases = await cursor.to_list(length=limit)
-        
-        clinical_cases = []
-        for case in cases:
-            case['created_at'] = datetime.fromisoformat(case['created_at'])
-            case['updated_at'] = datetime.fromisoformat(case['updated_at'])
-            clinical_cases.append(ClinicalCase(**case))
-        
-        return clinical_cases
+        round_ids = await question_decks.next_round(
+            db, current_user.id, GameType.CLINICAL_CASES.value, category, difficulty, max(1, min(limit, 50))
+        )
+        cases = await question_decks.fetch_items(db, GameType.CLINICAL_CASES.value, round_ids)
+        return [ClinicalCase(**case) for case in cases]
         
     except Exception as e:
         logger.error(f"Error fetching clinical cases: {str(e)}")
@@ -208,26 +179,16 @@ async def get_fachbegriffe_terms(
     category: Optional[str] = None,
     difficulty: Optional[str] = None,
     limit: int = 20,
-    current_user: UserInDB = Depends(get_current_user)
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
 ):
-    """Get Fachbegriffe terms for the mini-game."""
+    """Get the user's next round of Fachbegriffe terms (shuffled, skipping recently solved ones)."""
     try:
-        query = {"is_active": True}
-        if category:
-            query["category"] = category
-        if difficulty:
-            query["difficulty"] = difficulty
-        
-        cursor = fachbegriffe_collection.find(query).limit(limit)
-        terms = await cursor.to_list(length=limit)
-        
-        fachbegriffe_terms = []
-        for term in terms:
-            term['created_at'] = datetime.fromisoformat(term['created_at'])
-            term['updated_at'] = datetime.fromisoformat(term['updated_at'])
-            fachbegriffe_terms.append(FachbegriffTerm(**term))
-        
-        return fachbegriffe_terms
+        round_ids = await question_decks.next_round(
+            db, current_user.id, GameType.FACHBEGRIFFE.value, category, difficulty, max(1, min(limit, 50))
+        )
+        terms = await question_decks.fetch_items(db, GameType.FACHBEGRIFFE.value, round_ids)
+        return [FachbegriffTerm(**term) for term in terms]
         
     except Exception as e:
         logger.error(f"Error fetching fachbegriffe terms: {str(e)}")
@@ -236,66 +197,54 @@ async def get_fachbegriffe_terms(
             detail=f"Error fetching fachbegriffe terms: {str(e)}"
         )
 
-async def update_user_game_stats(user_id: str, game_result: GameResult):
-    """Update user game statistics after a game."""
+@router.get("/fachbegriffe/due", response_model=List[DueTerm])
+async def get_due_fachbegriffe(
+    limit: int = 20,
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Get the user's Fachbegriffe terms that are due for review, most overdue first."""
     try:
-        # Get current stats
-        current_stats = await user_game_stats_collection.find_one({"user_id": user_id})
-        
-        if not current_stats:
-            # Create new stats
-            stats = UserGameStats(user_id=user_id)
-            current_stats = stats.dict()
-            current_stats['created_at'] = current_stats['created_at'].isoformat()
-            current_stats['updated_at'] = current_stats['updated_at'].isoformat()
-            await user_game_stats_collection.insert_one(current_stats)
-        
-        # Update stats based on game type
-        update_data = {
-            "total_games_played": current_stats.get("total_games_played", 0) + 1,
-            "total_time_spent_seconds": current_stats.get("total_time_spent_seconds", 0) + game_result.time_spent_seconds,
-            "updated_at": datetime.utcnow().isoformat()
-        }
+        reviews = await term_reviews.due_reviews(db, current_user.id, max(1, min(limit, 100)))
+        terms = await question_decks.fetch_items(
+            db, GameType.FACHBEGRIFFE.value, [review["term_id"] for review in reviews]
+        )
+        terms_by_id = {term["id"]: term for term in terms}
         
-        if game_result.game_type == GameType.CLINICAL_CASES:
-            update_data.update({
-                "clinical_cases_played": current_stats.get("clinical_cases_played", 0) + 1,
-                "clinical_cases_best_score": max(current_stats.get("clinical_cases_best_score", 0), game_result.score),
-                "clinical_cases_total_score": current_stats.get("clinical_cases_total_score", 0) + game_result.score,
-            })
-            # Calculate average
-            games_played = update_data["clinical_cases_played"]
-            total_score = update_data["clinical_cases_total_score"]
-            update_data["clinical_cases_average_score"] = total_score / games_played if games_played > 0 else 0
-            
-        elif game_result.game_type == GameType.FACHBEGRIFFE:
-            update_data.update({
-                "fachbegriffe_played": current_stats.get("fachbegriffe_played", 0) + 1,
-                "fachbegriffe_best_score": max(current_stats.get("fachbegriffe_best_score", 0), game_result.score),
-                "fachbegriffe_total_score": current_stats.get("fachbegriffe_total_score", 0) + game_result.score,
-                "fachbegriffe_best_streak": max(current_stats.get("fachbegriffe_best_streak", 0), game_result.streak or 0),
-            })
-            # Calculate average
-            games_played = update_data["fachbegriffe_played"]
-            total_score = update_data["fachbegriffe_total_score"]
-            update_data["fachbegriffe_average_score"] = total_score / games_played if games_played > 0 else 0
+        return [
+            DueTerm(term=FachbegriffTerm(**terms_by_id[review["term_id"]]), review=TermReviewState(**review))
+            for review in reviews if review["term_id"] in terms_by_id
+        ]
         
-        # Update in database
-        await user_game_stats_collection.update_one(
-            {"user_id": user_id},
-            {"$set": update_data},
-            upsert=True
+    except Exception as e:
+        logger.error(f"Error fetching due terms: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching due terms: {str(e)}"
         )
-        
-        logger.info(f"Updated game stats for user {user_id}")
+
+@router.post("/fachbegriffe/reviews", response_model=List[TermReviewState])
+async def submit_fachbegriffe_reviews(
+    batch: TermReviewBatch,
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Record a practice session's answers and reschedule the reviewed terms."""
+    try:
+        states = await term_reviews.record_answers(db, current_user.id, batch.answers)
+        return [TermReviewState(**state) for state in states]
         
     except Exception as e:
-        logger.error(f"Error updating user game stats: {str(e)}")
-        # Don't raise exception as this shouldn't block the main operation
+        logger.error(f"Error saving term reviews: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error saving term reviews: {str(e)}"
+        )
 
 @router.post("/initialize-sample-data")
 async def initialize_sample_data(
-    admin_user: UserInDB = Depends(get_current_admin_user)
+    admin_user: UserInDB = Depends(get_current_admin_user),
+    db = Depends(get_database)
 ):
     """Initialize sample data for mini-games (admin only)."""
     
@@ -353,8 +302,8 @@ async def initialize_sample_data(
                 "difficulty": "medium",
                 "category": "cardiology",
                 "created_by": admin_user.id,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
                 "is_active": True
             }
         ]
@@ -370,8 +319,8 @@ async def initialize_sample_data(
                 "explanation": "Der Myokardinfarkt ist der medizinische Fachbegriff für den umgangssprachlichen Herzinfarkt - das Absterben von Herzmuskelgewebe.",
                 "difficulty": "medium",
                 "created_by": admin_user.id,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
                 "is_active": True
             },
             {
@@ -383,27 +332,31 @@ async def initialize_sample_data(
                 "explanation": "Dyspnoe bezeichnet medizinisch die subjektiv empfundene Atemnot oder Luftnot.",
                 "difficulty": "easy",
                 "created_by": admin_user.id,
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow(),
                 "is_active": True
             }
         ]
         
         # Insert sample data
         for case in sample_clinical_cases:
-            await clinical_cases_collection.update_one(
+            await db.clinical_cases.update_one(
                 {"id": case["id"]},
                 {"$set": case},
                 upsert=True
             )
         
         for term in sample_fachbegriffe:
-            await fachbegriffe_collection.update_one(
+            await db.fachbegriffe_terms.update_one(
                 {"id": term["id"]},
                 {"$set": term},
                 upsert=True
             )
         
+        # Rebuild the shuffled decks with the new items on next use
+        for game_type in question_decks.DECK_COLLECTIONS:
+            await question_decks.invalidate_decks(db, game_type)
+        
         return {"message": "Sample data initialized successfully"}
         
     except Exception as e:
@@ -18,9 +18,11 @@ class GDPRConsent(BaseModel):
 class DataExportRequest(BaseModel):
     user_id: str
     request_date: datetime
-    status: str  # 'pending', 'processing', 'completed', 'failed'
+    status: str  # 'pending', 'processing', 'completed', 'failed', 'expired'
     export_url: Optional[str] = None
     expiry_date: Optional[datetime] = None
+    task_id: Optional[str] = None
+    progress: Optional[dict] = None  # {"done", "total", "stage"} while the job runs
 
 class DataDeletionRequest(BaseModel):
     user_id: str
@@ -5,7 +5,7 @@ from datetime import datetime
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from database import get_database
+from backend.database import get_database
 
 router = APIRouter(prefix="/api/mongodb", tags=["mongodb"])
 
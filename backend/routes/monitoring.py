@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from typing import List, Dict, Optional
 from backend.models_billing import ErrorReport, AuditLog
 from backend.auth import get_current_user
-from backend.database import get_database
+from backend.database import get_database, get_mongo_pool_stats
 from backend.models import UserInDB
+from backend.redis_config import get_redis, get_redis_pool_stats
+from backend.security import AuditLogger
+from backend.services.metrics import render_metrics
+from backend.settings import settings
 from pydantic import BaseModel
 import logging
+import secrets
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
+# Served at the application root (/metrics) for Prometheus scrapers
+prometheus_router = APIRouter(tags=["monitoring"])
 
 class ErrorReportCreate(BaseModel):
     error_type: str
@@ -69,23 +76,35 @@ async def submit_feedback(
         user_agent=request.headers.get("user-agent")
     )
     
-    await db.audit_logs.insert_one(audit_log.dict())
+    await AuditLogger(db).write_entry(audit_log.dict())
     logger.info(f"User feedback received: {feedback_data.category} - {feedback_data.message[:100]}")
     
     return {"message": "Feedback submitted successfully", "feedback_id": audit_log.id}
 
 @router.get("/health")
-async def health_check(db = Depends(get_database)):
+async def health_check(db = Depends(get_database), redis_client = Depends(get_redis)):
     """Application health check endpoint."""
     
     try:
         # Check database connection
         await db.users.count_documents({}, limit=1)
         
+        # Redis is optional; ping over the shared pool (no new connection per check)
+        redis_status = "unavailable"
+        if redis_client is not None:
+            try:
+                await redis_client.ping()
+                redis_status = "healthy"
+            except Exception as e:
+                redis_status = f"error: {str(e)}"
+        
         # Check key services
         services_status = {
             "database": "healthy",
             "api": "healthy",
+            "redis": redis_status,
+            "redis_pool": get_redis_pool_stats(),
+            "mongo_pool": get_mongo_pool_stats(),
             "timestamp": "datetime.utcnow().isoformat()"
         }
         
@@ -138,7 +157,7 @@ async def log_user_action(
         user_agent=request.headers.get("user-agent")
     )
     
-    await db.audit_logs.insert_one(audit_log.dict())
+    await AuditLogger(db).write_entry(audit_log.dict())
     
     return {"message": "Action logged successfully"}
 
@@ -165,4 +184,14 @@ async def get_user_notifications(
     
     # Add more notification types as needed
     
-    return {"notifications": notifications}
\ No newline at end of file
+    return {"notifications": notifications}
+
+@prometheus_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Prometheus exposition; requires METRICS_TOKEN as bearer token when configured."""
+    if settings.metrics_token:
+        supplied = request.headers.get("authorization", "")
+        if not secrets.compare_digest(supplied, f"Bearer {settings.metrics_token}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
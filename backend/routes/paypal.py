@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timedelta
-import paypalrestsdk
+from functools import lru_cache
 import os
 import uuid
 from backend.auth import get_current_user
@@ -10,12 +10,16 @@ from backend.database import get_database
 
 router = APIRouter(prefix="/paypal", tags=["paypal"])
 
-# Configure PayPal SDK
-paypalrestsdk.configure({
-    "mode": "sandbox",  # Change to "live" for production
-    "client_id": os.environ.get("PAYPAL_CLIENT_ID", "test_client_id"),
-    "client_secret": os.environ.get("PAYPAL_SECRET", "test_secret")
-})
+# Configure PayPal SDK (imported on first use)
+@lru_cache(maxsize=1)
+def paypal_sdk():
+    import paypalrestsdk
+    paypalrestsdk.configure({
+        "mode": "sandbox",  # Change to "live" for production
+        "client_id": os.environ.get("PAYPAL_CLIENT_ID", "test_client_id"),
+        "client_secret": os.environ.get("PAYPAL_SECRET", "test_secret")
+    })
+    return paypalrestsdk
 
 class PayPalSubscriptionRequest(BaseModel):
     plan_type: str  # "BASIC" or "PREMIUM"
@@ -63,7 +67,7 @@ async def create_paypal_subscription(
         plan = SUBSCRIPTION_PLANS[request.plan_type]
         
         # Create billing plan
-        billing_plan = paypalrestsdk.BillingPlan({
+        billing_plan = paypal_sdk().BillingPlan({
             "name": plan["name"],
             "description": plan["description"],
             "type": "INFINITE",  # Subscription continues until cancelled
@@ -95,7 +99,7 @@ async def create_paypal_subscription(
             print(f"Billing Plan created successfully with ID: {billing_plan.id}")
             
             # Activate the billing plan
-            billing_plan_update = paypalrestsdk.BillingPlan.find(billing_plan.id)
+            billing_plan_update = paypal_sdk().BillingPlan.find(billing_plan.id)
             billing_plan_update.replace([{
                 "path": "/",
                 "value": {
@@ -105,7 +109,7 @@ async def create_paypal_subscription(
             }])
             
             # Create billing agreement
-            billing_agreement = paypalrestsdk.BillingAgreement({
+            billing_agreement = paypal_sdk().BillingAgreement({
                 "name": plan["name"],
                 "description": plan["description"],
                 "start_date": (datetime.utcnow() + timedelta(minutes=10)).strftime('%Y-%m-%dT%H:%M:%SZ'),
@@ -170,7 +174,7 @@ async def approve_subscription(
         user_id = current_user.id if hasattr(current_user, 'id') else current_user["id"]
         
         # Execute the billing agreement
-        billing_agreement = paypalrestsdk.BillingAgreement.execute(token)
+        billing_agreement = paypal_sdk().BillingAgreement.execute(token)
         
         if billing_agreement.id:
             # Find the subscription in database and update it
@@ -250,7 +254,7 @@ async def cancel_subscription(
             }
         
         # Cancel the billing agreement
-        billing_agreement = paypalrestsdk.BillingAgreement.find(agreement_id)
+        billing_agreement = paypal_sdk().BillingAgreement.find(agreement_id)
         
         if billing_agreement.cancel({"note": "User requested cancellation"}):
             # Update user subscription status
@@ -308,7 +312,7 @@ async def get_paypal_subscription_status(
         if agreement_id:
             # Get current status from PayPal
             try:
-                billing_agreement = paypalrestsdk.BillingAgreement.find(agreement_id)
+                billing_agreement = paypal_sdk().BillingAgreement.find(agreement_id)
                 
                 return {
                     "has_paypal_subscription": True,
@@ -14,12 +14,40 @@ from backend.models import (
 from backend.auth import get_current_user
 from backend.database import db
 from backend.upload_service import upload_file
+from backend.services.index_registry import register_indexes, register_queries
+from backend.services.query_budget import query_budget
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/forums", tags=["reddit-forum"])
 
+FORUM_INDEXES = register_indexes({
+    "forums": [
+        ([("slug", 1)], {"unique": True}),
+        ([("is_active", 1)], {}),
+    ],
+    "threads": [
+        ([("forum_id", 1), ("updated_at", -1)], {}),
+        ([("forum_id", 1), ("created_at", -1)], {}),
+        ([("forum_id", 1), ("is_pinned", -1), ("updated_at", -1)], {}),
+    ],
+    "comments": [
+        ([("thread_id", 1), ("is_deleted", 1), ("created_at", 1)], {}),
+        ([("thread_id", 1), ("parent_id", 1)], {}),
+    ],
+    "votes": [
+        ([("user_id", 1), ("target_id", 1), ("target_type", 1)], {"unique": True}),
+        ([("target_type", 1), ("target_id", 1)], {}),
+    ],
+})
+register_queries(
+    ("threads", {"forum_id": "f"}, [("updated_at", -1)]),
+    ("threads", {"forum_id": "f"}, [("created_at", 1)]),
+    ("comments", {"thread_id": "t", "is_deleted": False}, [("created_at", 1)]),
+    ("votes", {"user_id": "u", "target_id": {"$in": ["t"]}, "target_type": "thread"}, []),
+)
+
 # Premium subscription decorator
 def require_premium(user: UserInDB = Depends(get_current_user)):
     """Verify user has premium subscription"""
@@ -114,6 +142,7 @@ async def get_forum(forum_slug: str, user: UserInDB = Depends(require_premium)):
 # --- Thread Management ---
 
 @router.get("/{forum_slug}/threads", response_model=List[ThreadResponse])
+@query_budget(5)
 async def list_threads(
     forum_slug: str,
     user: UserInDB = Depends(require_premium),
@@ -158,11 +187,14 @@ async def list_threads(
             async for vote in votes_cursor:
                 user_votes[vote["target_id"]] = vote["value"]
         
-        # Get comment counts for threads
+        # Get comment counts for all threads of the page in one aggregation
         comment_counts = {}
-        for thread_id in thread_ids:
-            count = await db.comments.count_documents({"thread_id": thread_id, "is_deleted": False})
-            comment_counts[thread_id] = count
+        if thread_ids:
+            async for row in db.comments.aggregate([
+                {"$match": {"thread_id": {"$in": thread_ids}, "is_deleted": False}},
+                {"$group": {"_id": "$thread_id", "count": {"$sum": 1}}}
+            ]):
+                comment_counts[row["_id"]] = row["count"]
         
         # Build response
         thread_responses = []
@@ -11,10 +11,13 @@ from pathlib import Path
 # Add the backend directory to Python path
 backend_dir = Path(__file__).parent.parent
 sys.path.append(str(backend_dir))
+sys.path.append(str(backend_dir.parent))
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from settings import settings
 from models import Forum, UserInDB
+from backend.routes.reddit_forum import FORUM_INDEXES
+from backend.services.index_registry import build_missing_indexes
 import logging
 from datetime import datetime
 
@@ -99,31 +102,10 @@ async def seed_forums(db):
         raise
 
 async def create_indexes(db):
-    """Create database indexes for optimal performance"""
+    """Create the forum indexes declared in routes/reddit_forum.py that are missing"""
     try:
         logger.info("Creating database indexes...")
-        
-        # Forum indexes
-        await db.forums.create_index("slug", unique=True)
-        await db.forums.create_index("is_active")
-        
-        # Thread indexes
-        await db.threads.create_index("forum_id")
-        await db.threads.create_index([("forum_id", 1), ("updated_at", -1)])
-        await db.threads.create_index([("forum_id", 1), ("created_at", -1)])
-        await db.threads.create_index([("forum_id", 1), ("is_pinned", -1), ("updated_at", -1)])
-        
-        # Comment indexes
-        await db.comments.create_index("thread_id")
-        await db.comments.create_index([("thread_id", 1), ("created_at", 1)])
-        await db.comments.create_index([("thread_id", 1), ("parent_id", 1)])
-        await db.comments.create_index("is_deleted")
-        
-        # Vote indexes
-        await db.votes.create_index([("user_id", 1), ("target_id", 1), ("target_type", 1)], unique=True)
-        await db.votes.create_index("target_id")
-        await db.votes.create_index([("target_type", 1), ("target_id", 1)])
-        
+        await build_missing_indexes(db, FORUM_INDEXES)
         logger.info("Database indexes created successfully!")
         
     except Exception as e:
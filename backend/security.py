@@ -1,13 +1,9 @@
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 import secrets
 import hashlib
 from datetime import datetime, timedelta
 import jwt
-from passlib.context import CryptContext
 import re
 from typing import Optional, List
 
@@ -15,6 +11,7 @@ from typing import Optional, List
 
 class DataEncryption:
     def __init__(self):
+        from cryptography.fernet import Fernet
         self.encryption_key = self._get_or_create_key()
         self.fernet = Fernet(self.encryption_key)
     
@@ -55,6 +52,7 @@ class DataEncryption:
 
 class SecurityManager:
     def __init__(self):
+        from passlib.context import CryptContext
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self.encryptor = DataEncryption()
     
@@ -114,7 +112,19 @@ class AuditLogger:
             "session_id": details.get("session_id") if details else None
         }
         
-        await self.db.audit_logs.insert_one(log_entry)
+        await self.write_entry(log_entry)
+    
+    async def write_entry(self, log_entry: dict):
+        """Stamp the retention expiry, then hand the entry to the buffered audit sink
+        (or insert it directly when no sink runs)"""
+        from backend.services.audit_sink import get_audit_sink
+        from backend.services.retention import apply_audit_retention
+        apply_audit_retention(log_entry)
+        sink = get_audit_sink()
+        if sink is not None:
+            await sink.submit(log_entry)
+        else:
+            await self.db.audit_logs.insert_one(log_entry)
     
     async def log_data_access(self, user_id: str, data_type: str, operation: str, ip_address: str = None):
         """Log data access for compliance"""
@@ -210,97 +220,26 @@ def get_allowed_file_types() -> List[str]:
     return [ext.strip() for ext in allowed_types.split(',')]
 
 # Rate limiting utilities
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from fastapi import HTTPException, status
-from fastapi.responses import JSONResponse
-import redis.asyncio as redis
-import os
-import logging
-
-logger = logging.getLogger(__name__)
-
-# Initialize Redis connection for rate limiting
-redis_url = os.environ.get('REDIS_URL')
-redis_client = None
-
 async def get_redis_client():
-    """Get Redis client for rate limiting"""
-    global redis_client
-    if redis_client is None:
-        try:
-            redis_client = redis.from_url(redis_url, decode_responses=True)
-            # Test connection
-            await redis_client.ping()
-            logger.info("Redis connection established for rate limiting")
-        except Exception as e:
-            # Fallback to in-memory if Redis is not available
-            logger.warning(f"Redis connection failed: {e}. Falling back to in-memory rate limiting.")
-            return None
-    return redis_client
-
-# Initialize slowapi limiter with error handling
-def create_limiter():
-    """Create limiter with proper error handling"""
-    if not redis_url:
-        logger.warning("REDIS_URL not configured. Rate limiting disabled.")
-        return None
-        
-    try:
-        # Try to create limiter with Redis
-        limiter = Limiter(
-            key_func=get_remote_address,
-            storage_uri=redis_url,
-            default_limits=["200 per day", "50 per hour"]
-        )
-        logger.info("Rate limiter initialized with Redis storage")
-        return limiter
-    except Exception as e:
-        logger.error(f"Failed to initialize Redis-based rate limiter: {e}")
-        # Fallback to in-memory storage
-        try:
-            limiter = Limiter(
-                key_func=get_remote_address,
-                default_limits=["200 per day", "50 per hour"]
-            )
-            logger.warning("Rate limiter initialized with in-memory storage (fallback)")
-            return limiter
-        except Exception as fallback_error:
-            logger.error(f"Failed to initialize rate limiter: {fallback_error}")
-            # Return None to disable rate limiting
-            return None
-
-# Create limiter with error handling
-limiter = create_limiter()
+    """Get the shared Redis client (see ``backend.redis_config``)"""
+    from backend.redis_config import get_redis_client as get_shared_redis_client
+    return await get_shared_redis_client()
 
-# Safe rate limiting decorator
-def safe_rate_limit(limit_string: str):
-    """Safe rate limiting decorator that only applies when limiter is available"""
+# Rate limit budget declaration
+def safe_rate_limit(budget: str):
+    """
+    Declare the rate limit budget of an endpoint.
+    
+    ``budget`` is a key of ``redis_config.get_rate_limit_config()`` (e.g. "login")
+    or a literal limit such as "10 per minute". Enforcement is done by
+    ``backend.middleware.rate_limit.RateLimitMiddleware``, which reads this
+    attribute when it builds its route table.
+    """
     def decorator(func):
-        if limiter is not None:
-            return limiter.limit(limit_string)(func)
+        func.__rate_limit__ = budget
         return func
     return decorator
 
-# Rate limit exceeded handler
-def rate_limit_exceeded_handler(request, exc):
-    """Handle rate limit exceeded exceptions"""
-    return JSONResponse(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        content={
-            "error": "Rate limit exceeded",
-            "detail": "Too many requests. Please try again later.",
-            "retry_after": exc.retry_after
-        },
-        headers={
-            "Retry-After": str(exc.retry_after),
-            "X-RateLimit-Limit": str(exc.limit),
-            "X-RateLimit-Remaining": str(exc.remaining),
-            "X-RateLimit-Reset": str(exc.reset)
-        }
-    )
-
 # Input validation utilities
 def validate_email(email: str) -> bool:
     """Validate email format"""
@@ -323,6 +262,11 @@ def validate_bundesland(bundesland: str) -> bool:
     ]
     return bundesland.lower() in valid_bundeslaender
 
-# Initialize global instances
-security_manager = SecurityManager()
-data_encryption = DataEncryption()
\ No newline at end of file
+# Global instances, created on first access (Fernet needs the encryption key)
+_LAZY_INSTANCES = {"security_manager": SecurityManager, "data_encryption": DataEncryption}
+
+def __getattr__(name: str):
+    if name in _LAZY_INSTANCES:
+        instance = globals()[name] = _LAZY_INSTANCES[name]()
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,6 @@
 from fastapi import FastAPI, APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
@@ -9,9 +8,9 @@ from typing import List
 import uuid
 from datetime import datetime
 import sys
+import asyncio
 from contextlib import asynccontextmanager
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
+import importlib.util
 
 # Add the parent directory to sys.path
 ROOT_DIR = Path(__file__).parent
@@ -19,9 +18,17 @@ sys.path.append(str(ROOT_DIR.parent))
 
 # Import settings
 from backend.settings import settings, get_settings
+from backend.services.index_registry import verify_indexes
+from backend.redis_config import init_redis_pool, close_redis_pool, get_redis_client
+from backend.services.audit_sink import start_audit_sink, stop_audit_sink
+from backend.services.warm_up import start_warm_up
+from backend.services.metrics import monitor_event_loop_lag
+from backend.services.api_probes import close_http_client
 
 # Initialize Sentry for error tracking
 if settings.sentry_dsn and settings.environment != 'development':
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
     sentry_sdk.init(
         dsn=settings.sentry_dsn,
         integrations=[FastApiIntegration()],
@@ -29,9 +36,8 @@ if settings.sentry_dsn and settings.environment != 'development':
         environment=settings.environment
     )
 
-# MongoDB connection
-client = AsyncIOMotorClient(settings.mongo_url)
-db = client[settings.db_name]
+# MongoDB connection (the process-wide client from backend.database)
+from backend.database import client, db, get_database
 
 # Configure logging
 logging.basicConfig(
@@ -52,30 +58,34 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ MongoDB connection failed: {e}")
         raise RuntimeError(f"MongoDB connection failed: {e}")
     
-    # Create database indexes (non-critical, don't fail startup)
+    # Buffered audit log writer (batched insert_many, drained on shutdown)
+    await start_audit_sink(db)
+    
+    # Shared Redis pool for caching, rate limiting and pub/sub (optional)
+    if await init_redis_pool() is None:
+        logger.warning("⚠️  Redis unavailable - rate limiting uses per-process fallback")
+    
+    # Indexes are built by scripts/ensure_indexes.py; workers only check for gaps
     try:
-        await db.users.create_index("email", unique=True)
-        await db.users.create_index("id", unique=True)
-        await db.user_progress.create_index("user_id")
-        await db.personal_files.create_index("user_id")
-        await db.documents.create_index("user_id")
-        await db.fsp_progress.create_index("user_id")
-        await db.subscriptions.create_index("user_id")
-        await db.badges.create_index("badge_id", unique=True)
-        await db.user_badges.create_index("user_id")
-        await db.user_badges.create_index([("user_id", 1), ("badge_id", 1)], unique=True)
-        await db.user_activity.create_index("user_id")
-        await db.user_activity.create_index([("user_id", 1), ("activity_type", 1)])
-        await db.user_activity.create_index("created_at")
-        await db.user_login_streak.create_index("user_id", unique=True)
-        await db.user_stats.create_index("user_id", unique=True)
-        logger.info("Database indexes created successfully")
+        if not await verify_indexes(db):
+            logger.info("Database indexes verified")
     except Exception as e:
-        logger.warning(f"⚠️  Database index creation failed (non-critical): {e}")
+        logger.warning(f"⚠️  Database index verification failed (non-critical): {e}")
+    
+    # Optional SDKs load lazily; import them in the background while serving
+    warm_up_task = start_warm_up()
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
     
     yield
     
+    loop_lag_task.cancel()
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    
     # Shutdown
+    await close_http_client()
+    await stop_audit_sink()
+    await close_redis_pool()
     client.close()
     logger.info("Database connection closed")
 
@@ -99,10 +109,6 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
-# Database dependency
-async def get_database():
-    return db
-
 # Create custom dependency for authentication
 from backend.auth import verify_token, get_user_by_id
 
@@ -127,7 +133,7 @@ from backend.routes.files import router as files_router
 from backend.routes.subscription import router as subscription_router
 from backend.routes.billing import router as billing_router
 from backend.routes.admin import router as admin_router
-from backend.routes.monitoring import router as monitoring_router
+from backend.routes.monitoring import router as monitoring_router, prometheus_router
 from backend.routes.backup import router as backup_router
 from backend.routes.deployment import router as deployment_router
 from backend.routes.gdpr import router as gdpr_router
@@ -227,6 +233,12 @@ async def ping_mongodb():
 
 # Include the router in the main app
 app.include_router(api_router)
+app.include_router(prometheus_router)
+
+# Add rate limiting middleware (innermost, so 429 responses still get CORS and security headers)
+from backend.middleware.rate_limit import RateLimitMiddleware
+
+app.add_middleware(RateLimitMiddleware, redis_factory=get_redis_client)
 
 # Configure CORS with proper security
 app.add_middleware(
@@ -238,40 +250,21 @@ app.add_middleware(
 )
 
 # Add security headers middleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline';"
-        return response
-
-app.add_middleware(SecurityHeadersMiddleware)
-
-# Add rate limiting middleware
-from backend.security import limiter, rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-
-# Add slowapi rate limiting to the app (only if limiter is available)
-if limiter is not None:
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
-    logger.info("Rate limiting enabled")
-else:
-    logger.warning("Rate limiting disabled - limiter initialization failed")
+from backend.middleware.security_headers import DOCS_CSP, SecurityHeadersMiddleware
 
-try:
-    from backend.routes.paypal import router as paypal_router
-    PAYPAL_AVAILABLE = True
-except ModuleNotFoundError:
-    PAYPAL_AVAILABLE = False
+app.add_middleware(
+    SecurityHeadersMiddleware,
+    path_policies={path: DOCS_CSP for path in (app.docs_url, app.redoc_url) if path},
+)
+
+# Request metrics (outermost, so latencies include every other middleware)
+from backend.middleware.metrics import MetricsMiddleware
+
+app.add_middleware(MetricsMiddleware)
+
+# The PayPal SDK is imported on first use; only check that it is installed
+PAYPAL_AVAILABLE = importlib.util.find_spec("paypalrestsdk") is not None
 
 if PAYPAL_AVAILABLE:
+    from backend.routes.paypal import router as paypal_router
     api_router.include_router(paypal_router)
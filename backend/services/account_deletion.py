@@ -0,0 +1,256 @@
+"""
+Batched account deletion engine for FSP Navigator.
+
+Users are purged in batches: every collection gets a single
+``delete_many({"user_id": {"$in": batch}})`` and the collections are
+processed concurrently. Uploaded files are unlinked in a thread pool once
+no surviving document references them any more, and GDPR export archives
+(local or S3) are deleted before their ``data_export_requests``. Pending
+``data_deletion_requests`` are claimed batch by batch with a ``batch_id``;
+a batch left in ``processing`` by a crashed run is picked up again first,
+which is safe because every step is idempotent: the batch's uploaded files
+are checkpointed in ``data_deletion_batches`` before anything is deleted,
+and users whose deletion is already in the audit log are not logged again.
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from backend.services.data_export import delete_export_archive
+from backend.services.retention import apply_audit_retention
+from backend.services.leaderboards import remove_users as remove_from_leaderboards
+
+logger = logging.getLogger(__name__)
+
+# (collection, field holding the user id); deleted outright
+USER_DATA_COLLECTIONS = (
+    ("personal_files", "user_id"),
+    ("user_progress", "user_id"),
+    ("fsp_progress", "user_id"),
+    ("documents", "user_id"),
+    ("subscriptions", "user_id"),
+    ("gdpr_consents", "user_id"),
+    ("privacy_settings", "user_id"),
+    ("user_stats", "user_id"),
+    ("user_badges", "user_id"),
+    ("user_activity", "user_id"),
+    ("user_login_streak", "user_id"),
+    ("game_results", "user_id"),
+    ("user_game_stats", "user_id"),
+    ("game_leaderboards", "user_id"),
+    ("user_decks", "user_id"),
+    ("term_reviews", "user_id"),
+    ("chat_history", "user_id"),
+    ("users", "id"),
+)
+
+# Payment records are kept for bookkeeping but no longer point to the user
+ANONYMIZED_PAYMENT_FIELDS = {"user_id": None, "email": "deleted_user@example.com"}
+
+
+class AccountDeletionEngine:
+    def __init__(
+        self,
+        db,
+        upload_dir: Optional[Path] = None,
+        batch_size: int = 500,
+        file_workers: int = 8,
+    ):
+        self.db = db
+        self.upload_dir = Path(upload_dir or os.environ.get("UPLOAD_DIR", "/app/uploads"))
+        self.batch_size = batch_size
+        self.file_workers = file_workers
+
+    async def purge_users(self, user_ids: List[str], batch_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Delete all data of ``user_ids`` (one batch) and their uploaded files.
+        With a ``batch_id`` the files to remove are checkpointed first, so a
+        rerun after a crash still removes them once their records are gone.
+        """
+        if not user_ids:
+            return {"users": 0, "deleted": {}, "files_removed": 0, "archives_removed": 0}
+        batch = {"$in": list(user_ids)}
+
+        file_paths = await self._batch_file_paths(batch, batch_id)
+        archives_removed = await self._remove_export_archives(batch)
+
+        async def delete(collection: str, field: str):
+            result = await self.db[collection].delete_many({field: batch})
+            return collection, result.deleted_count
+
+        async def anonymize_payments():
+            result = await self.db.payment_transactions.update_many({"user_id": batch}, {"$set": ANONYMIZED_PAYMENT_FIELDS})
+            return "payment_transactions", result.modified_count
+
+        async def delete_audit_logs():
+            # GDPR-class entries document the deletion itself and expire on their own
+            result = await self.db.audit_logs.delete_many({"user_id": batch, "retention_class": {"$ne": "gdpr"}})
+            return "audit_logs", result.deleted_count
+
+        results = await asyncio.gather(
+            *(delete(collection, field) for collection, field in USER_DATA_COLLECTIONS),
+            anonymize_payments(),
+            delete_audit_logs(),
+        )
+        await remove_from_leaderboards(user_ids)
+
+        files_removed = await self._remove_unreferenced_files(file_paths)
+        return {
+            "users": len(user_ids),
+            "deleted": dict(results),
+            "files_removed": files_removed,
+            "archives_removed": archives_removed,
+        }
+
+    async def _batch_file_paths(self, batch: Dict[str, Any], batch_id: Optional[str]) -> List[str]:
+        """Uploaded files of the batch, read from the batch checkpoint when a crashed run saved one."""
+        if batch_id is not None:
+            checkpoint = await self.db.data_deletion_batches.find_one({"_id": batch_id}, {"file_paths": 1})
+            if checkpoint is not None:
+                return checkpoint["file_paths"]
+
+        file_paths = await self.db.personal_files.distinct("file_path", {"user_id": batch, "file_path": {"$ne": None}})
+        if batch_id is not None:
+            await self.db.data_deletion_batches.update_one(
+                {"_id": batch_id},
+                {"$setOnInsert": {"file_paths": file_paths, "created_at": datetime.utcnow()}},
+                upsert=True
+            )
+        return file_paths
+
+    async def _remove_export_archives(self, batch: Dict[str, Any]) -> int:
+        """
+        Delete the export archives of the batch, then their requests; the
+        requests are the only pointer to an archive. A request whose archive
+        could not be deleted is kept, marked expired-now so the cleanup task
+        retries it.
+        """
+        exports = await self.db.data_export_requests.find(
+            {"user_id": batch, "storage": {"$ne": None}},
+            {"_id": 1, "storage": 1}
+        ).to_list(length=None)
+
+        def remove(export: Dict[str, Any]) -> bool:
+            try:
+                delete_export_archive(export["storage"])
+                return True
+            except Exception as e:
+                logger.error(f"Failed to delete export archive {export['_id']}: {e}")
+                return False
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.file_workers) as pool:
+            removed = await asyncio.gather(*(loop.run_in_executor(pool, remove, export) for export in exports))
+
+        failed = [export["_id"] for export, ok in zip(exports, removed) if not ok]
+        if failed:
+            await self.db.data_export_requests.update_many(
+                {"_id": {"$in": failed}}, {"$set": {"expiry_date": datetime.utcnow()}}
+            )
+        await self.db.data_export_requests.delete_many({"user_id": batch, "_id": {"$nin": failed}})
+        return sum(removed)
+
+    async def _remove_unreferenced_files(self, file_paths: List[str]) -> int:
+        if not file_paths:
+            return 0
+        # Reference count: skip files another (surviving) record still points to
+        still_referenced = set(await self.db.personal_files.distinct("file_path", {"file_path": {"$in": file_paths}}))
+        orphaned = [path for path in file_paths if path not in still_referenced]
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=self.file_workers) as pool:
+            removed = await asyncio.gather(*(loop.run_in_executor(pool, self._unlink, path) for path in orphaned))
+        return sum(removed)
+
+    def _unlink(self, relative_path: str) -> bool:
+        path = (self.upload_dir / relative_path).resolve()
+        try:
+            path.relative_to(self.upload_dir.resolve())
+        except ValueError:
+            logger.error(f"Refusing to delete file outside uploads: {path}")
+            return False
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.error(f"Failed to delete uploaded file {path}: {e}")
+            return False
+
+    # Deletion requests
+
+    async def _claim_batch(self, cutoff: datetime) -> Optional[str]:
+        """Mark up to batch_size due requests as processing under a new batch_id."""
+        pending = await self.db.data_deletion_requests.find(
+            {"status": "pending", "request_date": {"$lt": cutoff}},
+            {"_id": 1}
+        ).sort("request_date", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not pending:
+            return None
+        batch_id = str(uuid.uuid4())
+        result = await self.db.data_deletion_requests.update_many(
+            {"_id": {"$in": [request["_id"] for request in pending]}, "status": "pending"},
+            {"$set": {"status": "processing", "batch_id": batch_id, "processing_started": datetime.utcnow()}}
+        )
+        return batch_id if result.modified_count else None
+
+    async def _process_batch(self, batch_id: str) -> Dict[str, Any]:
+        requests = await self.db.data_deletion_requests.find(
+            {"batch_id": batch_id, "status": "processing"},
+            {"_id": 1, "user_id": 1}
+        ).to_list(length=None)
+        user_ids = list({request["user_id"] for request in requests})
+
+        summary = await self.purge_users(user_ids, batch_id)
+
+        now = datetime.utcnow()
+        # A resumed batch may have logged some of its users already
+        logged = set(await self.db.audit_logs.distinct(
+            "user_id", {"action": "privacy_account_deleted", "details.batch_id": batch_id}
+        ))
+        unlogged = [user_id for user_id in user_ids if user_id not in logged]
+        if unlogged:
+            await self.db.audit_logs.insert_many([
+                apply_audit_retention({
+                    "user_id": user_id,
+                    "action": "privacy_account_deleted",
+                    "details": {"batch_id": batch_id, "gdpr_compliance": True},
+                    "timestamp": now
+                })
+                for user_id in unlogged
+            ])
+        await self.db.data_deletion_requests.update_many(
+            {"batch_id": batch_id, "status": "processing"},
+            {"$set": {"status": "completed", "deletion_date": now}}
+        )
+        await self.db.data_deletion_batches.delete_one({"_id": batch_id})
+        logger.info(f"Deletion batch {batch_id}: {summary}")
+        return summary
+
+    async def process_pending(self, cutoff: datetime, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Purge every deletion request older than ``cutoff``. Batches interrupted
+        by an earlier run are finished first.
+        """
+        totals = {"batches": 0, "users": 0, "files_removed": 0}
+
+        interrupted = await self.db.data_deletion_requests.distinct("batch_id", {"status": "processing"})
+        batch_ids = [batch_id for batch_id in interrupted if batch_id]
+
+        while max_batches is None or totals["batches"] < max_batches:
+            batch_id = batch_ids.pop(0) if batch_ids else await self._claim_batch(cutoff)
+            if batch_id is None:
+                break
+            summary = await self._process_batch(batch_id)
+            totals["batches"] += 1
+            totals["users"] += summary["users"]
+            totals["files_removed"] += summary["files_removed"]
+
+        return totals
@@ -0,0 +1,208 @@
+"""
+Connectivity probes for the external services configured in the admin panel.
+
+Each probe checks one service with its own configuration: HTTP APIs through
+one shared ``httpx.AsyncClient`` (pooled connections), MongoDB through Motor
+and Cloudflare R2 through boto3 in the default executor, so a slow service
+never blocks the event loop. ``probe_all`` runs the probes concurrently,
+each under its own timeout, and keeps results for ``PROBE_CACHE_SECONDS``
+so the dashboard can poll cheaply; concurrent polls share one probe run.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT_SECONDS = 5.0
+PROBE_CACHE_SECONDS = 30.0
+
+# Public endpoints probed (overridable, e.g. to point the tests at stub servers)
+ENDPOINTS = {
+    "google_gemini": "https://generativelanguage.googleapis.com/v1/models",
+    "stripe": "https://api.stripe.com/v1/balance",
+    "paypal_sandbox": "https://api.sandbox.paypal.com/v1/oauth2/token",
+    "paypal_live": "https://api.paypal.com/v1/oauth2/token",
+    "openai": "https://api.openai.com/v1/models",
+}
+
+ProbeResult = Dict[str, Any]
+
+_http_client = None
+# (service, config digest) -> (expires at, probe task)
+_results: Dict[Tuple[str, str], Tuple[float, "asyncio.Task"]] = {}
+
+
+def get_http_client():
+    """Shared HTTP client of the probes, created on first use"""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(PROBE_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+
+
+def _status_result(name: str, response, success_message: str) -> ProbeResult:
+    if response.status_code == 200:
+        return {"success": True, "message": success_message}
+    return {"success": False, "message": f"{name} failed: {response.status_code}"}
+
+
+async def probe_mongodb(config: Dict[str, Any], timeout: float) -> ProbeResult:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(config.get("connection_string"), serverSelectionTimeoutMS=int(timeout * 1000))
+    try:
+        await client.admin.command("ping")
+        db_name = config.get("database_name", "test")
+        collections = await client[db_name].list_collection_names()
+        return {"success": True, "message": f"Connected successfully. Database: {db_name}, Collections: {len(collections)}"}
+    finally:
+        client.close()
+
+
+async def probe_google_gemini(config: Dict[str, Any], timeout: float) -> ProbeResult:
+    api_key = config.get("api_key")
+    if not api_key:
+        return {"success": False, "message": "API key is required"}
+    response = await get_http_client().get(ENDPOINTS["google_gemini"], params={"key": api_key}, timeout=timeout)
+    return _status_result("Gemini API", response, "Gemini API connected successfully")
+
+
+async def probe_stripe(config: Dict[str, Any], timeout: float) -> ProbeResult:
+    secret_key = config.get("secret_key")
+    if not secret_key:
+        return {"success": False, "message": "Secret key is required"}
+    response = await get_http_client().get(
+        ENDPOINTS["stripe"], headers={"Authorization": f"Bearer {secret_key}"}, timeout=timeout
+    )
+    return _status_result("Stripe API", response, "Stripe API connected successfully")
+
+
+async def probe_paypal(config: Dict[str, Any], timeout: float) -> ProbeResult:
+    client_id = config.get("client_id")
+    client_secret = config.get("client_secret")
+    mode = config.get("mode", "sandbox")
+    if not client_id or not client_secret:
+        return {"success": False, "message": "Client ID and secret are required"}
+    response = await get_http_client().post(
+        ENDPOINTS["paypal_sandbox" if mode == "sandbox" else "paypal_live"],
+        auth=(client_id, client_secret),
+        data={"grant_type": "client_credentials"},
+        timeout=timeout,
+    )
+    return _status_result("PayPal API", response, f"PayPal API connected successfully ({mode} mode)")
+
+
+async def probe_openai(config: Dict[str, Any], timeout: float) -> ProbeResult:
+    api_key = config.get("api_key")
+    if not api_key:
+        return {"success": False, "message": "API key is required"}
+    response = await get_http_client().get(
+        ENDPOINTS["openai"], headers={"Authorization": f"Bearer {api_key}"}, timeout=timeout
+    )
+    if response.status_code == 200:
+        models = response.json().get("data", [])
+        return {"success": True, "message": f"OpenAI API connected. Found {len(models)} models"}
+    return {"success": False, "message": f"OpenAI API failed: {response.status_code}"}
+
+
+async def probe_cloudflare_r2(config: Dict[str, Any], timeout: float) -> ProbeResult:
+    def check():
+        import boto3
+        from botocore.config import Config
+
+        r2_client = boto3.client(
+            "s3",
+            endpoint_url=config.get("endpoint_url"),
+            aws_access_key_id=config.get("access_key_id"),
+            aws_secret_access_key=config.get("secret_access_key"),
+            region_name="auto",
+            config=Config(connect_timeout=timeout, read_timeout=timeout, retries={"max_attempts": 1}),
+        )
+        bucket_name = config.get("bucket_name")
+        if bucket_name:
+            r2_client.head_bucket(Bucket=bucket_name)
+            return {"success": True, "message": f"R2 bucket '{bucket_name}' accessible"}
+        buckets = r2_client.list_buckets()
+        return {"success": True, "message": f"R2 connected. Found {len(buckets['Buckets'])} buckets"}
+
+    return await asyncio.get_running_loop().run_in_executor(None, check)
+
+
+# service -> (probe, label used in failure messages)
+PROBES: Dict[str, Tuple[Callable[[Dict[str, Any], float], Awaitable[ProbeResult]], str]] = {
+    "mongodb": (probe_mongodb, "MongoDB connection"),
+    "google_gemini": (probe_google_gemini, "Gemini test"),
+    "cloudflare_r2": (probe_cloudflare_r2, "R2 connection"),
+    "stripe": (probe_stripe, "Stripe test"),
+    "paypal": (probe_paypal, "PayPal test"),
+    "openai": (probe_openai, "OpenAI test"),
+}
+
+
+async def run_probe(service: str, config: Dict[str, Any], timeout: float = PROBE_TIMEOUT_SECONDS) -> ProbeResult:
+    """Probe one service; never raises. Adds ``latency_ms`` and ``checked_at``."""
+    if service not in PROBES:
+        return {"success": False, "message": "Unknown service"}
+    probe, label = PROBES[service]
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(probe(config, timeout), timeout)
+    except asyncio.TimeoutError:
+        result = {"success": False, "message": f"{label} timed out after {timeout:g}s"}
+    except Exception as e:
+        result = {"success": False, "message": f"{label} failed: {str(e)}"}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    result["checked_at"] = datetime.utcnow().isoformat()
+    return result
+
+
+def _config_digest(config: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+async def probe_all(
+    apis: Dict[str, Dict[str, Any]],
+    timeout: float = PROBE_TIMEOUT_SECONDS,
+    max_age: float = PROBE_CACHE_SECONDS,
+) -> Dict[str, ProbeResult]:
+    """Probe every service with a probe concurrently, reusing results younger than ``max_age``."""
+    now = time.monotonic()
+    for key in [key for key, (expires_at, _) in _results.items() if expires_at <= now]:
+        del _results[key]
+
+    tasks = {}
+    for service, config in apis.items():
+        if service not in PROBES:
+            continue
+        key = (service, _config_digest(config))
+        cached = _results.get(key)
+        if cached is None:
+            cached = (now + max_age, asyncio.ensure_future(run_probe(service, config, timeout)))
+            _results[key] = cached
+        tasks[service] = cached[1]
+
+    # Shielded: a poll that goes away must not cancel a probe other polls wait for
+    results = await asyncio.gather(*(asyncio.shield(task) for task in tasks.values()))
+    return dict(zip(tasks, results))
+
+
+def clear_probe_cache(service: Optional[str] = None):
+    """Forget cached results (of one service), e.g. after its configuration was applied"""
+    for key in [key for key in _results if service is None or key[0] == service]:
+        del _results[key]
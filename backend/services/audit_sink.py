@@ -0,0 +1,205 @@
+"""
+Buffered audit log writer for FSP Navigator.
+
+Audit entries are queued in memory and written to ``audit_logs`` (and
+admin panel access attempts to ``admin_access_logs``) with
+unordered ``insert_many`` batches, flushed when the batch size or the
+flush interval is reached. Callers only wait when the queue is full
+(backpressure). Batches that cannot be written are spooled to a local
+NDJSON file and replayed once MongoDB is reachable again.
+"""
+
+import os
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from bson import json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class AuditSink:
+    def __init__(
+        self,
+        collection,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        spool_dir: Optional[str] = None,
+        spool_name: str = "audit_logs",
+    ):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.spool_path = Path(
+            spool_dir or os.environ.get("AUDIT_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "fsp_audit_spool"))
+        ) / f"{spool_name}.ndjson"
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats = {"queued": 0, "written": 0, "spooled": 0, "replayed": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the background flush loop (called from the server lifespan)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._batch_ready = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Audit sink started (batch {self.max_batch}, interval {self.flush_interval}s)")
+
+    async def submit(self, entry: Dict[str, Any]):
+        """Queue an audit entry; waits only while the queue is full."""
+        await self._queue.put(entry)
+        self.stats["queued"] += 1
+        if self._queue.qsize() >= self.max_batch:
+            self._batch_ready.set()
+
+    async def stop(self):
+        """Drain every queued entry and stop the flush loop (server shutdown)."""
+        if not self.running:
+            return
+        self._stopping = True
+        self._batch_ready.set()
+        await self._task
+        self._task = None
+        logger.info(f"Audit sink drained: {self.stats}")
+
+    async def _run(self):
+        await self._replay_spool()
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Audit sink flush failed: {e}")
+            if self._stopping and self._queue.empty():
+                return
+
+    async def flush(self):
+        """Write everything currently queued, in batches of ``max_batch``."""
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert a batch unordered; returns how many new entries were stored.
+        Raises PyMongoError when MongoDB is unreachable."""
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            return len(batch)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            for error in write_errors:
+                # Duplicate keys mean the entry already made it (e.g. a replayed spool)
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    logger.error(f"Audit entry rejected: {error.get('errmsg')}")
+            return len(batch) - len(write_errors)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            self.stats["written"] += await self._insert(batch)
+        except PyMongoError as e:
+            logger.error(f"Audit log batch write failed, spooling {len(batch)} entries: {e}")
+            await self._spool(batch)
+            return
+
+        if self.spool_path.exists():
+            await self._replay_spool()
+
+    async def _spool(self, entries: List[Dict[str, Any]]):
+        lines = "".join(json_util.dumps(entry) + "\n" for entry in entries)
+
+        def append():
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, append)
+            self.stats["spooled"] += len(entries)
+        except OSError as e:
+            logger.error(f"Failed to spool {len(entries)} audit entries: {e}")
+
+    async def _replay_spool(self):
+        """Re-insert spooled entries; entries keep their _id so replays are idempotent."""
+        if not self.spool_path.exists():
+            return
+        replay_path = self.spool_path.with_suffix(".replaying")
+        try:
+            self.spool_path.replace(replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                entries = [json_util.loads(line) for line in f if line.strip()]
+        except OSError as e:
+            logger.error(f"Failed to read audit spool: {e}")
+            return
+
+        replayed = 0
+        for start in range(0, len(entries), self.max_batch):
+            try:
+                replayed += await self._insert(entries[start:start + self.max_batch])
+            except PyMongoError:
+                await self._spool(entries[start:])
+                break
+        replay_path.unlink(missing_ok=True)
+        self.stats["written"] += replayed
+        self.stats["replayed"] += replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} spooled audit entries")
+
+
+# Global sinks - started in the server lifespan
+audit_sink: Optional[AuditSink] = None
+access_log_sink: Optional[AuditSink] = None
+
+
+def get_audit_sink() -> Optional[AuditSink]:
+    """Return the running audit sink, or None outside the API server."""
+    if audit_sink is not None and audit_sink.running:
+        return audit_sink
+    return None
+
+
+def get_access_log_sink() -> Optional[AuditSink]:
+    """Return the running sink of ``admin_access_logs``, or None outside the API server."""
+    if access_log_sink is not None and access_log_sink.running:
+        return access_log_sink
+    return None
+
+
+async def start_audit_sink(db) -> AuditSink:
+    global audit_sink, access_log_sink
+    audit_sink = AuditSink(db.audit_logs)
+    await audit_sink.start()
+    access_log_sink = AuditSink(db.admin_access_logs, spool_name="admin_access_logs")
+    await access_log_sink.start()
+    return audit_sink
+
+
+async def stop_audit_sink():
+    global audit_sink, access_log_sink
+    for sink in (audit_sink, access_log_sink):
+        if sink is not None:
+            await sink.stop()
+    audit_sink = None
+    access_log_sink = None
@@ -0,0 +1,310 @@
+"""
+Backup catalog for FSP Navigator.
+
+Every backup archive produced by ``BackupService`` is recorded in the
+``backup_catalog`` collection together with its size, checksum, type,
+S3 location and parent snapshot. Status pages and retention policies run
+as indexed queries against the catalog instead of globbing and stat()-ing
+the backup directory on every call.
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable
+
+from pymongo import ASCENDING, DESCENDING
+
+from backend.models_billing import BackupCatalogEntry
+from backend.services.index_registry import register_indexes
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_ALGORITHM = "sha256"
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+# Archive naming used by BackupService: mongodb_backup_<ts>.gz / files_backup_<ts>.tar.gz
+BACKUP_FILENAME_PREFIXES = {
+    "mongodb_backup_": "database",
+    "files_backup_": "files",
+}
+
+# Index definitions for the backup_catalog collection
+CATALOG_INDEXES = register_indexes({"backup_catalog": [
+    ([("id", ASCENDING)], {"unique": True}),
+    ([("filename", ASCENDING)], {"unique": True}),
+    ([("status", ASCENDING), ("created_at", DESCENDING)], {}),
+    ([("status", ASCENDING), ("type", ASCENDING), ("created_at", DESCENDING)], {}),
+    ([("status", ASCENDING), ("verified_at", ASCENDING)], {}),
+]})
+
+
+@dataclass
+class RetentionPolicy:
+    """Grandfather-father-son retention: keep the newest backup of each of the
+    last ``daily`` days, ``weekly`` ISO weeks and ``monthly`` calendar months."""
+    daily: int = 7
+    weekly: int = 4
+    monthly: int = 12
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        return cls(
+            daily=int(os.environ.get("BACKUP_KEEP_DAILY", "7")),
+            weekly=int(os.environ.get("BACKUP_KEEP_WEEKLY", "4")),
+            monthly=int(os.environ.get("BACKUP_KEEP_MONTHLY", "12")),
+        )
+
+
+def compute_checksum(file_path: Path) -> str:
+    """Compute the SHA-256 checksum of a backup archive (blocking)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def compute_checksum_async(file_path: Path) -> str:
+    """Compute a checksum in the default executor so the event loop is not blocked."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, compute_checksum, file_path)
+
+
+def backup_type_from_filename(filename: str) -> Optional[str]:
+    """Infer the backup type from an archive name, or None for foreign files."""
+    for prefix, backup_type in BACKUP_FILENAME_PREFIXES.items():
+        if filename.startswith(prefix):
+            return backup_type
+    return None
+
+
+def _backup_created_at(backup_result: Dict[str, Any]) -> datetime:
+    if backup_result.get("created_at"):
+        return backup_result["created_at"]
+    if backup_result.get("timestamp"):
+        # BackupService timestamps are UTC, formatted as in the archive name
+        return datetime.strptime(backup_result["timestamp"], "%Y%m%d_%H%M%S")
+    return datetime.utcnow()
+
+
+def build_catalog_entry(backup_result: Dict[str, Any], parent_id: Optional[str] = None) -> Dict[str, Any]:
+    """Build a catalog document from a ``BackupService`` result dict."""
+    entry = BackupCatalogEntry(
+        filename=backup_result["filename"],
+        type=backup_result.get("type") or backup_type_from_filename(backup_result["filename"]) or "unknown",
+        local_path=backup_result.get("local_path"),
+        size=backup_result.get("size", 0),
+        checksum=backup_result.get("checksum"),
+        s3_url=backup_result.get("s3_url"),
+        s3_bucket=backup_result.get("s3_bucket"),
+        s3_key=backup_result.get("s3_key"),
+        parent_id=parent_id,
+        created_at=_backup_created_at(backup_result),
+    )
+    return entry.dict()
+
+
+def verify_catalog_entry(entry: Dict[str, Any]) -> str:
+    """Re-check a catalogued archive on disk; returns the resulting catalog status."""
+    local_path = entry.get("local_path")
+    if not local_path or not Path(local_path).exists():
+        # Offsite copy still counts as available
+        return "available" if entry.get("s3_key") else "missing"
+    if entry.get("checksum") and compute_checksum(Path(local_path)) != entry["checksum"]:
+        return "corrupt"
+    return "available"
+
+
+def record_backup_sync(db, backup_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Synchronous (pymongo) variant of ``BackupCatalog.record`` for Celery workers."""
+    backup_type = backup_result.get("type") or backup_type_from_filename(backup_result["filename"])
+    parent = db.backup_catalog.find_one(
+        {"status": "available", "type": backup_type},
+        {"_id": 0, "id": 1},
+        sort=[("created_at", DESCENDING)],
+    ) if backup_type else None
+    entry = build_catalog_entry(backup_result, parent_id=parent["id"] if parent else None)
+    db.backup_catalog.insert_one(dict(entry))
+    return entry
+
+
+def backfill_catalog_sync(db, backup_dir: Path) -> int:
+    """
+    Catalog archives that exist on disk but predate the catalog.
+
+    Both ``.gz`` database dumps and ``.tar.gz`` file archives are matched
+    explicitly. Runs from the scheduled verification task only.
+    """
+    known = set(db.backup_catalog.distinct("filename"))
+    candidates = [
+        backup_file
+        for pattern in ("mongodb_backup_*.gz", "files_backup_*.tar.gz")
+        for backup_file in backup_dir.glob(pattern)
+        if backup_file.name not in known
+    ]
+
+    # Oldest first so each archive is chained to its true predecessor
+    added = 0
+    for backup_file in sorted(candidates, key=lambda f: f.stat().st_mtime):
+        stat = backup_file.stat()
+        record_backup_sync(db, {
+            "filename": backup_file.name,
+            "local_path": str(backup_file),
+            "size": stat.st_size,
+            "checksum": compute_checksum(backup_file),
+            "created_at": datetime.utcfromtimestamp(stat.st_mtime),
+        })
+        added += 1
+    if added:
+        logger.info(f"Backfilled {added} existing backups into the catalog")
+    return added
+
+
+def verify_catalog_sync(db, max_age_hours: int = 24, batch_size: int = 100) -> Dict[str, int]:
+    """
+    Verify archives whose last verification is older than ``max_age_hours``.
+
+    Uses the (status, verified_at) index, so each scheduled run only touches
+    entries that are actually due.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    due = db.backup_catalog.find(
+        {"status": "available", "$or": [{"verified_at": None}, {"verified_at": {"$lt": cutoff}}]},
+        {"_id": 0, "id": 1, "local_path": 1, "checksum": 1, "s3_key": 1},
+    ).limit(batch_size)
+
+    counts = {"verified": 0, "corrupt": 0, "missing": 0}
+    for entry in due:
+        result = verify_catalog_entry(entry)
+        db.backup_catalog.update_one(
+            {"id": entry["id"]},
+            {"$set": {"status": result, "verified_at": datetime.utcnow()}},
+        )
+        counts["verified" if result == "available" else result] += 1
+        if result != "available":
+            logger.warning(f"Backup catalog entry {entry['id']} failed verification: {result}")
+    return counts
+
+
+def select_expired_backups(
+    entries: Iterable[Dict[str, Any]],
+    policy: RetentionPolicy,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Apply a GFS retention policy to catalog entries of a single backup type.
+
+    ``entries`` must be sorted newest first. The newest backup in each of the
+    retained day/week/month buckets is kept; everything else is returned as
+    expired. The most recent backup is always kept.
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+    current_monday = today - timedelta(days=today.weekday())
+
+    keep_ids = set()
+    seen_days, seen_weeks, seen_months = set(), set(), set()
+    ordered = list(entries)
+
+    for entry in ordered:
+        created = entry["created_at"].date()
+
+        day_key = created
+        if day_key not in seen_days and (today - created).days < policy.daily:
+            seen_days.add(day_key)
+            keep_ids.add(entry["id"])
+
+        week_key = created - timedelta(days=created.weekday())
+        weeks_ago = (current_monday - week_key).days // 7
+        if week_key not in seen_weeks and weeks_ago < policy.weekly:
+            seen_weeks.add(week_key)
+            keep_ids.add(entry["id"])
+
+        month_key = (created.year, created.month)
+        months_ago = (today.year - created.year) * 12 + (today.month - created.month)
+        if month_key not in seen_months and months_ago < policy.monthly:
+            seen_months.add(month_key)
+            keep_ids.add(entry["id"])
+
+    if ordered:
+        keep_ids.add(ordered[0]["id"])
+
+    return [entry for entry in ordered if entry["id"] not in keep_ids]
+
+
+class BackupCatalog:
+    """Async (Motor) access to the ``backup_catalog`` collection."""
+
+    def __init__(self, db):
+        self.collection = db.backup_catalog
+
+    async def get_latest(self, backup_type: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one(
+            {"status": "available", "type": backup_type},
+            {"_id": 0},
+            sort=[("created_at", DESCENDING)],
+        )
+
+    async def record(self, backup_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a freshly created backup, chaining it to the previous snapshot of its type."""
+        backup_type = backup_result.get("type") or backup_type_from_filename(backup_result["filename"])
+        parent = await self.get_latest(backup_type) if backup_type else None
+        entry = build_catalog_entry(backup_result, parent_id=parent["id"] if parent else None)
+        await self.collection.insert_one(dict(entry))
+        return entry
+
+    async def get_status(self, limit: int = 10) -> Dict[str, Any]:
+        """Aggregate counts/sizes and list the most recent available backups."""
+        totals = await self.collection.aggregate([
+            {"$match": {"status": "available"}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "total_size": {"$sum": "$size"}}},
+        ]).to_list(1)
+
+        recent = await self.collection.find(
+            {"status": "available"},
+            {"_id": 0, "filename": 1, "type": 1, "size": 1, "checksum": 1,
+             "s3_url": 1, "created_at": 1, "verified_at": 1},
+        ).sort("created_at", DESCENDING).limit(limit).to_list(limit)
+
+        backups = [
+            {**backup, "created": backup["created_at"].isoformat()}
+            for backup in recent
+        ]
+
+        return {
+            "backup_count": totals[0]["count"] if totals else 0,
+            "total_size": totals[0]["total_size"] if totals else 0,
+            "latest_backup": backups[0] if backups else None,
+            "backups": backups,
+        }
+
+    async def find_older_than(self, cutoff: datetime) -> List[Dict[str, Any]]:
+        return await self.collection.find(
+            {"status": "available", "created_at": {"$lt": cutoff}},
+            {"_id": 0},
+        ).to_list(length=None)
+
+    async def find_expired(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Return entries outside the GFS policy, evaluated per backup type."""
+        expired = []
+        for backup_type in await self.collection.distinct("type", {"status": "available"}):
+            entries = await self.collection.find(
+                {"status": "available", "type": backup_type},
+                {"_id": 0, "id": 1, "filename": 1, "local_path": 1, "s3_bucket": 1,
+                 "s3_key": 1, "created_at": 1},
+            ).sort("created_at", DESCENDING).to_list(length=None)
+            expired.extend(select_expired_backups(entries, policy, now))
+        return expired
+
+    async def mark_deleted(self, entry_ids: List[str]):
+        if not entry_ids:
+            return
+        await self.collection.update_many(
+            {"id": {"$in": entry_ids}},
+            {"$set": {"status": "deleted", "deleted_at": datetime.utcnow()}},
+        )
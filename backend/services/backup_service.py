@@ -4,9 +4,10 @@ import subprocess
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any
-import boto3
-from botocore.exceptions import ClientError
+from typing import Dict, List, Any, Optional
+from backend.services.backup_catalog import (
+    BackupCatalog, RetentionPolicy, compute_checksum_async
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class BackupService:
         
         if self.s3_bucket and self.aws_access_key:
             try:
+                import boto3  # only needed for offsite backups; slow to import
                 self.s3_client = boto3.client(
                     's3',
                     aws_access_key_id=self.aws_access_key,
@@ -85,18 +87,7 @@ class BackupService:
             backup_size = backup_path.stat().st_size
             logger.info(f"Database backup created: {backup_filename} ({backup_size} bytes)")
             
-            # Upload to S3 if configured
-            s3_url = None
-            if self.s3_client:
-                s3_url = await self._upload_to_s3(backup_path, backup_filename)
-            
-            return {
-                "filename": backup_filename,
-                "local_path": str(backup_path),
-                "size": backup_size,
-                "s3_url": s3_url,
-                "timestamp": timestamp
-            }
+            return await self._finalize_backup(backup_path, "database", backup_size, timestamp)
             
         except Exception as e:
             logger.error(f"Database backup failed: {str(e)}")
@@ -137,25 +128,36 @@ class BackupService:
             backup_size = backup_path.stat().st_size
             logger.info(f"Files backup created: {backup_filename} ({backup_size} bytes)")
             
-            # Upload to S3 if configured
-            s3_url = None
-            if self.s3_client:
-                s3_url = await self._upload_to_s3(backup_path, backup_filename)
-            
-            return {
-                "filename": backup_filename,
-                "local_path": str(backup_path),
-                "size": backup_size,
-                "s3_url": s3_url,
-                "timestamp": timestamp
-            }
+            return await self._finalize_backup(backup_path, "files", backup_size, timestamp)
             
         except Exception as e:
             logger.error(f"Files backup failed: {str(e)}")
             raise
     
+    async def _finalize_backup(self, backup_path: Path, backup_type: str, backup_size: int, timestamp: str) -> Dict[str, Any]:
+        """Checksum and offsite-copy a finished archive; the result is what gets catalogued."""
+        checksum = await compute_checksum_async(backup_path)
+        
+        # Upload to S3 if configured
+        s3_url = None
+        if self.s3_client:
+            s3_url = await self._upload_to_s3(backup_path, backup_path.name)
+        
+        return {
+            "filename": backup_path.name,
+            "type": backup_type,
+            "local_path": str(backup_path),
+            "size": backup_size,
+            "checksum": checksum,
+            "s3_url": s3_url,
+            "s3_bucket": self.s3_bucket if s3_url else None,
+            "s3_key": f"backups/{backup_path.name}" if s3_url else None,
+            "timestamp": timestamp
+        }
+    
     async def _upload_to_s3(self, file_path: Path, filename: str) -> str:
         """Upload backup file to S3."""
+        from botocore.exceptions import ClientError
         
         try:
             s3_key = f"backups/{filename}"
@@ -178,27 +180,59 @@ class BackupService:
             logger.error(f"Failed to upload to S3: {str(e)}")
             return None
     
-    async def cleanup_old_backups(self, keep_days: int = 30):
-        """Clean up old backup files."""
-        self._check_initialized()
+    async def cleanup_old_backups(
+        self,
+        catalog: BackupCatalog,
+        keep_days: Optional[int] = None,
+        policy: Optional[RetentionPolicy] = None
+    ):
+        """
+        Clean up old backups selected from the catalog.
         
-        cutoff_date = datetime.utcnow() - timedelta(days=keep_days)
+        With ``keep_days`` every backup older than the cutoff is removed;
+        otherwise the GFS retention policy (daily/weekly/monthly) applies.
+        """
+        self._check_initialized()
         
         try:
-            deleted_count = 0
-            for backup_file in self.backup_dir.glob("*_backup_*.gz"):
-                if backup_file.stat().st_mtime < cutoff_date.timestamp():
-                    backup_file.unlink()
-                    deleted_count += 1
-                    logger.info(f"Deleted old backup: {backup_file.name}")
+            if keep_days is not None:
+                cutoff_date = datetime.utcnow() - timedelta(days=keep_days)
+                expired = await catalog.find_older_than(cutoff_date)
+            else:
+                expired = await catalog.find_expired(policy or RetentionPolicy.from_env())
             
-            logger.info(f"Cleaned up {deleted_count} old backup files")
-            return {"deleted_count": deleted_count}
+            deleted_ids = []
+            for entry in expired:
+                await self._delete_backup_files(entry)
+                deleted_ids.append(entry["id"])
+                logger.info(f"Deleted old backup: {entry['filename']}")
+            
+            await catalog.mark_deleted(deleted_ids)
+            
+            logger.info(f"Cleaned up {len(deleted_ids)} old backup files")
+            return {"deleted_count": len(deleted_ids)}
             
         except Exception as e:
             logger.error(f"Backup cleanup failed: {str(e)}")
             raise
     
+    async def _delete_backup_files(self, entry: Dict[str, Any]):
+        """Remove a catalogued archive locally and from S3."""
+        local_path = entry.get("local_path")
+        if local_path:
+            Path(local_path).unlink(missing_ok=True)
+        
+        if self.s3_client and entry.get("s3_key"):
+            from botocore.exceptions import ClientError
+            try:
+                loop = asyncio.get_event_loop()
+                await loop.run_in_executor(
+                    None,
+                    lambda: self.s3_client.delete_object(Bucket=entry["s3_bucket"], Key=entry["s3_key"])
+                )
+            except ClientError as e:
+                logger.error(f"Failed to delete S3 backup {entry['s3_key']}: {str(e)}")
+    
     async def restore_database(self, backup_filename: str) -> Dict[str, str]:
         """Restore database from backup."""
         self._check_initialized()
@@ -247,30 +281,14 @@ class BackupService:
             logger.error(f"Database restore failed: {str(e)}")
             raise
     
-    async def get_backup_status(self) -> Dict[str, Any]:
-        """Get current backup status and statistics."""
+    async def get_backup_status(self, catalog: BackupCatalog) -> Dict[str, Any]:
+        """Get current backup status and statistics from the catalog."""
         self._check_initialized()
         
         try:
-            backups = []
-            total_size = 0
-            
-            for backup_file in sorted(self.backup_dir.glob("*_backup_*.gz"), reverse=True):
-                stat = backup_file.stat()
-                backups.append({
-                    "filename": backup_file.name,
-                    "size": stat.st_size,
-                    "created": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
-                total_size += stat.st_size
-            
-            return {
-                "backup_count": len(backups),
-                "total_size": total_size,
-                "latest_backup": backups[0] if backups else None,
-                "s3_configured": self.s3_client is not None,
-                "backups": backups[:10]  # Last 10 backups
-            }
+            status = await catalog.get_status(limit=10)  # Last 10 backups
+            status["s3_configured"] = self.s3_client is not None
+            return status
             
         except Exception as e:
             logger.error(f"Failed to get backup status: {str(e)}")
@@ -0,0 +1,123 @@
+"""
+Read-through cache for public content responses.
+
+Rendered JSON bodies are kept in Redis together with a strong ETag (a
+SHA-256 of the body). Cached responses live under a generation number
+that every write increments: per node for node content, and one for all
+utility-info listings, so they are invalidated at once. A response loaded
+before a write can therefore only be stored under the old generation,
+which is no longer read. Responses carry ``Cache-Control`` with
+``stale-while-revalidate`` so browsers and a CDN can serve them too.
+Without Redis every request is loaded from MongoDB, but ETags and
+conditional requests still work.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from backend.redis_config import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "content_cache"
+CACHE_TTL_SECONDS = int(os.environ.get("CONTENT_CACHE_TTL", "600"))
+CACHE_CONTROL = os.environ.get(
+    "CONTENT_CACHE_CONTROL", "public, max-age=60, stale-while-revalidate=600"
+)
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def render(payload: Any) -> Tuple[bytes, str]:
+    body = json.dumps(payload, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, make_etag(body)
+
+
+async def _generation(counter: str) -> int:
+    redis = await get_redis_client()
+    if redis is not None:
+        try:
+            return int(await redis.get(counter) or 0)
+        except Exception as e:
+            logger.warning(f"Content cache generation lookup failed: {e}")
+    return 0
+
+
+async def _bump_generation(counter: str):
+    redis = await get_redis_client()
+    if redis is not None:
+        try:
+            # Entries of old generations simply expire
+            await redis.incr(counter)
+        except Exception as e:
+            logger.warning(f"Content cache invalidation failed ({counter}): {e}")
+
+
+def _node_generation_key(node_id: str) -> str:
+    return f"{KEY_PREFIX}:node:{node_id}:generation"
+
+
+async def node_key(node_id: str) -> str:
+    """Key under the node's current generation (bumped on every write to the node)."""
+    generation = await _generation(_node_generation_key(node_id))
+    return f"{KEY_PREFIX}:node:{node_id}:{generation}"
+
+
+async def util_info_key(name: str) -> str:
+    """Key under the current util-info generation (bumped on every util-info write)."""
+    generation = await _generation(f"{KEY_PREFIX}:util_info:generation")
+    return f"{KEY_PREFIX}:util_info:{generation}:{name}"
+
+
+async def get_or_load(key: str, loader: Callable[[], Awaitable[Any]]) -> Optional[Tuple[bytes, str]]:
+    """Return (body, etag) from the cache, or load, render and store it.
+    Returns None when the loader finds nothing (nothing is cached then)."""
+    redis = await get_redis_client()
+    if redis is not None:
+        try:
+            # The shared client decodes responses, so bodies are stored as text
+            body, etag = await redis.hmget(key, "body", "etag")
+            if body is not None:
+                return body.encode("utf-8"), etag
+        except Exception as e:
+            logger.warning(f"Content cache read failed: {e}")
+            redis = None
+
+    payload = await loader()
+    if payload is None:
+        return None
+    body, etag = render(payload)
+
+    if redis is not None:
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={"body": body.decode("utf-8"), "etag": etag})
+                pipe.expire(key, CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Content cache write failed: {e}")
+    return body, etag
+
+
+async def invalidate_node(node_id: str):
+    await _bump_generation(_node_generation_key(node_id))
+
+
+async def invalidate_util_info():
+    await _bump_generation(f"{KEY_PREFIX}:util_info:generation")
+
+
+def cached_response(request: Request, body: bytes, etag: str) -> Response:
+    """200 with the body, or 304 when the client already holds this ETag."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
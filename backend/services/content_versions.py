@@ -0,0 +1,137 @@
+"""
+Delta-encoded version history for node content.
+
+Each version in ``content_versions`` is either a keyframe, holding the full
+``content_snapshot``, or a JSON patch (RFC 6902) against the previous
+version. A keyframe is written every ``keyframe_interval`` versions, so
+rebuilding any version reads one keyframe plus at most
+``keyframe_interval - 1`` patches. Versions written before delta encoding
+carry a full snapshot and are read as keyframes.
+"""
+
+import os
+import uuid
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import jsonpatch
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING
+
+from backend.models_content import NodeContent
+from backend.services.index_registry import register_indexes, register_queries
+
+logger = logging.getLogger(__name__)
+
+KEYFRAME_INTERVAL = int(os.environ.get("CONTENT_KEYFRAME_INTERVAL", "10"))
+
+# Version metadata returned by list_versions; all of it lives in
+# VERSION_LIST_INDEX so the listing is a covered query
+VERSION_LIST_FIELDS = ("content_id", "version_number", "id", "changed_at", "changed_by", "change_description")
+VERSION_LIST_INDEX = [
+    ("content_id", ASCENDING),
+    ("version_number", DESCENDING),
+    ("id", ASCENDING),
+    ("changed_at", ASCENDING),
+    ("changed_by", ASCENDING),
+    ("change_description", ASCENDING),
+]
+
+register_indexes({"content_versions": [(VERSION_LIST_INDEX, {"name": "content_version_listing"})]})
+register_queries(("content_versions", {"content_id": "c"}, [("version_number", DESCENDING)]))
+
+_KEYFRAME = {"content_snapshot": {"$exists": True}}
+
+
+class ContentVersionStore:
+    def __init__(self, db, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.db = db
+        self.collection = db.content_versions
+        self.keyframe_interval = max(1, keyframe_interval)
+
+    async def record(
+        self,
+        content: Dict[str, Any],
+        changed_by: str,
+        change_description: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Store ``content`` (a node_content document) as its current version."""
+        snapshot = NodeContent(**content).dict()
+        content_id = snapshot["id"]
+        version_number = content.get("version", 1)
+
+        previous = await self.collection.find_one(
+            {"content_id": content_id, "version_number": {"$lte": version_number}},
+            {"_id": 0, "id": 1, "version_number": 1, "chain_length": 1},
+            sort=[("version_number", DESCENDING)]
+        )
+        if previous and previous["version_number"] == version_number:
+            # Already recorded (e.g. a concurrent edit); a second entry would break the chain
+            return previous
+
+        version = {
+            "id": str(uuid.uuid4()),
+            "content_id": content_id,
+            "version_number": version_number,
+            "change_description": change_description,
+            "changed_by": changed_by,
+            "changed_at": datetime.utcnow(),
+        }
+
+        chain_length = (previous.get("chain_length", 0) + 1) if previous else 0
+        base = None
+        if previous and chain_length < self.keyframe_interval:
+            base = await self.get_snapshot(content_id, previous["version_number"])
+
+        if base is None:
+            version.update({"content_snapshot": snapshot, "chain_length": 0})
+        else:
+            version.update({
+                # bson's dumps compares dates and ObjectIds that json.dumps rejects
+                "patch": jsonpatch.JsonPatch.from_diff(base, snapshot, dumps=json_util.dumps).patch,
+                "base_version": previous["version_number"],
+                "chain_length": chain_length,
+            })
+
+        await self.collection.insert_one(version)
+        # Denormalized counter read by the CMS listing
+        await self.db.node_content.update_one({"id": content_id}, {"$inc": {"version_count": 1}})
+        return version
+
+    async def get_snapshot(self, content_id: str, version_number: int) -> Optional[Dict[str, Any]]:
+        """Rebuild the content of ``version_number`` from its keyframe and patches."""
+        keyframe = await self.collection.find_one(
+            {"content_id": content_id, "version_number": {"$lte": version_number}, **_KEYFRAME},
+            {"_id": 0, "version_number": 1, "content_snapshot": 1},
+            sort=[("version_number", DESCENDING)]
+        )
+        if keyframe is None:
+            return None
+
+        snapshot = keyframe["content_snapshot"]
+        reached = keyframe["version_number"]
+        deltas = self.collection.find(
+            {
+                "content_id": content_id,
+                "version_number": {"$gt": reached, "$lte": version_number},
+                "patch": {"$exists": True},
+            },
+            {"_id": 0, "version_number": 1, "patch": 1}
+        ).sort("version_number", ASCENDING)
+        async for delta in deltas:
+            snapshot = jsonpatch.apply_patch(snapshot, delta["patch"])
+            reached = delta["version_number"]
+
+        return snapshot if reached == version_number else None
+
+    async def list_versions(self, content_id: str, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+        """Version metadata, newest first, without loading snapshots or patches."""
+        projection = {"_id": 0, **{field: 1 for field in VERSION_LIST_FIELDS}}
+        cursor = self.collection.find({"content_id": content_id}, projection).sort(
+            "version_number", DESCENDING
+        ).skip(skip).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def count(self, content_id: str) -> int:
+        return await self.collection.count_documents({"content_id": content_id})
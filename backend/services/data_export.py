@@ -0,0 +1,189 @@
+"""
+GDPR data export (Article 15/20) for FSP Navigator.
+
+Exports are built by a Celery task: every collection holding user data is
+streamed cursor by cursor as NDJSON into a ZIP archive on disk, together
+with the user's uploaded files. Nothing is held in memory beyond one
+cursor batch. When EXPORT_S3_BUCKET is set the finished archive is moved
+to S3. Downloads are streamed back in chunks from either location.
+"""
+
+import os
+import json
+import logging
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+from bson import json_util
+from bson.json_util import JSONOptions, JSONMode
+
+logger = logging.getLogger(__name__)
+
+# (collection, field holding the user id)
+EXPORT_COLLECTIONS = (
+    ("users", "id"),
+    ("user_progress", "user_id"),
+    ("fsp_progress", "user_id"),
+    ("personal_files", "user_id"),
+    ("documents", "user_id"),
+    ("subscriptions", "user_id"),
+    ("payment_transactions", "user_id"),
+    ("gdpr_consents", "user_id"),
+    ("privacy_settings", "user_id"),
+    ("user_stats", "user_id"),
+    ("user_badges", "user_id"),
+    ("user_activity", "user_id"),
+    ("user_login_streak", "user_id"),
+    ("game_results", "user_id"),
+    ("user_game_stats", "user_id"),
+    ("term_reviews", "user_id"),
+    ("chat_history", "user_id"),
+    ("audit_logs", "user_id"),
+)
+
+# Never exported, even though they live on exported documents
+EXCLUDED_FIELDS = {"_id": 0, "password_hash": 0}
+
+CURSOR_BATCH_SIZE = 500
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+EXPORT_TTL_DAYS = 7
+
+_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=False)
+
+README = (
+    "This is your complete data export as per GDPR Article 20.\n\n"
+    "data/<collection>.ndjson  - one JSON document per line for every collection holding your data\n"
+    "files/                    - the documents you uploaded\n"
+)
+
+
+def get_export_dir() -> Path:
+    return Path(os.environ.get("EXPORT_DIR", "/app/exports"))
+
+
+def get_upload_dir() -> Path:
+    return Path(os.environ.get("UPLOAD_DIR", "/app/uploads"))
+
+
+def _export_filename(file_doc: Dict) -> str:
+    name = Path(file_doc.get("title") or "file").name
+    return f"files/{file_doc.get('id', 'unknown')}_{name}"
+
+
+def write_export_archive(
+    db,
+    user_id: str,
+    archive_path: Path,
+    upload_dir: Optional[Path] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+) -> Dict:
+    """
+    Stream all of a user's data into ``archive_path`` (synchronous, for the
+    Celery worker). ``progress(done, total, stage)`` is called after each step.
+    Returns per-collection document counts and the number of files included.
+    """
+    upload_dir = upload_dir or get_upload_dir()
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    total = len(EXPORT_COLLECTIONS) + 1
+    counts = {}
+
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("readme.txt", README)
+
+        for step, (collection, field) in enumerate(EXPORT_COLLECTIONS, start=1):
+            count = 0
+            cursor = db[collection].find({field: user_id}, EXCLUDED_FIELDS).batch_size(CURSOR_BATCH_SIZE)
+            with archive.open(f"data/{collection}.ndjson", "w") as out:
+                for doc in cursor:
+                    out.write(json_util.dumps(doc, json_options=_JSON_OPTIONS).encode("utf-8") + b"\n")
+                    count += 1
+            counts[collection] = count
+            if progress:
+                progress(step, total, collection)
+
+        files_added = 0
+        file_docs = db.personal_files.find(
+            {"user_id": user_id, "type": "file", "file_path": {"$ne": None}},
+            {"_id": 0, "id": 1, "file_path": 1, "title": 1}
+        ).batch_size(CURSOR_BATCH_SIZE)
+        for file_doc in file_docs:
+            path = (upload_dir / file_doc["file_path"]).resolve()
+            try:
+                path.relative_to(upload_dir.resolve())
+            except ValueError:
+                logger.error(f"Skipping file outside uploads in export: {path}")
+                continue
+            if path.is_file():
+                # ZipFile.write copies from disk in chunks
+                archive.write(path, arcname=_export_filename(file_doc))
+                files_added += 1
+        if progress:
+            progress(total, total, "files")
+
+    return {"documents": counts, "files": files_added, "size": archive_path.stat().st_size}
+
+
+# Storage
+
+def get_export_s3():
+    """(client, bucket) when exports are stored in S3, else (None, None)."""
+    bucket = os.environ.get("EXPORT_S3_BUCKET")
+    if not bucket:
+        return None, None
+    import boto3
+    client = boto3.client("s3", region_name=os.environ.get("AWS_REGION", "us-east-1"))
+    return client, bucket
+
+
+def store_export_archive(archive_path: Path) -> Dict:
+    """Move a finished archive to S3 if configured; returns its storage location."""
+    s3, bucket = get_export_s3()
+    if s3 is None:
+        return {"storage": "local", "path": str(archive_path)}
+    key = f"gdpr-exports/{archive_path.name}"
+    s3.upload_file(str(archive_path), bucket, key)
+    archive_path.unlink(missing_ok=True)
+    return {"storage": "s3", "s3_bucket": bucket, "s3_key": key}
+
+
+def iter_s3_archive(bucket: str, key: str) -> Iterator[bytes]:
+    s3, _ = get_export_s3()
+    body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    yield from body.iter_chunks(DOWNLOAD_CHUNK_SIZE)
+
+
+def delete_export_archive(export: Dict):
+    if export.get("storage") == "s3":
+        s3, _ = get_export_s3()
+        if s3 is not None:
+            s3.delete_object(Bucket=export["s3_bucket"], Key=export["s3_key"])
+    elif export.get("path"):
+        Path(export["path"]).unlink(missing_ok=True)
+
+
+# Inline JSON export
+
+async def iter_json_export(db, user_profile: Dict, user_id: str) -> AsyncIterator[str]:
+    """
+    Stream the legacy JSON export document section by section, so the
+    response never holds more than one cursor batch of user data.
+    """
+    def dumps(value) -> str:
+        return json_util.dumps(value, json_options=_JSON_OPTIONS)
+
+    yield '{"message": "User data exported successfully", '
+    yield f'"export_date": {json.dumps(datetime.utcnow().isoformat())}, '
+    yield f'"data": {{"user_profile": {dumps(user_profile)}'
+
+    for key, collection in (("personal_files", "personal_files"), ("transactions", "payment_transactions")):
+        yield f', "{key}": ['
+        first = True
+        async for doc in db[collection].find({"user_id": user_id}, EXCLUDED_FIELDS).batch_size(CURSOR_BATCH_SIZE):
+            yield ("" if first else ", ") + dumps(doc)
+            first = False
+        yield "]"
+
+    progress = await db.user_progress.find_one({"user_id": user_id}, EXCLUDED_FIELDS)
+    yield f', "progress": {dumps(progress)}}}}}'
@@ -0,0 +1,223 @@
+"""
+Declarative registry of the MongoDB indexes the app relies on.
+
+Modules declare their indexes as ``{collection: [(keys, options), ...]}``
+with ``register_indexes`` and the hot query shapes those indexes serve
+with ``register_queries``. ``scripts/ensure_indexes.py`` compares the
+declarations with ``list_indexes()`` and builds only the missing ones, so
+running it again is a no-op. An index whose keys exist with different
+options (``INDEX_OPTIONS``, e.g. not unique yet) is reported as
+mismatched and only rebuilt on request. API workers only verify at
+startup and log what is missing or mismatched; boot never waits on an
+index build.
+"""
+
+import asyncio
+import logging
+import importlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+IndexKeys = List[Tuple[str, Any]]
+IndexSpec = Tuple[IndexKeys, Dict[str, Any]]
+# (collection, filter, sort) of a query that must be served by an index
+QueryShape = Tuple[str, Dict[str, Any], IndexKeys]
+
+# Modules whose import registers declarations
+INDEX_MODULES = (
+    "backend.database",
+    "backend.services.backup_catalog",
+    "backend.services.retention",
+    "backend.services.content_versions",
+    "backend.services.notification_hub",
+    "backend.services.mini_game_data",
+    "backend.services.leaderboards",
+    "backend.services.question_decks",
+    "backend.services.term_reviews",
+    "backend.routes.reddit_forum",
+    "backend.routes.ai_assistant",
+    "backend.routes.documents",
+    "backend.middleware.ip_security",
+)
+
+# Options that change what an index enforces or which documents it holds
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression", "name")
+
+_indexes: Dict[str, List[IndexSpec]] = {}
+_queries: List[QueryShape] = []
+
+
+def key_signature(keys: IndexKeys) -> Tuple:
+    """Comparable form of a key pattern; text indexes compare by their fields."""
+    if any(direction == "text" for _, direction in keys):
+        return ("text", *sorted(field for field, direction in keys if direction == "text"))
+    return tuple((field, direction) for field, direction in keys)
+
+
+def existing_signature(index: Dict[str, Any]) -> Tuple:
+    """``key_signature`` of an index document returned by ``list_indexes()``."""
+    if "_fts" in index["key"]:
+        return ("text", *sorted(index.get("weights", {})))
+    return tuple(
+        (field, int(direction) if isinstance(direction, float) else direction)
+        for field, direction in index["key"].items()
+    )
+
+
+def option_signature(options: Dict[str, Any], name: Optional[str] = None) -> Dict[str, Any]:
+    """Comparable ``INDEX_OPTIONS`` of a declaration or index document; defaults are
+    left out, and the name only counts when the declaration sets one."""
+    signature = {}
+    for option in INDEX_OPTIONS:
+        value = options.get(option)
+        if value is None or value is False or (option == "name" and name is None):
+            continue
+        signature[option] = name if option == "name" else value
+    return signature
+
+
+def option_differences(declared: Dict[str, Any], existing: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """{option: (declared value, existing value)} for the options that differ."""
+    wanted = option_signature(declared, declared.get("name"))
+    found = option_signature(existing, existing.get("name") if "name" in declared else None)
+    return {
+        option: (wanted.get(option), found.get(option))
+        for option in INDEX_OPTIONS
+        if wanted.get(option) != found.get(option)
+    }
+
+
+def register_indexes(declared: Dict[str, List[IndexSpec]]) -> Dict[str, List[IndexSpec]]:
+    """Add a module's index declarations; returns them so modules can keep a name for them."""
+    for collection, specs in declared.items():
+        registered = _indexes.setdefault(collection, [])
+        known = {key_signature(keys) for keys, _ in registered}
+        for keys, options in specs:
+            if key_signature(keys) not in known:
+                registered.append((keys, options))
+                known.add(key_signature(keys))
+    return declared
+
+
+def register_queries(*queries: QueryShape):
+    _queries.extend(query for query in queries if query not in _queries)
+
+
+def _load_declarations():
+    for module in INDEX_MODULES:
+        importlib.import_module(module)
+
+
+def declared_indexes() -> Dict[str, List[IndexSpec]]:
+    _load_declarations()
+    return _indexes
+
+
+def declared_queries() -> List[QueryShape]:
+    _load_declarations()
+    return list(_queries)
+
+
+# A declared index whose keys exist with other options: (keys, declared options, existing index, differences)
+Mismatch = Tuple[IndexKeys, Dict[str, Any], Dict[str, Any], Dict[str, Tuple[Any, Any]]]
+
+
+async def _compare_on(db, collection: str, specs: List[IndexSpec]) -> Tuple[List[IndexSpec], List[Mismatch]]:
+    by_signature: Dict[Tuple, List[Dict[str, Any]]] = {}
+    async for index in db[collection].list_indexes():
+        by_signature.setdefault(existing_signature(index), []).append(dict(index))
+    missing, mismatched = [], []
+    for keys, options in specs:
+        candidates = by_signature.get(key_signature(keys))
+        if not candidates:
+            missing.append((keys, options))
+        elif all(option_differences(options, index) for index in candidates):
+            index = candidates[0]
+            mismatched.append((keys, options, index, option_differences(options, index)))
+    return missing, mismatched
+
+
+async def compare_indexes(
+    db, declared: Optional[Dict[str, List[IndexSpec]]] = None
+) -> Tuple[Dict[str, List[IndexSpec]], Dict[str, List[Mismatch]]]:
+    """(missing, mismatched) declared indexes per collection; all collections are checked concurrently."""
+    declared = declared if declared is not None else declared_indexes()
+    collections = list(declared)
+    results = await asyncio.gather(*(_compare_on(db, name, declared[name]) for name in collections))
+    missing = {name: found for name, (found, _) in zip(collections, results) if found}
+    mismatched = {name: found for name, (_, found) in zip(collections, results) if found}
+    return missing, mismatched
+
+
+async def missing_indexes(
+    db, declared: Optional[Dict[str, List[IndexSpec]]] = None
+) -> Dict[str, List[IndexSpec]]:
+    """Declared indexes that do not exist yet, per collection."""
+    return (await compare_indexes(db, declared))[0]
+
+
+async def mismatched_indexes(
+    db, declared: Optional[Dict[str, List[IndexSpec]]] = None
+) -> Dict[str, List[Mismatch]]:
+    """Declared indexes whose keys exist with different options, per collection."""
+    return (await compare_indexes(db, declared))[1]
+
+
+async def build_missing_indexes(
+    db, declared: Optional[Dict[str, List[IndexSpec]]] = None
+) -> Dict[str, List[str]]:
+    """Create only the missing indexes, one ``createIndexes`` command per collection."""
+    built = {}
+    for collection, specs in (await missing_indexes(db, declared)).items():
+        built[collection] = await db[collection].create_indexes(
+            [IndexModel(keys, **options) for keys, options in specs]
+        )
+        logger.info(f"Built indexes on {collection}: {built[collection]}")
+    return built
+
+
+def _index_model(index: Dict[str, Any]) -> IndexModel:
+    """IndexModel recreating an index document returned by ``list_indexes()``."""
+    options = {k: v for k, v in index.items() if k not in ("v", "key", "ns")}
+    return IndexModel(list(index["key"].items()), **options)
+
+
+async def rebuild_mismatched_indexes(db, mismatched: Dict[str, List[Mismatch]]) -> Dict[str, List[str]]:
+    """Drop each mismatched index and build it as declared. If the new build fails
+    (e.g. duplicates block a unique index) the old index is restored and the error raised."""
+    rebuilt: Dict[str, List[str]] = {}
+    for collection, mismatches in mismatched.items():
+        for keys, options, index, _ in mismatches:
+            await db[collection].drop_index(index["name"])
+            try:
+                names = await db[collection].create_indexes([IndexModel(keys, **options)])
+            except Exception:
+                await db[collection].create_indexes([_index_model(index)])
+                raise
+            rebuilt.setdefault(collection, []).extend(names)
+            logger.info(f"Rebuilt index {index['name']} on {collection} as {names}")
+    return rebuilt
+
+
+async def verify_indexes(db) -> Dict[str, List[IndexSpec]]:
+    """Startup check: log missing and mismatched indexes without building them;
+    returns the affected declarations per collection."""
+    missing, mismatched = await compare_indexes(db)
+    for collection, specs in missing.items():
+        logger.warning(
+            f"Missing indexes on {collection}: {[key_signature(keys) for keys, _ in specs]} "
+            f"- run scripts/ensure_indexes.py"
+        )
+    for collection, mismatches in mismatched.items():
+        for keys, _, index, differences in mismatches:
+            logger.warning(
+                f"Index {index['name']} on {collection} differs from its declaration: {differences} "
+                f"- run scripts/ensure_indexes.py --rebuild"
+            )
+    problems = {collection: list(specs) for collection, specs in missing.items()}
+    for collection, mismatches in mismatched.items():
+        problems.setdefault(collection, []).extend((keys, options) for keys, options, _, _ in mismatches)
+    return problems
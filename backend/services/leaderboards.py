@@ -0,0 +1,239 @@
+"""
+Materialized mini-game leaderboards.
+
+``game_leaderboards`` holds one entry per (game type, user) with the
+user's best and average score, updated by an atomic upsert whenever a
+game result is saved. Each game type is mirrored into a Redis sorted set
+so the top of the board and a user's rank ("you are #342") are
+O(log n) lookups no matter how many games were played; the set is rebuilt
+from MongoDB when Redis comes back empty. Without Redis, reads fall back
+to the collection's ranking index.
+
+Display names come from a small user directory cached in Redis.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+
+from backend.models import GameResult, GameType
+from backend.redis_config import get_redis_client
+from backend.services.index_registry import register_indexes, register_queries
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "leaderboard:{game_type}"
+REBUILD_LOCK_KEY = "leaderboard:{game_type}:rebuild"
+DIRECTORY_KEY = "user_directory:{user_id}"
+DIRECTORY_TTL_SECONDS = 6 * 60 * 60
+REBUILD_BATCH_SIZE = 1000
+
+RANKING_SORT = [("best_score", -1), ("avg_score", -1), ("user_id", -1)]
+ENTRY_PROJECTION = {"_id": 0, "user_id": 1, "best_score": 1, "avg_score": 1, "games_played": 1}
+
+
+LEADERBOARD_INDEXES = register_indexes({"game_leaderboards": [
+    ([("game_type", 1), ("user_id", 1)], {"unique": True}),
+    ([("game_type", 1), *RANKING_SORT], {}),
+]})
+register_queries(("game_leaderboards", {"game_type": "fachbegriffe"}, RANKING_SORT))
+
+
+def ranking_score(best_score: int, avg_score: float) -> float:
+    """Single sorted-set score ordering by best score, then average (both 0-100)."""
+    return best_score * 100000 + round(avg_score * 100)
+
+
+def entry_pipeline(result: GameResult, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    now = now or datetime.utcnow()
+    return [
+        {"$set": {
+            "games_played": {"$add": [{"$ifNull": ["$games_played", 0]}, 1]},
+            "total_score": {"$add": [{"$ifNull": ["$total_score", 0]}, result.score]},
+            "best_score": {"$max": [{"$ifNull": ["$best_score", 0]}, result.score]},
+            "updated_at": now,
+        }},
+        {"$set": {"avg_score": {"$divide": ["$total_score", "$games_played"]}}},
+    ]
+
+
+async def record_result(db, result: GameResult):
+    """Fold one game into the user's leaderboard entry and the sorted set."""
+    try:
+        entry = await db.game_leaderboards.find_one_and_update(
+            {"game_type": result.game_type, "user_id": result.user_id},
+            entry_pipeline(result),
+            projection=ENTRY_PROJECTION,
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except Exception as e:
+        logger.error(f"Error updating leaderboard: {str(e)}")
+        return
+
+    redis = await get_redis_client()
+    if redis is not None:
+        key = LEADERBOARD_KEY.format(game_type=result.game_type)
+        try:
+            # An empty set is left to the next read's rebuild: a lone member would look complete
+            if await redis.exists(key):
+                await redis.zadd(key, {result.user_id: ranking_score(entry["best_score"], entry["avg_score"])})
+        except Exception as e:
+            logger.warning(f"Leaderboard cache update failed: {e}")
+
+
+async def _rebuild_sorted_set(db, redis, game_type: str) -> bool:
+    """Refill an empty sorted set from MongoDB; returns False if another worker holds the lock."""
+    if not await redis.set(REBUILD_LOCK_KEY.format(game_type=game_type), "1", nx=True, ex=60):
+        return False
+    key = LEADERBOARD_KEY.format(game_type=game_type)
+    try:
+        batch = {}
+        async for entry in db.game_leaderboards.find({"game_type": game_type}, ENTRY_PROJECTION):
+            batch[entry["user_id"]] = ranking_score(entry["best_score"], entry["avg_score"])
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                await redis.zadd(key, batch)
+                batch = {}
+        if batch:
+            await redis.zadd(key, batch)
+    except Exception:
+        # A partial set would look complete to the next reader
+        await redis.delete(key)
+        raise
+    finally:
+        await redis.delete(REBUILD_LOCK_KEY.format(game_type=game_type))
+    logger.info(f"Rebuilt leaderboard sorted set for {game_type}")
+    return True
+
+
+async def _ready_sorted_set(db, game_type: str):
+    """Redis client whose sorted set for ``game_type`` is populated, or None to use MongoDB."""
+    redis = await get_redis_client()
+    if redis is None:
+        return None
+    try:
+        if await redis.exists(LEADERBOARD_KEY.format(game_type=game_type)):
+            return redis
+        if await db.game_leaderboards.find_one({"game_type": game_type}, {"_id": 1}) is None:
+            return None
+        return redis if await _rebuild_sorted_set(db, redis, game_type) else None
+    except Exception as e:
+        logger.warning(f"Leaderboard cache unavailable: {e}")
+        return None
+
+
+async def top_entries(db, game_type: str, limit: int) -> List[Dict[str, Any]]:
+    """Best ``limit`` entries, highest first."""
+    redis = await _ready_sorted_set(db, game_type)
+    if redis is not None:
+        try:
+            user_ids = await redis.zrevrange(LEADERBOARD_KEY.format(game_type=game_type), 0, limit - 1)
+            entries = await db.game_leaderboards.find(
+                {"game_type": game_type, "user_id": {"$in": user_ids}}, ENTRY_PROJECTION
+            ).to_list(length=limit)
+            by_user = {entry["user_id"]: entry for entry in entries}
+            return [by_user[user_id] for user_id in user_ids if user_id in by_user]
+        except Exception as e:
+            logger.warning(f"Leaderboard cache read failed: {e}")
+
+    cursor = db.game_leaderboards.find({"game_type": game_type}, ENTRY_PROJECTION).sort(RANKING_SORT).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def user_position(db, game_type: str, user_id: str) -> Dict[str, Any]:
+    """1-based rank of ``user_id`` (None if they have not played) and the board size."""
+    entry = await db.game_leaderboards.find_one({"game_type": game_type, "user_id": user_id}, ENTRY_PROJECTION)
+    position = {"rank": None, "total_players": 0, "entry": entry}
+
+    redis = await _ready_sorted_set(db, game_type)
+    if redis is not None:
+        try:
+            key = LEADERBOARD_KEY.format(game_type=game_type)
+            if entry is not None:
+                # Re-add in case the set was rebuilt before this entry was written
+                await redis.zadd(key, {user_id: ranking_score(entry["best_score"], entry["avg_score"])})
+                position["rank"] = await redis.zrevrank(key, user_id) + 1
+            position["total_players"] = await redis.zcard(key)
+            return position
+        except Exception as e:
+            logger.warning(f"Leaderboard cache read failed: {e}")
+
+    position["total_players"] = await db.game_leaderboards.count_documents({"game_type": game_type})
+    if entry is not None:
+        best, avg = entry["best_score"], entry["avg_score"]
+        position["rank"] = 1 + await db.game_leaderboards.count_documents({
+            "game_type": game_type,
+            "$or": [
+                {"best_score": {"$gt": best}},
+                {"best_score": best, "avg_score": {"$gt": avg}},
+                {"best_score": best, "avg_score": avg, "user_id": {"$gt": user_id}},
+            ]
+        })
+    return position
+
+
+async def remove_users(user_ids: Iterable[str]):
+    """Drop deleted users from every cached leaderboard."""
+    user_ids = list(user_ids)
+    redis = await get_redis_client()
+    if redis is None or not user_ids:
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for game_type in GameType:
+                pipe.zrem(LEADERBOARD_KEY.format(game_type=game_type.value), *user_ids)
+            pipe.delete(*(DIRECTORY_KEY.format(user_id=user_id) for user_id in user_ids))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Leaderboard cache cleanup failed: {e}")
+
+
+def display_name(user: Dict[str, Any]) -> str:
+    """First name and last initial, or a neutral placeholder."""
+    first, last = (user.get("first_name") or "").strip(), (user.get("last_name") or "").strip()
+    if first:
+        return f"{first} {last[0]}." if last else first
+    return f"User {user['id'][:8]}"
+
+
+async def display_names(db, user_ids: List[str]) -> Dict[str, str]:
+    """Display names for ``user_ids`` from the cached user directory."""
+    names: Dict[str, str] = {}
+    redis = await get_redis_client()
+    if redis is not None and user_ids:
+        try:
+            cached = await redis.mget([DIRECTORY_KEY.format(user_id=user_id) for user_id in user_ids])
+            names = {user_id: name for user_id, name in zip(user_ids, cached) if name is not None}
+        except Exception as e:
+            logger.warning(f"User directory read failed: {e}")
+            redis = None
+
+    missing = [user_id for user_id in user_ids if user_id not in names]
+    if missing:
+        users = await db.users.find(
+            {"id": {"$in": missing}}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1}
+        ).to_list(length=len(missing))
+        loaded = {user["id"]: display_name(user) for user in users}
+        names.update(loaded)
+        if redis is not None and loaded:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for user_id, name in loaded.items():
+                        pipe.set(DIRECTORY_KEY.format(user_id=user_id), name, ex=DIRECTORY_TTL_SECONDS)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"User directory write failed: {e}")
+
+    # Users deleted since they played keep a neutral placeholder
+    return {user_id: names.get(user_id) or f"User {user_id[:8]}" for user_id in user_ids}
+
+
+async def forget_display_name(user_id: str):
+    redis = await get_redis_client()
+    if redis is not None:
+        try:
+            await redis.delete(DIRECTORY_KEY.format(user_id=user_id))
+        except Exception as e:
+            logger.warning(f"User directory invalidation failed for {user_id}: {e}")
@@ -0,0 +1,127 @@
+"""
+Prometheus instrumentation for the API process.
+
+``MetricsMiddleware`` (backend/middleware/metrics.py) times every request
+per route template and opens a ``RequestStats`` in a context variable.
+``CommandMetrics``, registered on the Mongo clients, records every command
+and adds its duration to the stats of the request that issued it (Motor
+runs PyMongo in a thread pool but copies the context, so the variable is
+visible there). With query budgets enabled it also records the shape of
+each query (see services/query_budget.py). ``monitor_event_loop_lag``
+measures how late the loop wakes up from a short sleep.
+``render_metrics`` produces the text exposition format, aggregating all
+workers when PROMETHEUS_MULTIPROC_DIR is set.
+"""
+
+import os
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from pymongo import monitoring
+
+from backend.services.query_budget import query_shape
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL = 0.5  # seconds between event loop lag probes
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ["method", "route"]
+)
+REQUESTS = Counter(
+    "http_requests", "Requests by route template and status code", ["method", "route", "status"]
+)
+REQUEST_DB_COMMANDS = Histogram(
+    "http_request_db_commands", "MongoDB commands issued per request", ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf")),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in MongoDB commands per request", ["method", "route"]
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trips", ["command", "outcome"]
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds", "Delay of the event loop waking up from a sleep", multiprocess_mode="max"
+)
+
+
+class RequestStats:
+    """Database work attributed to one request; query shapes only when tracing."""
+
+    __slots__ = ("db_commands", "db_seconds", "queries", "shapes")
+
+    def __init__(self, trace: bool = False):
+        self.db_commands = 0
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.shapes: Optional[Dict[str, int]] = {} if trace else None
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def route_label(scope) -> str:
+    """Route template (``/api/forums/{forum_slug}``) so label values stay bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    REQUEST_SECONDS.labels(method, route).observe(seconds)
+    REQUESTS.labels(method, route, str(status)).inc()
+    REQUEST_DB_COMMANDS.labels(method, route).observe(stats.db_commands)
+    REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Command round trips per command name, attributed to the current request."""
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.labels(event.command_name, outcome).observe(seconds)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.db_commands += 1
+            stats.db_seconds += seconds
+
+    def started(self, event):
+        stats = current_request_stats.get()
+        if stats is not None and stats.shapes is not None:
+            shape = query_shape(event.command_name, event.command)
+            if shape is not None:
+                stats.queries += 1
+                stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+command_metrics = CommandMetrics()
+
+
+async def monitor_event_loop_lag(interval: float = LOOP_LAG_INTERVAL):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - started - interval))
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """(body, content type) of the Prometheus text exposition."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,186 @@
+"""
+Data access for the mini-game collections.
+
+All timestamps are stored as native BSON dates (older rows held ISO
+strings; see scripts/migrate_mini_game_dates.py). Reads use projections
+limited to the response fields and hit compound indexes in index order,
+so a user's recent results come from an index range scan with no
+in-memory sort. Per-user statistics are maintained by one atomic upsert
+per game, so concurrent submissions never lose an update; duplicate rows
+left by the old read-modify-write code are merged by
+``merge_duplicate_game_stats`` before the unique index is built.
+"""
+
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.models import GameResult, GameType
+from backend.services import leaderboards
+from backend.services.index_registry import register_indexes, register_queries
+
+logger = logging.getLogger(__name__)
+
+DATE_FIELDS = {
+    "game_results": ("created_at",),
+    "clinical_cases": ("created_at", "updated_at"),
+    "fachbegriffe_terms": ("created_at", "updated_at"),
+    "user_game_stats": ("created_at", "updated_at"),
+}
+
+# (keys, options) per collection; the unique stats index lets concurrent
+# first-game upserts for one user converge on a single document
+GAME_INDEXES = register_indexes({
+    "game_results": [
+        ([("user_id", 1), ("game_type", 1), ("created_at", -1)], {}),
+        ([("user_id", 1), ("created_at", -1)], {}),
+        ([("game_type", 1), ("score", -1)], {}),
+    ],
+    "clinical_cases": [
+        ([("is_active", 1), ("category", 1), ("difficulty", 1)], {}),
+        ([("id", 1)], {}),
+    ],
+    "fachbegriffe_terms": [
+        ([("is_active", 1), ("category", 1), ("difficulty", 1)], {}),
+        ([("id", 1)], {}),
+    ],
+    "user_game_stats": [
+        ([("user_id", 1)], {"unique": True}),
+    ],
+})
+register_queries(
+    ("game_results", {"user_id": "u", "game_type": "fachbegriffe"}, [("created_at", -1)]),
+    ("game_results", {"user_id": "u"}, [("created_at", -1)]),
+    ("game_results", {"game_type": "fachbegriffe"}, [("score", -1)]),
+    ("fachbegriffe_terms", {"is_active": True, "category": "anatomy"}, []),
+)
+
+# Game types with their own counters on user_game_stats (fields are prefixed with the type)
+STATS_PREFIXES = {GameType.CLINICAL_CASES.value, GameType.FACHBEGRIFFE.value}
+
+RESULT_PROJECTION = {
+    "_id": 0, "id": 1, "user_id": 1, "game_type": 1, "game_mode": 1, "score": 1,
+    "total_questions": 1, "correct_answers": 1, "time_spent_seconds": 1, "streak": 1, "created_at": 1,
+}
+
+
+def parse_legacy_date(value: Any) -> Any:
+    """ISO strings written by older code become datetimes; anything else is kept."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            logger.warning(f"Unparseable mini-game timestamp: {value!r}")
+    return value
+
+
+async def fetch_game_results(db, user_id: str, game_type: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Newest results first, read in (user_id[, game_type], created_at) index order."""
+    query = {"user_id": user_id}
+    if game_type:
+        query["game_type"] = game_type
+    cursor = db.game_results.find(query, RESULT_PROJECTION).sort("created_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+def _add(field: str, amount) -> Dict[str, Any]:
+    return {"$add": [{"$ifNull": [f"${field}", 0]}, amount]}
+
+
+def _max(field: str, value) -> Dict[str, Any]:
+    return {"$max": [{"$ifNull": [f"${field}", 0]}, value]}
+
+
+def game_stats_pipeline(result: GameResult, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Update pipeline adding one game to user_game_stats (works as an upsert)."""
+    now = now or datetime.utcnow()
+    counters = {
+        "id": {"$ifNull": ["$id", str(uuid.uuid4())]},
+        "created_at": {"$ifNull": ["$created_at", now]},
+        "updated_at": now,
+        "total_games_played": _add("total_games_played", 1),
+        "total_time_spent_seconds": _add("total_time_spent_seconds", result.time_spent_seconds),
+    }
+    averages = {}
+    prefix = result.game_type
+    if prefix in STATS_PREFIXES:
+        counters.update({
+            f"{prefix}_played": _add(f"{prefix}_played", 1),
+            f"{prefix}_best_score": _max(f"{prefix}_best_score", result.score),
+            f"{prefix}_total_score": _add(f"{prefix}_total_score", result.score),
+        })
+        if prefix == GameType.FACHBEGRIFFE.value:
+            counters["fachbegriffe_best_streak"] = _max("fachbegriffe_best_streak", result.streak or 0)
+        # Second stage so the average sees the incremented counters
+        averages[f"{prefix}_average_score"] = {
+            "$divide": [f"${prefix}_total_score", f"${prefix}_played"]
+        }
+    pipeline = [{"$set": counters}]
+    if averages:
+        pipeline.append({"$set": averages})
+    return pipeline
+
+
+async def update_game_stats(db, result: GameResult):
+    try:
+        await db.user_game_stats.update_one(
+            {"user_id": result.user_id}, game_stats_pipeline(result), upsert=True
+        )
+    except Exception as e:
+        # The stored result stays authoritative; a failed stats update must not reject it
+        logger.error(f"Error updating user game stats: {str(e)}")
+
+
+async def record_game_result(db, result: GameResult):
+    """Insert the result, then apply it to the stats and leaderboard concurrently.
+
+    Only a stored result is counted: if the insert fails nothing else changes.
+    The two follow-up upserts are each atomic but not transactional with the
+    insert; they log their own failures instead of rejecting the result.
+    """
+    await db.game_results.insert_one(result.dict())
+    await asyncio.gather(
+        update_game_stats(db, result),
+        leaderboards.record_result(db, result),
+    )
+
+
+def _merge_stats(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One stats document counting the games of all ``rows`` (oldest row first)."""
+    summed = ["total_games_played", "total_time_spent_seconds"]
+    maximal = ["fachbegriffe_best_streak"]
+    for prefix in STATS_PREFIXES:
+        summed += [f"{prefix}_played", f"{prefix}_total_score"]
+        maximal.append(f"{prefix}_best_score")
+
+    merged = dict(rows[0])
+    for field in summed:
+        merged[field] = sum(row.get(field) or 0 for row in rows)
+    for field in maximal:
+        merged[field] = max(row.get(field) or 0 for row in rows)
+    for prefix in STATS_PREFIXES:
+        played = merged[f"{prefix}_played"]
+        merged[f"{prefix}_average_score"] = merged[f"{prefix}_total_score"] / played if played else 0
+    updated = [parse_legacy_date(row.get("updated_at")) for row in rows]
+    merged["updated_at"] = max((value for value in updated if isinstance(value, datetime)), default=datetime.utcnow())
+    return merged
+
+
+async def merge_duplicate_game_stats(db) -> int:
+    """Fold duplicate user_game_stats rows of a user into the oldest one, so the
+    unique user_id index can be built; returns how many rows were removed."""
+    duplicates = db.user_game_stats.aggregate([
+        {"$group": {"_id": "$user_id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    removed = 0
+    async for group in duplicates:
+        rows = await db.user_game_stats.find({"_id": {"$in": group["ids"]}}).sort("_id", 1).to_list(None)
+        merged = _merge_stats(rows)
+        await db.user_game_stats.replace_one({"_id": merged["_id"]}, merged)
+        result = await db.user_game_stats.delete_many({"_id": {"$in": [row["_id"] for row in rows[1:]]}})
+        removed += result.deleted_count
+        logger.info(f"Merged {len(rows)} game stats rows of user {group['_id']}")
+    return removed
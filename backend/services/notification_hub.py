@@ -0,0 +1,168 @@
+"""
+Push delivery of content update notifications.
+
+Notifications are stored in ``content_notifications`` with a sequence
+number and published on a Redis pub/sub channel. Each API worker holds a
+single Redis subscription and fans messages out to its connected
+Server-Sent Events clients through in-process queues, so idle browser tabs
+cost no database queries. The collection is only a TTL-bounded buffer for
+clients that reconnect with a Last-Event-ID. Without Redis, notifications
+are delivered to the clients of the publishing worker only.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, List, Optional, Set
+
+from pymongo import ASCENDING, ReturnDocument
+
+from backend.redis_config import get_redis_client
+from backend.services.index_registry import register_indexes
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "content_notifications"
+NOTIFICATION_BUFFER_HOURS = int(os.environ.get("CONTENT_NOTIFICATION_BUFFER_HOURS", "72"))
+CATCH_UP_LIMIT = 200
+SUBSCRIBER_QUEUE_SIZE = 100
+SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+
+async def next_sequence(db, name: str) -> int:
+    counter = await db.counters.find_one_and_update(
+        {"_id": name},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"]
+
+
+register_indexes({"content_notifications": [
+    ([("seq", ASCENDING)], {}),
+    ([("timestamp", ASCENDING)], {"expireAfterSeconds": NOTIFICATION_BUFFER_HOURS * 60 * 60}),
+]})
+
+
+def _encode(notification: Dict[str, Any]) -> str:
+    return json.dumps(notification, default=str)
+
+
+def format_sse(notification: Dict[str, Any], include_author: bool = True) -> str:
+    """Render a notification as a Server-Sent Event; the sequence number is the event id."""
+    if not include_author:
+        notification = {k: v for k, v in notification.items() if k != "updated_by"}
+    return f"id: {notification['seq']}\nevent: content_update\ndata: {_encode(notification)}\n\n"
+
+
+class NotificationHub:
+    """Per-process fan-out of the Redis channel to local subscriber queues."""
+
+    def __init__(self, channel: str = CHANNEL):
+        self.channel = channel
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listener: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def dispatch(self, message: str):
+        """Hand a message to every local subscriber; slow clients lose the oldest entries."""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Register a subscriber queue; returns once Redis has confirmed the
+        channel subscription, so every message published afterwards reaches it."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            await self._ensure_listener()
+            try:
+                await asyncio.wait_for(self._ready.wait(), SUBSCRIBE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning("Notification subscription not confirmed, messages may be missed")
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._listener is not None:
+                self._listener.cancel()
+                self._listener = None
+
+    async def publish(self, message: str) -> bool:
+        """Publish to all workers via Redis; returns False if delivered locally only."""
+        redis = await get_redis_client()
+        if redis is not None:
+            try:
+                await redis.publish(self.channel, message)
+                return True
+            except Exception as e:
+                logger.warning(f"Redis publish failed, delivering locally: {e}")
+        self.dispatch(message)
+        return False
+
+    async def _ensure_listener(self):
+        if self._listener is None or self._listener.done():
+            self._ready = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        """Single Redis subscription for this process; reconnects with a short backoff.
+
+        ``_ready`` is set while messages are delivered: once Redis confirmed the
+        subscription, or right away without Redis (publishes are local then).
+        """
+        while self._subscribers:
+            redis = await get_redis_client()
+            if redis is None:
+                self._ready.set()
+                await asyncio.sleep(5)
+                continue
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                while self._subscribers:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if not message:
+                        continue
+                    if message["type"] == "subscribe":
+                        self._ready.set()
+                    elif message["type"] == "message":
+                        data = message["data"]
+                        self.dispatch(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification subscription lost: {e}")
+                self._ready.clear()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+notification_hub = NotificationHub()
+
+
+async def publish_content_notification(db, notification: Dict[str, Any]) -> Dict[str, Any]:
+    """Buffer a notification in MongoDB and push it to every connected client."""
+    notification["seq"] = await next_sequence(db, CHANNEL)
+    await db.content_notifications.insert_one(dict(notification))
+    await notification_hub.publish(_encode(notification))
+    return notification
+
+
+async def get_missed_notifications(db, last_seq: int, limit: int = CATCH_UP_LIMIT) -> List[Dict[str, Any]]:
+    """Buffered notifications after ``last_seq``, oldest first."""
+    cursor = db.content_notifications.find({"seq": {"$gt": last_seq}}, {"_id": 0}).sort("seq", ASCENDING).limit(limit)
+    return await cursor.to_list(limit)
@@ -0,0 +1,109 @@
+"""
+Partial, atomic updates of checklist progress.
+
+Task toggles are applied in place on the ``user_progress`` document with
+positional ``$set`` (``arrayFilters``) for known tasks and ``$push`` for
+tasks seen for the first time, so concurrent tabs never overwrite each
+other with a stale copy. A final pipeline update recomputes step
+completion and unlocks the following step on the server. All operations
+for a request go to MongoDB as one ordered bulk write.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from backend.models import StepProgress, TaskProgress
+
+logger = logging.getLogger(__name__)
+
+TOTAL_STEPS = 6
+
+
+def initial_steps() -> List[Dict[str, Any]]:
+    return [
+        {**StepProgress(step_id=str(i), title=f"Step {i}", order=i).dict(), "unlocked": i == 1}
+        for i in range(1, TOTAL_STEPS + 1)
+    ]
+
+
+def _toggle_operations(user_id: str, update, now: datetime) -> List[UpdateOne]:
+    """Two guarded updates per toggle; exactly one matches when the step exists."""
+    step_id, task_id = str(update.step_id), str(update.task_id)
+    completed_at = now if update.completed else None
+
+    # completed_at only moves when the state flips ($[c]), so repeating a toggle changes nothing
+    set_existing = UpdateOne(
+        {"user_id": user_id, "steps": {"$elemMatch": {"step_id": step_id, "tasks.task_id": task_id}}},
+        {"$set": {
+            "steps.$[s].tasks.$[t].completed": update.completed,
+            "steps.$[s].tasks.$[t].viewed": update.viewed,
+            "steps.$[s].tasks.$[c].completed_at": completed_at,
+        }},
+        array_filters=[
+            {"s.step_id": step_id},
+            {"t.task_id": task_id},
+            {"c.task_id": task_id, "c.completed": {"$ne": update.completed}},
+        ]
+    )
+
+    new_task = TaskProgress(
+        task_id=task_id, title=f"Task {task_id}", completed=update.completed, completed_at=completed_at
+    ).dict()
+    new_task["viewed"] = update.viewed
+    push_new = UpdateOne(
+        {"user_id": user_id, "steps": {"$elemMatch": {"step_id": step_id, "tasks.task_id": {"$ne": task_id}}}},
+        {"$push": {"steps.$.tasks": new_task}}
+    )
+    return [set_existing, push_new]
+
+
+def step_state_pipeline() -> List[Dict[str, Any]]:
+    """Update pipeline marking finished steps and unlocking the step after each one."""
+    step_done = {"$and": [
+        {"$gt": [{"$size": {"$ifNull": ["$$s.tasks", []]}}, 0]},
+        {"$allElementsTrue": [{"$map": {
+            "input": {"$ifNull": ["$$s.tasks", []]}, "as": "t", "in": {"$ifNull": ["$$t.completed", False]}
+        }}]}
+    ]}
+    previous_done = {"$anyElementTrue": [{"$map": {
+        "input": "$steps", "as": "p",
+        "in": {"$and": [{"$eq": ["$$p.order", {"$subtract": ["$$s.order", 1]}]}, "$$p.completed"]}
+    }}]}
+    return [
+        {"$set": {"steps": {"$map": {"input": "$steps", "as": "s", "in": {"$mergeObjects": ["$$s", {
+            "completed": step_done,
+            "completed_at": {"$cond": [step_done, {"$ifNull": ["$$s.completed_at", "$$NOW"]}, None]}
+        }]}}}}},
+        {"$set": {
+            "steps": {"$map": {"input": "$steps", "as": "s", "in": {"$mergeObjects": ["$$s", {
+                "unlocked": {"$or": [
+                    {"$eq": ["$$s.order", 1]}, {"$ifNull": ["$$s.unlocked", False]}, previous_done
+                ]}
+            }]}}},
+            "updated_at": "$$NOW"
+        }}
+    ]
+
+
+def build_progress_operations(user_id: str, updates: List, now: Optional[datetime] = None) -> List[UpdateOne]:
+    now = now or datetime.utcnow()
+    operations = [UpdateOne(
+        {"user_id": user_id},
+        {"$setOnInsert": {"user_id": user_id, "steps": initial_steps(), "created_at": now}},
+        upsert=True
+    )]
+    for update in updates:
+        operations.extend(_toggle_operations(user_id, update, now))
+    operations.append(UpdateOne({"user_id": user_id}, step_state_pipeline()))
+    return operations
+
+
+async def apply_progress_updates(db, user_id: str, updates: List) -> int:
+    """Apply task toggles in one round trip; returns how many hit an existing step."""
+    result = await db.user_progress.bulk_write(build_progress_operations(user_id, updates), ordered=True)
+    # The seed matches unless it inserted, and the step-state pipeline always matches
+    seed_matches = 0 if result.upserted_count else 1
+    return result.matched_count - seed_matches - 1
@@ -0,0 +1,100 @@
+"""
+Per-request query budgets and N+1 detection.
+
+Endpoints declare how many MongoDB queries one request may issue with
+``query_budget``. When QUERY_BUDGET_MODE is "log" or "raise", the command
+listener in services/metrics.py also records the shape of each query of
+the request: command, collection and filter with the values stripped. A
+query issued in a loop (N+1) therefore shows up as one shape with a high
+count. ``MetricsMiddleware`` checks the finished request: "log" writes a
+warning, "raise" raises ``QueryBudgetExceeded`` (development and CI; see
+the fixtures in backend/tests/conftest.py).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cursor maintenance, not separate queries
+CURSOR_COMMANDS = {"getMore", "killCursors", "endSessions"}
+# Times one query shape may repeat in a request unless the endpoint declares otherwise
+DEFAULT_MAX_REPEATS = 3
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_queries: int
+    max_repeats: int = DEFAULT_MAX_REPEATS
+
+
+def query_budget(max_queries: int, max_repeats: int = DEFAULT_MAX_REPEATS):
+    """
+    Declare the MongoDB query budget of an endpoint, counting the queries
+    of its dependencies (e.g. the user lookup of ``get_current_user``).
+    Checked by ``backend.middleware.metrics.MetricsMiddleware``.
+    """
+    def decorator(func):
+        func.__query_budget__ = QueryBudget(max_queries, max_repeats)
+        return func
+    return decorator
+
+
+def _shape(value: Any) -> str:
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key}: {_shape(item)}" for key, item in sorted(value.items())) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[...]"
+    return "?"
+
+
+def _command_filter(command_name: str, command: Dict[str, Any]) -> Any:
+    if command_name == "find":
+        return command.get("filter")
+    if command_name in ("count", "distinct", "findAndModify"):
+        return command.get("query")
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return pipeline[0].get("$match")
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes") or [{}]
+        return statements[0].get("q")
+    return None
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> Optional[str]:
+    """``"find users {id: ?}"``; None for cursor maintenance commands."""
+    if command_name in CURSOR_COMMANDS:
+        return None
+    collection = command.get(command_name)
+    query_filter = _command_filter(command_name, command)
+    shape = f"{command_name} {collection}"
+    return f"{shape} {_shape(query_filter)}" if query_filter is not None else shape
+
+
+def budget_violations(budget: Optional[QueryBudget], queries: int, shapes: Dict[str, int]) -> List[str]:
+    problems = []
+    if budget is not None and queries > budget.max_queries:
+        problems.append(f"{queries} queries (budget {budget.max_queries})")
+    max_repeats = budget.max_repeats if budget is not None else DEFAULT_MAX_REPEATS
+    for shape, count in shapes.items():
+        if count > max_repeats:
+            problems.append(f"N+1: {count}x {shape}")
+    return problems
+
+
+def enforce_query_budget(scope, route: str, queries: int, shapes: Dict[str, int], mode: str):
+    """Log or raise if a finished request went over its budget or repeated a query shape."""
+    budget = getattr(getattr(scope.get("route"), "endpoint", None), "__query_budget__", None)
+    problems = budget_violations(budget, queries, shapes)
+    if not problems:
+        return
+    message = f"{scope['method']} {route}: " + "; ".join(problems)
+    if mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(f"Query budget exceeded - {message}")
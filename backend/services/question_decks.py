@@ -0,0 +1,199 @@
+"""
+Randomized, non-repeating question decks for the mini-games.
+
+For every (game type, category, difficulty) the ids of the active items
+are shuffled once into ``question_decks``. Each user walks the deck in
+their own order: position ``p`` maps to deck index ``(a * p + b) % n``
+with per-user ``a`` (coprime with ``n``) and ``b`` kept in ``user_decks``
+together with the position, so no per-user permutation is stored. Items
+the user answered correctly in the last few days (``correct_item_ids`` on
+``game_results``) are skipped. Serving a round is one indexed ``$in``
+fetch; deck ids are cached per process and only re-read when the deck
+version changes. Decks exist only for categories and difficulties that
+active items actually have, and empty decks are never stored, so request
+parameters cannot grow ``question_decks`` or the cache.
+"""
+
+import os
+import math
+import time
+import uuid
+import random
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.models import GameType
+from backend.services.index_registry import register_indexes
+
+logger = logging.getLogger(__name__)
+
+DECK_COLLECTIONS = {
+    GameType.CLINICAL_CASES.value: "clinical_cases",
+    GameType.FACHBEGRIFFE.value: "fachbegriffe_terms",
+}
+RECENT_CORRECT_DAYS = int(os.environ.get("QUESTION_DECK_RECENT_DAYS", "7"))
+DECK_CACHE_SECONDS = 300
+# Positions scanned per requested item before giving up on exclusions
+SCAN_FACTOR = 4
+
+_deck_cache: Dict[str, Tuple[float, str, List[str]]] = {}
+# game type -> (expires at, {"category": values, "difficulty": values}) of active items
+_facet_cache: Dict[str, Tuple[float, Dict[str, Set[str]]]] = {}
+
+
+register_indexes({
+    "question_decks": [([("game_type", 1)], {})],
+    "user_decks": [([("user_id", 1), ("deck", 1)], {"unique": True})],
+})
+
+
+def deck_key(game_type: str, category: Optional[str], difficulty: Optional[str]) -> str:
+    return f"{game_type}:{category or '*'}:{difficulty or '*'}"
+
+
+async def known_facets(db, game_type: str) -> Dict[str, Set[str]]:
+    """Categories and difficulties of the active items of a game type (cached per process)."""
+    cached = _facet_cache.get(game_type)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+    collection = db[DECK_COLLECTIONS[game_type]]
+    facets = {
+        field: set(await collection.distinct(field, {"is_active": True}))
+        for field in ("category", "difficulty")
+    }
+    _facet_cache[game_type] = (time.monotonic() + DECK_CACHE_SECONDS, facets)
+    return facets
+
+
+async def build_deck(db, game_type: str, category: Optional[str], difficulty: Optional[str]) -> Dict[str, Any]:
+    """Shuffle the matching active items into a deck; only decks with items are stored."""
+    query = {"is_active": True}
+    if category:
+        query["category"] = category
+    if difficulty:
+        query["difficulty"] = difficulty
+    ids = [item["id"] async for item in db[DECK_COLLECTIONS[game_type]].find(query, {"_id": 0, "id": 1})]
+    random.shuffle(ids)
+    deck = {
+        "_id": deck_key(game_type, category, difficulty),
+        "game_type": game_type,
+        "ids": ids,
+        "version": str(uuid.uuid4()),
+        "built_at": datetime.utcnow(),
+    }
+    if ids:
+        await db.question_decks.replace_one({"_id": deck["_id"]}, deck, upsert=True)
+        logger.info(f"Built question deck {deck['_id']} with {len(ids)} items")
+    return deck
+
+
+async def load_deck(db, game_type: str, category: Optional[str], difficulty: Optional[str]) -> Tuple[str, List[str]]:
+    """(version, shuffled ids) of a deck, building it on first use; unknown
+    categories and difficulties get an empty deck without touching the cache."""
+    facets = await known_facets(db, game_type)
+    if (category and category not in facets["category"]) or (difficulty and difficulty not in facets["difficulty"]):
+        return "", []
+
+    key = deck_key(game_type, category, difficulty)
+    cached = _deck_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1], cached[2]
+
+    if cached:
+        current = await db.question_decks.find_one({"_id": key}, {"version": 1})
+        if current and current["version"] == cached[1]:
+            _deck_cache[key] = (time.monotonic() + DECK_CACHE_SECONDS, cached[1], cached[2])
+            return cached[1], cached[2]
+
+    deck = await db.question_decks.find_one({"_id": key})
+    if deck is None:
+        deck = await build_deck(db, game_type, category, difficulty)
+    _deck_cache[key] = (time.monotonic() + DECK_CACHE_SECONDS, deck["version"], deck["ids"])
+    return deck["version"], deck["ids"]
+
+
+async def invalidate_decks(db, game_type: str):
+    """Drop the decks of a game type so they are rebuilt with the current items."""
+    await db.question_decks.delete_many({"game_type": game_type})
+    for key in [key for key in _deck_cache if key.startswith(f"{game_type}:")]:
+        del _deck_cache[key]
+    _facet_cache.pop(game_type, None)
+
+
+def new_walk(n: int) -> Dict[str, int]:
+    """Random affine permutation parameters for a deck of size ``n``."""
+    step = random.randrange(1, n) if n > 1 else 1
+    while math.gcd(step, n) != 1:
+        step = random.randrange(1, n)
+    return {"step": step, "offset": random.randrange(n) if n else 0, "position": 0}
+
+
+def walk_indices(walk: Dict[str, int], n: int, count: int) -> List[int]:
+    start = walk["position"]
+    return [(walk["step"] * p + walk["offset"]) % n for p in range(start, min(start + count, n))]
+
+
+async def recently_correct(db, user_id: str, game_type: str) -> Set[str]:
+    """Item ids answered correctly lately; read on the (user_id, game_type, created_at) index."""
+    since = datetime.utcnow() - timedelta(days=RECENT_CORRECT_DAYS)
+    cursor = db.game_results.find(
+        {"user_id": user_id, "game_type": game_type, "created_at": {"$gte": since}},
+        {"_id": 0, "correct_item_ids": 1}
+    )
+    return {item_id async for result in cursor for item_id in result.get("correct_item_ids") or []}
+
+
+async def next_round(
+    db, user_id: str, game_type: str, category: Optional[str], difficulty: Optional[str], size: int
+) -> List[str]:
+    """Ids for the user's next round, continuing where their last round stopped."""
+    version, ids = await load_deck(db, game_type, category, difficulty)
+    n = len(ids)
+    if n == 0:
+        return []
+
+    key = deck_key(game_type, category, difficulty)
+    state = await db.user_decks.find_one({"user_id": user_id, "deck": key})
+    excluded = await recently_correct(db, user_id, game_type)
+
+    picked: List[str] = []
+    skipped: List[str] = []
+    for _ in range(2):
+        if state is None or state.get("version") != version or state["position"] >= n:
+            # New deck contents or a finished pass: start a fresh order
+            passes = state.get("passes", 0) + 1 if state else 0
+            state = {**new_walk(n), "version": version, "passes": passes}
+        scanned = 0
+        for index in walk_indices(state, n, (size - len(picked)) * SCAN_FACTOR):
+            scanned += 1
+            item_id = ids[index]
+            if item_id in picked or item_id in skipped:
+                continue
+            (skipped if item_id in excluded else picked).append(item_id)
+            if len(picked) == size:
+                break
+        state["position"] += scanned
+        if len(picked) == size or state["position"] < n:
+            break
+    # A user who knows everything left in the pass still gets a full round
+    picked += skipped[:size - len(picked)]
+
+    await db.user_decks.update_one(
+        {"user_id": user_id, "deck": key},
+        {"$set": {**{k: state[k] for k in ("step", "offset", "position", "version", "passes")},
+                  "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return picked
+
+
+async def fetch_items(db, game_type: str, item_ids: List[str]) -> List[Dict[str, Any]]:
+    """One indexed $in fetch, returned in round order."""
+    if not item_ids:
+        return []
+    items = await db[DECK_COLLECTIONS[game_type]].find(
+        {"id": {"$in": item_ids}, "is_active": True}, {"_id": 0}
+    ).to_list(length=len(item_ids))
+    by_id = {item["id"]: item for item in items}
+    return [by_id[item_id] for item_id in item_ids if item_id in by_id]
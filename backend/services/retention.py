@@ -0,0 +1,102 @@
+"""
+Retention policy for audit_logs and user_activity.
+
+Entries carry an ``expires_at`` date derived from their retention class and
+are removed by MongoDB TTL indexes. GDPR-flagged audit entries are kept
+longest. Badge counters no longer depend on the raw activity history: they
+are maintained in ``user_stats.activity_counts`` so expired activity does
+not change a user's progress.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+
+from backend.services.index_registry import register_indexes
+
+# Retention classes for audit entries (days)
+AUDIT_RETENTION_DAYS = {
+    "standard": int(os.environ.get("AUDIT_RETENTION_DAYS", "90")),
+    "compliance": int(os.environ.get("AUDIT_COMPLIANCE_RETENTION_DAYS", "365")),
+    "gdpr": int(os.environ.get("AUDIT_GDPR_RETENTION_DAYS", str(6 * 365))),
+}
+
+USER_ACTIVITY_RETENTION_DAYS = int(os.environ.get("USER_ACTIVITY_RETENTION_DAYS", "180"))
+
+RETENTION_INDEXES = register_indexes({
+    "audit_logs": [
+        ([("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+        ([("timestamp", DESCENDING), ("_id", DESCENDING)], {}),
+        ([("action", ASCENDING), ("timestamp", DESCENDING)], {}),
+        ([("user_id", ASCENDING), ("timestamp", DESCENDING)], {}),
+    ],
+    "user_activity": [
+        ([("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ],
+})
+
+
+def classify_audit_entry(entry: Dict[str, Any]) -> str:
+    """Pick the retention class of an audit entry from its compliance flags."""
+    details = entry.get("details") or {}
+    if details.get("gdpr_compliance"):
+        return "gdpr"
+    if details.get("compliance_log") or entry.get("action", "").startswith("admin_"):
+        return "compliance"
+    return "standard"
+
+
+def apply_audit_retention(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Stamp retention_class and expires_at on an audit entry (in place)."""
+    if "expires_at" not in entry:
+        retention_class = entry.get("retention_class") or classify_audit_entry(entry)
+        timestamp = entry.get("timestamp") or datetime.utcnow()
+        entry["retention_class"] = retention_class
+        entry["expires_at"] = timestamp + timedelta(days=AUDIT_RETENTION_DAYS[retention_class])
+    return entry
+
+
+def activity_expires_at(created_at: Optional[datetime] = None) -> datetime:
+    return (created_at or datetime.utcnow()) + timedelta(days=USER_ACTIVITY_RETENTION_DAYS)
+
+
+def encode_audit_cursor(entry: Dict[str, Any]) -> str:
+    """Keyset cursor for audit log pages sorted by (timestamp, _id) descending."""
+    return f"{entry['timestamp'].isoformat()}_{entry['_id']}"
+
+
+def decode_audit_cursor(cursor: str) -> Dict[str, Any]:
+    """Turn a cursor into the query that selects entries after it; raises ValueError."""
+    timestamp, _, object_id = cursor.rpartition("_")
+    try:
+        timestamp, object_id = datetime.fromisoformat(timestamp), ObjectId(object_id)
+    except (ValueError, InvalidId):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": object_id}},
+    ]}
+
+
+async def backfill_activity_counts(db, user_id: str) -> Dict[str, int]:
+    """
+    Compute a user's activity counters from user_activity in one aggregation
+    and store them on user_stats. Used for users whose counters predate the
+    retention scheme.
+    """
+    grouped = await db.user_activity.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": "$activity_type", "count": {"$sum": 1}}},
+    ]).to_list(length=None)
+    counts = {group["_id"]: group["count"] for group in grouped if group["_id"]}
+
+    await db.user_stats.update_one(
+        {"user_id": user_id},
+        {"$set": {"activity_counts": counts, "activity_counts_backfilled": True}},
+        upsert=True
+    )
+    return counts
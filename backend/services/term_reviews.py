@@ -0,0 +1,105 @@
+"""
+Spaced-repetition scheduling for Fachbegriffe practice.
+
+Every (user, term) pair has a review state in ``term_reviews`` following
+SM-2: an ease factor, the current interval and the next due date. The
+"due now" list is a single bounded range scan on ``(user_id, due_at)``;
+a practice session's answers are applied with one ``bulk_write``.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from backend.services.index_registry import register_indexes, register_queries
+
+logger = logging.getLogger(__name__)
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_GRADE = 3  # grades 0-5; below this the term is relearned
+
+REVIEW_PROJECTION = {
+    "_id": 0, "term_id": 1, "ease": 1, "interval_days": 1, "repetitions": 1,
+    "lapses": 1, "due_at": 1, "last_reviewed_at": 1,
+}
+
+
+register_indexes({"term_reviews": [
+    ([("user_id", 1), ("term_id", 1)], {"unique": True}),
+    ([("user_id", 1), ("due_at", 1)], {}),
+]})
+register_queries(("term_reviews", {"user_id": "u", "due_at": {"$lte": datetime.min}}, [("due_at", 1)]))
+
+
+def schedule(state: Optional[Dict[str, Any]], grade: int, now: datetime) -> Dict[str, Any]:
+    """Next SM-2 state after answering with ``grade`` (0-5)."""
+    state = state or {}
+    ease = state.get("ease", INITIAL_EASE)
+    repetitions = state.get("repetitions", 0)
+    interval = state.get("interval_days", 0)
+    lapses = state.get("lapses", 0)
+
+    if grade < PASSING_GRADE:
+        repetitions = 0
+        interval = 1
+        lapses += 1 if state else 0
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1
+        elif repetitions == 2:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    return {
+        "ease": round(ease, 4),
+        "interval_days": interval,
+        "repetitions": repetitions,
+        "lapses": lapses,
+        "due_at": now + timedelta(days=interval),
+        "last_reviewed_at": now,
+    }
+
+
+async def due_reviews(db, user_id: str, limit: int, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Most overdue reviews first; bounded range scan on (user_id, due_at)."""
+    cursor = db.term_reviews.find(
+        {"user_id": user_id, "due_at": {"$lte": now or datetime.utcnow()}}, REVIEW_PROJECTION
+    ).sort("due_at", 1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def record_answers(db, user_id: str, answers: List, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Apply a session's answers (term_id, grade) in one bulk_write; returns the new states.
+    Answers for unknown terms are ignored."""
+    now = now or datetime.utcnow()
+    term_ids = list(dict.fromkeys(answer.term_id for answer in answers))
+
+    known = {term["id"] for term in await db.fachbegriffe_terms.find(
+        {"id": {"$in": term_ids}}, {"_id": 0, "id": 1}
+    ).to_list(length=len(term_ids))}
+    states = {review["term_id"]: review for review in await db.term_reviews.find(
+        {"user_id": user_id, "term_id": {"$in": term_ids}}, REVIEW_PROJECTION
+    ).to_list(length=len(term_ids))}
+
+    # Repeated answers for one term within a session are applied in order
+    for answer in answers:
+        if answer.term_id in known:
+            states[answer.term_id] = {"term_id": answer.term_id, **schedule(states.get(answer.term_id), answer.grade, now)}
+
+    updated = [states[term_id] for term_id in term_ids if term_id in known]
+    if updated:
+        await db.term_reviews.bulk_write([
+            UpdateOne(
+                {"user_id": user_id, "term_id": state["term_id"]},
+                {"$set": state, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            )
+            for state in updated
+        ], ordered=False)
+    return updated
@@ -0,0 +1,56 @@
+"""
+Background import of the optional, slow-to-import integrations.
+
+The Gemini, AWS, PayPal and Google sign-in SDKs (and the crypto/password
+hashing libraries) are imported where they are first used instead of at
+module load, so a worker starts serving sooner. Once it is up,
+``start_warm_up`` imports them in a worker thread so the first request
+that needs one does not pay for the import either.
+"""
+
+import time
+import asyncio
+import logging
+import importlib
+from typing import Dict, Iterable, Optional
+
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_MODULES = (
+    "passlib.context",
+    "cryptography.fernet",
+    "google.oauth2.id_token",
+    "google.auth.transport.requests",
+    "boto3",
+    "httpx",
+    "google.generativeai",
+    "paypalrestsdk",
+)
+
+
+def import_modules(modules: Iterable[str]) -> Dict[str, float]:
+    """Import each module, returning the seconds it took; missing optional packages are skipped."""
+    timings = {}
+    for module in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+        timings[module] = time.perf_counter() - started
+    return timings
+
+
+async def warm_up(modules: Iterable[str] = WARM_UP_MODULES) -> Dict[str, float]:
+    timings = await asyncio.to_thread(import_modules, tuple(modules))
+    logger.info(f"Warmed up {len(timings)} optional modules in {sum(timings.values()):.2f}s")
+    return timings
+
+
+def start_warm_up() -> Optional[asyncio.Task]:
+    """Schedule the warm-up on the running loop (disabled with WARM_UP_IMPORTS=false)."""
+    if not settings.warm_up_imports:
+        return None
+    return asyncio.create_task(warm_up())
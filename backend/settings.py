@@ -11,6 +11,11 @@ class Settings(BaseSettings):
     # Database Configuration
     mongo_url: str = Field(..., env="MONGO_URL")
     db_name: str = Field(..., env="DB_NAME")
+    mongo_max_pool_size: int = Field(default=100, env="MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=0, env="MONGO_MIN_POOL_SIZE")
+    mongo_max_idle_time_ms: Optional[int] = Field(default=300000, env="MONGO_MAX_IDLE_TIME_MS")
+    mongo_read_preference: str = Field(default="primary", env="MONGO_READ_PREFERENCE")
+    mongo_compressors: str = Field(default="", env="MONGO_COMPRESSORS")  # e.g. "zstd,snappy,zlib"
     
     # Authentication
     jwt_secret_key: str = Field(..., env="JWT_SECRET_KEY")
@@ -44,7 +49,13 @@ class Settings(BaseSettings):
     
     # Optional Services
     sentry_dsn: Optional[str] = Field(default=None, env="SENTRY_DSN")
+    # Per-request query budgets / N+1 detection: off, log or raise
+    query_budget_mode: str = Field(default="off", env="QUERY_BUDGET_MODE")
+    # Bearer token required to scrape /metrics (open when unset)
+    metrics_token: Optional[str] = Field(default=None, env="METRICS_TOKEN")
     analytics_salt: Optional[str] = Field(default=None, env="ANALYTICS_SALT")
+    # Import optional SDKs in the background once the worker is serving
+    warm_up_imports: bool = Field(default=True, env="WARM_UP_IMPORTS")
     
     @validator("jwt_secret_key")
     def validate_jwt_secret_key(cls, v):
@@ -58,6 +69,26 @@ class Settings(BaseSettings):
             raise ValueError("ENCRYPTION_KEY must be at least 32 characters long")
         return v
     
+    @validator("query_budget_mode")
+    def validate_query_budget_mode(cls, v):
+        if v not in ("off", "log", "raise"):
+            raise ValueError("QUERY_BUDGET_MODE must be one of: off, log, raise")
+        return v
+    
+    @validator("mongo_read_preference")
+    def validate_mongo_read_preference(cls, v):
+        valid = ["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"]
+        if v not in valid:
+            raise ValueError("MONGO_READ_PREFERENCE must be one of: " + ", ".join(valid))
+        return v
+    
+    @validator("mongo_compressors")
+    def validate_mongo_compressors(cls, v):
+        unknown = [c for c in v.split(",") if c.strip() and c.strip() not in ("zstd", "snappy", "zlib")]
+        if unknown:
+            raise ValueError(f"Unsupported MONGO_COMPRESSORS: {', '.join(unknown)}")
+        return ",".join(c.strip() for c in v.split(",") if c.strip())
+    
     @validator("mongo_url")
     def validate_mongo_url(cls, v):
         if not v.startswith(("mongodb://", "mongodb+srv://")):
@@ -1,4 +1,3 @@
-import os
 import asyncio
 import logging
 from datetime import datetime
@@ -6,17 +5,25 @@ from typing import Dict, Any
 from celery import current_task
 from backend.celery_app import celery_app
 from backend.services.backup_service import get_backup_service
-from backend.database import get_database
+from backend.services.backup_catalog import (
+    record_backup_sync, backfill_catalog_sync, verify_catalog_sync
+)
+from backend.services.retention import apply_audit_retention
+from backend.database import client_options, get_database
+from backend.settings import settings
 from backend.models_billing import AuditLog
 from pymongo import MongoClient
 
 logger = logging.getLogger(__name__)
 
+_sync_client = None
+
 def get_sync_db():
-    mongo_url = os.environ['MONGO_URL']
-    db_name = os.environ['DB_NAME']
-    client = MongoClient(mongo_url)
-    return client[db_name]
+    """Database handle on one pooled PyMongo client per worker process."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = MongoClient(settings.mongo_url, **client_options())
+    return _sync_client[settings.db_name]
 
 def set_task_status(task_id, status_dict):
     db = get_sync_db()
@@ -55,12 +62,13 @@ def create_database_backup_task(self, admin_user_id: str) -> dict:
         import asyncio
         backup_result = asyncio.run(backup_service.create_database_backup())
         db = get_sync_db()
+        record_backup_sync(db, backup_result)
         audit_log = AuditLog(
             user_id=admin_user_id,
             action="database_backup_created",
             details={"backup_file": backup_result["filename"], "task_id": task_id}
         )
-        db.audit_logs.insert_one(audit_log.dict())
+        db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         set_task_status(task_id, {
             "task_id": task_id,
             "status": "completed",
@@ -92,7 +100,7 @@ def create_database_backup_task(self, admin_user_id: str) -> dict:
                 action="database_backup_failed",
                 details={"error": str(e), "task_id": task_id}
             )
-            db.audit_logs.insert_one(audit_log.dict())
+            db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         except Exception as log_error:
             logger.error(f"Failed to log backup failure: {str(log_error)}")
         raise
@@ -111,12 +119,14 @@ def create_files_backup_task(self, admin_user_id: str) -> dict:
         import asyncio
         backup_result = asyncio.run(backup_service.create_files_backup())
         db = get_sync_db()
+        if backup_result.get("filename"):
+            record_backup_sync(db, backup_result)
         audit_log = AuditLog(
             user_id=admin_user_id,
             action="files_backup_created",
             details={"backup_file": backup_result.get("filename", "none"), "task_id": task_id}
         )
-        db.audit_logs.insert_one(audit_log.dict())
+        db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         set_task_status(task_id, {
             "task_id": task_id,
             "status": "completed",
@@ -148,7 +158,17 @@ def create_files_backup_task(self, admin_user_id: str) -> dict:
                 action="files_backup_failed",
                 details={"error": str(e), "task_id": task_id}
             )
-            db.audit_logs.insert_one(audit_log.dict())
+            db.audit_logs.insert_one(apply_audit_retention(audit_log.dict()))
         except Exception as log_error:
             logger.error(f"Failed to log files backup failure: {str(log_error)}")
-        raise
\ No newline at end of file
+        raise
+
+@celery_app.task(name="backend.tasks.backup_tasks.verify_backup_catalog_task")
+def verify_backup_catalog_task() -> dict:
+    """Scheduled integrity check of catalogued backup archives."""
+    db = get_sync_db()
+    backup_service = get_backup_service()
+    backfilled = backfill_catalog_sync(db, backup_service.backup_dir)
+    counts = verify_catalog_sync(db)
+    logger.info(f"Backup catalog verification finished: {counts} (backfilled {backfilled})")
+    return {"backfilled": backfilled, **counts}
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from bson import ObjectId
+from backend.celery_app import celery_app
+from backend.database import create_client
+from backend.redis_config import close_redis_pool
+from backend.services.account_deletion import AccountDeletionEngine
+from backend.services.data_export import (
+    EXPORT_TTL_DAYS,
+    delete_export_archive,
+    get_export_dir,
+    store_export_archive,
+    write_export_archive,
+)
+from backend.services.retention import apply_audit_retention
+from backend.tasks.backup_tasks import get_sync_db
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(bind=True, name="backend.tasks.gdpr_tasks.export_user_data_task")
+def export_user_data_task(self, request_id: str, user_id: str) -> dict:
+    """Build a user's GDPR export archive, recording progress on the export request."""
+    db = get_sync_db()
+    request_filter = {"_id": ObjectId(request_id)}
+    archive_path = get_export_dir() / f"gdpr_export_{user_id}_{request_id}.zip"
+
+    def report_progress(done: int, total: int, stage: str):
+        db.data_export_requests.update_one(request_filter, {"$set": {
+            "progress": {"done": done, "total": total, "stage": stage}
+        }})
+
+    db.data_export_requests.update_one(request_filter, {"$set": {
+        "status": "processing",
+        "task_id": self.request.id,
+        "started_at": datetime.utcnow()
+    }})
+    try:
+        summary = write_export_archive(db, user_id, archive_path, progress=report_progress)
+        storage = store_export_archive(archive_path)
+    except Exception as e:
+        logger.error(f"GDPR export {request_id} failed: {str(e)}")
+        archive_path.unlink(missing_ok=True)
+        db.data_export_requests.update_one(request_filter, {"$set": {
+            "status": "failed",
+            "error": str(e),
+            "failed_at": datetime.utcnow()
+        }})
+        raise
+
+    db.data_export_requests.update_one(request_filter, {"$set": {
+        "status": "completed",
+        "storage": storage,
+        "summary": summary,
+        "export_url": f"/api/gdpr/download-export/{request_id}",
+        "completed_at": datetime.utcnow(),
+        "expiry_date": datetime.utcnow() + timedelta(days=EXPORT_TTL_DAYS)
+    }})
+    db.audit_logs.insert_one(apply_audit_retention({
+        "user_id": user_id,
+        "action": "privacy_data_export_completed",
+        "details": {"request_id": request_id, "files": summary["files"], "gdpr_compliance": True},
+        "timestamp": datetime.utcnow()
+    }))
+    logger.info(f"GDPR export {request_id} completed ({summary['size']} bytes)")
+    return {"request_id": request_id, "status": "completed", "size": summary["size"]}
+
+@celery_app.task(name="backend.tasks.gdpr_tasks.cleanup_expired_exports_task")
+def cleanup_expired_exports_task() -> dict:
+    """Delete export archives whose download window has passed."""
+    db = get_sync_db()
+    removed = 0
+    for export in db.data_export_requests.find({
+        "status": "completed",
+        "expiry_date": {"$lt": datetime.utcnow()}
+    }):
+        try:
+            delete_export_archive(export.get("storage") or {})
+        except Exception as e:
+            logger.error(f"Failed to delete export archive {export['_id']}: {str(e)}")
+            continue
+        db.data_export_requests.update_one({"_id": export["_id"]}, {"$set": {"status": "expired"}})
+        removed += 1
+    return {"removed": removed}
+
+# Grace period before a deletion request is carried out (cancellable meanwhile)
+DELETION_GRACE_DAYS = 30
+
+@celery_app.task(name="backend.tasks.gdpr_tasks.process_account_deletions_task")
+def process_account_deletions_task() -> dict:
+    """Purge accounts whose deletion requests passed the grace period, in batches."""
+    async def run():
+        # Own client: the task runs on a fresh event loop
+        client = create_client()
+        try:
+            engine = AccountDeletionEngine(client[settings.db_name])
+            return await engine.process_pending(datetime.utcnow() - timedelta(days=DELETION_GRACE_DAYS))
+        finally:
+            client.close()
+            await close_redis_pool()
+
+    result = asyncio.run(run())
+    logger.info(f"Account deletions processed: {result}")
+    return result
@@ -0,0 +1,190 @@
+"""
+Shared fixtures for the backend tests
+Runs with query budgets enforced ("raise") unless QUERY_BUDGET_MODE is set,
+so an endpoint that goes over its budget or issues a query in a loop fails
+its test instead of shipping. Provides one in-memory MongoDB (mongomock
+behind a Motor-style async facade) and Redis (fakeredis) for every test
+module, and a throwaway database on a live MongoDB for behaviour that
+mongomock does not implement (skipped when none is reachable). Required
+settings get test defaults so the suite runs without a configured
+environment; real environment variables win.
+"""
+
+import os
+import uuid
+import asyncio
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+
+# Before anything imports backend.settings, which validates these on import
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "fsp_test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-only-jwt-secret-key-0123456789abcdef")
+os.environ.setdefault("ENCRYPTION_KEY", "MDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDA=")  # Fernet key
+os.environ.setdefault("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "fsp_test_uploads"))
+
+import fakeredis
+import mongomock
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.services.metrics import RequestStats, command_metrics, current_request_stats
+from backend.services.query_budget import QueryBudget, QueryBudgetExceeded, budget_violations
+
+
+def pytest_configure(config):
+    if "QUERY_BUDGET_MODE" not in os.environ:
+        from backend.settings import settings
+        settings.query_budget_mode = "raise"
+
+
+class AsyncCursor:
+    """Motor-style cursor over a mongomock cursor."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, n):
+        self.cursor = self.cursor.skip(n)
+        return self
+
+    def limit(self, n):
+        self.cursor = self.cursor.limit(n)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        docs = list(self.cursor)
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self.cursor:
+                yield doc
+        return gen()
+
+
+class AsyncCollection:
+    """Motor-style collection over mongomock; ``calls`` counts the operations issued."""
+
+    def __init__(self, collection):
+        self.sync = collection
+        self.calls = Counter()
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        self.calls["find"] += 1
+        return AsyncCursor(self.sync.find(*args, **kwargs))
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls["aggregate"] += 1
+        return AsyncCursor(self.sync.aggregate(pipeline, **kwargs))
+
+    def list_indexes(self):
+        return AsyncCursor(iter(self.sync.list_indexes()))
+
+    @property
+    def docs(self):
+        return list(self.sync.find({}, {"_id": 0}))
+
+    def __getattr__(self, name):
+        method = getattr(self.sync, name)
+
+        async def call(*args, **kwargs):
+            self.calls[name] += 1
+            return method(*args, **kwargs)
+        return call
+
+
+class AsyncDatabase:
+    """Motor-style database over mongomock; ``sync`` is the database for sync code paths."""
+
+    def __init__(self, database):
+        self.sync = database
+        self.name = database.name
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = AsyncCollection(self.sync[name])
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self):
+        return self.sync.list_collection_names()
+
+
+@pytest.fixture
+def mongo_db():
+    """Empty in-memory database with Motor's async interface."""
+    return AsyncDatabase(mongomock.MongoClient()["fsp_test"])
+
+
+@pytest.fixture
+def fake_redis():
+    """In-memory Redis speaking redis.asyncio (decoded responses, like the shared client)."""
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def live_mongo_db():
+    """
+    Factory running ``scenario(db)`` on a throwaway database of a live MongoDB
+    (MONGO_URL), for query features mongomock lacks; skips when none is reachable.
+    Its commands are reported like the app's, so requests run under their budgets.
+    """
+    from backend.settings import settings
+
+    def run(scenario):
+        async def main():
+            client = AsyncIOMotorClient(
+                settings.mongo_url, serverSelectionTimeoutMS=1000, event_listeners=[command_metrics]
+            )
+            try:
+                try:
+                    await client.admin.command("ping")
+                except Exception:
+                    pytest.skip("MongoDB not reachable")
+                db = client[f"{settings.db_name}_test_{uuid.uuid4().hex[:8]}"]
+                try:
+                    return await scenario(db)
+                finally:
+                    await client.drop_database(db.name)
+            finally:
+                client.close()
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def query_tracer():
+    """
+    Records the queries issued inside the block and fails on N+1 patterns
+    or when ``max_queries`` is exceeded, for code called outside a request.
+    """
+    @contextmanager
+    def trace(max_queries=None, **budget):
+        stats = RequestStats(trace=True)
+        token = current_request_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            current_request_stats.reset(token)
+        limit = QueryBudget(max_queries, **budget) if max_queries is not None else None
+        problems = budget_violations(limit, stats.queries, stats.shapes)
+        if problems:
+            raise QueryBudgetExceeded("; ".join(problems))
+
+    return trace
@@ -0,0 +1,129 @@
+"""
+Unit tests for the batched account deletion engine
+Tests batch purging, file reference counting, export archive removal and
+resuming interrupted batches without losing files or duplicating audit entries
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from backend.services import data_export
+from backend.services.account_deletion import AccountDeletionEngine
+
+
+def make_db(mongo_db, tmp_path, n_users):
+    mongo_db.users.sync.insert_many([{"id": f"u{n}"} for n in range(n_users)])
+    mongo_db.personal_files.sync.insert_many([
+        {"user_id": f"u{n}", "file_path": f"file{n}.pdf"} for n in range(n_users)
+    ])
+    for n in range(n_users):
+        (tmp_path / f"file{n}.pdf").write_bytes(b"x")
+    return mongo_db
+
+
+def test_purge_users_deletes_in_one_call_per_collection(tmp_path, mongo_db):
+    db = make_db(mongo_db, tmp_path, 50)
+    db.payment_transactions.sync.insert_one({"user_id": "u1", "amount": 10})
+    # u0's file is shared with a user that is not being deleted
+    db.personal_files.sync.insert_one({"user_id": "keep", "file_path": "file0.pdf"})
+
+    engine = AccountDeletionEngine(db, upload_dir=tmp_path)
+    summary = asyncio.run(engine.purge_users([f"u{n}" for n in range(50)]))
+
+    assert summary["deleted"]["users"] == 50
+    assert db.users.calls["delete_many"] == 1 and db.personal_files.calls["delete_many"] == 1
+    assert db.payment_transactions.docs == [{"user_id": None, "amount": 10, "email": "deleted_user@example.com"}]
+    assert summary["files_removed"] == 49
+    assert (tmp_path / "file0.pdf").exists()
+    assert not (tmp_path / "file1.pdf").exists()
+
+
+def test_process_pending_batches_and_resumes(tmp_path, mongo_db):
+    db = make_db(mongo_db, tmp_path, 5)
+    old = datetime.utcnow() - timedelta(days=40)
+    db.data_deletion_requests.sync.insert_many(
+        [{"_id": n, "user_id": f"u{n}", "status": "pending", "request_date": old} for n in range(4)]
+        # Left behind by an interrupted run
+        + [{"_id": 4, "user_id": "u4", "status": "processing", "batch_id": "crashed", "request_date": old}]
+        # Still inside the grace period
+        + [{"_id": 5, "user_id": "u5", "status": "pending", "request_date": datetime.utcnow()}]
+    )
+
+    engine = AccountDeletionEngine(db, upload_dir=tmp_path, batch_size=2)
+    totals = asyncio.run(engine.process_pending(datetime.utcnow() - timedelta(days=30)))
+
+    assert totals == {"batches": 3, "users": 5, "files_removed": 5}
+    statuses = {r["_id"]: r["status"] for r in db.data_deletion_requests.sync.find()}
+    assert statuses == {0: "completed", 1: "completed", 2: "completed", 3: "completed", 4: "completed", 5: "pending"}
+    assert db.users.docs == []
+    assert len([log for log in db.audit_logs.docs if log["action"] == "privacy_account_deleted"]) == 5
+
+
+def test_purge_removes_export_archives_and_chats(tmp_path, mongo_db, monkeypatch):
+    deleted_objects = []
+
+    class FakeS3:
+        def delete_object(self, Bucket, Key):
+            if Key == "exports/broken.zip":
+                raise OSError("S3 unavailable")
+            deleted_objects.append((Bucket, Key))
+
+    monkeypatch.setattr(data_export, "get_export_s3", lambda: (FakeS3(), "exports"))
+    db = make_db(mongo_db, tmp_path, 2)
+    local_archive = tmp_path / "export_u0.zip"
+    local_archive.write_bytes(b"PK")
+    db.data_export_requests.sync.insert_many([
+        {"user_id": "u0", "status": "completed", "storage": {"storage": "local", "path": str(local_archive)}},
+        {"user_id": "u1", "status": "completed",
+         "storage": {"storage": "s3", "s3_bucket": "exports", "s3_key": "exports/u1.zip"}},
+        {"user_id": "u1", "status": "completed",
+         "storage": {"storage": "s3", "s3_bucket": "exports", "s3_key": "exports/broken.zip"}},
+        {"user_id": "u1", "status": "failed"},
+        {"user_id": "keep", "status": "completed", "storage": {"storage": "local", "path": str(tmp_path / "keep.zip")}},
+    ])
+    db.chat_history.sync.insert_many([{"user_id": "u0", "message": "Hallo"}, {"user_id": "keep", "message": "Hi"}])
+
+    summary = asyncio.run(AccountDeletionEngine(db, upload_dir=tmp_path).purge_users(["u0", "u1"]))
+
+    assert summary["archives_removed"] == 2
+    assert not local_archive.exists()
+    assert deleted_objects == [("exports", "exports/u1.zip")]
+    # Only the request whose archive survived is kept, due for the cleanup task
+    remaining = db.data_export_requests.docs
+    assert [(r["user_id"], r["storage"].get("s3_key")) for r in remaining] == [("u1", "exports/broken.zip"), ("keep", None)]
+    assert remaining[0]["expiry_date"] <= datetime.utcnow()
+    assert [chat["user_id"] for chat in db.chat_history.docs] == ["keep"]
+
+
+def test_resumed_batch_removes_files_and_logs_once(tmp_path, mongo_db, monkeypatch):
+    db = make_db(mongo_db, tmp_path, 2)
+    old = datetime.utcnow() - timedelta(days=40)
+    db.data_deletion_requests.sync.insert_many([
+        {"_id": n, "user_id": f"u{n}", "status": "processing", "batch_id": "b1", "request_date": old} for n in range(2)
+    ])
+    engine = AccountDeletionEngine(db, upload_dir=tmp_path)
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("worker killed")
+
+    # Crash after the records are deleted, before the files are unlinked
+    with monkeypatch.context() as patch:
+        patch.setattr(engine, "_remove_unreferenced_files", crash)
+        with pytest.raises(RuntimeError):
+            asyncio.run(engine.process_pending(cutoff))
+    assert db.personal_files.docs == [] and (tmp_path / "file0.pdf").exists()
+
+    # Crash after the deletion is logged, before the requests are completed
+    with monkeypatch.context() as patch:
+        patch.setattr(db.data_deletion_requests.sync, "update_many", crash)
+        with pytest.raises(RuntimeError):
+            asyncio.run(engine.process_pending(cutoff))
+    assert not (tmp_path / "file0.pdf").exists() and not (tmp_path / "file1.pdf").exists()
+
+    totals = asyncio.run(engine.process_pending(cutoff))
+    assert totals["batches"] == 1
+    assert {r["status"] for r in db.data_deletion_requests.docs} == {"completed"}
+    logged = [log["user_id"] for log in db.audit_logs.docs if log["action"] == "privacy_account_deleted"]
+    assert sorted(logged) == ["u0", "u1"]
+    assert db.data_deletion_batches.docs == []
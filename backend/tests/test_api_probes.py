@@ -0,0 +1,144 @@
+"""
+Unit tests for the admin panel connectivity probes
+Tests probes against local stub servers, per-probe timeouts, concurrency
+and result caching
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from backend.services import api_probes
+from backend.services.api_probes import clear_probe_cache, close_http_client, probe_all, run_probe
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self):
+        StubHandler.hits.append((self.command, self.path, self.headers.get("Authorization")))
+        if self.path.startswith("/slow"):
+            time.sleep(1.0)
+        ok = self.headers.get("Authorization") != "Bearer bad"
+        body = json.dumps({"data": [{"id": "model-a"}, {"id": "model-b"}]} if ok else {"error": "invalid key"}).encode()
+        self.send_response(200 if ok else 401)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_HEAD = _reply
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(api_probes, "ENDPOINTS", {
+        "google_gemini": f"{base}/v1/models",
+        "stripe": f"{base}/slow/v1/balance",
+        "paypal_sandbox": f"{base}/v1/oauth2/token",
+        "paypal_live": f"{base}/v1/oauth2/token",
+        "openai": f"{base}/v1/models",
+    })
+    StubHandler.hits = []
+    clear_probe_cache()
+    yield base
+    clear_probe_cache()
+    server.shutdown()
+    server.server_close()
+
+
+def run(coroutine):
+    async def scenario():
+        try:
+            return await coroutine
+        finally:
+            await close_http_client()
+    return asyncio.run(scenario())
+
+
+def test_http_probes(stub_server):
+    result = run(run_probe("openai", {"api_key": "good"}))
+    assert result["success"] and result["message"] == "OpenAI API connected. Found 2 models"
+    assert result["latency_ms"] >= 0
+
+    result = run(run_probe("openai", {"api_key": "bad"}))
+    assert result == {**result, "success": False, "message": "OpenAI API failed: 401"}
+
+    result = run(run_probe("paypal", {"client_id": "id", "client_secret": "secret"}))
+    assert result["message"] == "PayPal API connected successfully (sandbox mode)"
+    assert StubHandler.hits[-1][0] == "POST" and StubHandler.hits[-1][2].startswith("Basic ")
+
+    assert run(run_probe("stripe", {}))["message"] == "Secret key is required"
+    assert run(run_probe("ftp", {}))["message"] == "Unknown service"
+
+
+def test_r2_probe_runs_boto3_in_executor(stub_server):
+    config = {"endpoint_url": stub_server, "access_key_id": "key", "secret_access_key": "secret", "bucket_name": "files"}
+    result = run(run_probe("cloudflare_r2", config))
+    assert result["success"] and result["message"] == "R2 bucket 'files' accessible"
+    assert StubHandler.hits[-1][:2] == ("HEAD", "/files")
+
+
+def test_probes_run_concurrently_with_timeouts(stub_server):
+    apis = {
+        "stripe": {"secret_key": "sk"},  # stub answers after 1s
+        "google_gemini": {"api_key": "good"},
+        "openai": {"api_key": "good"},
+        "mongodb": {"connection_string": "mongodb://127.0.0.1:1/?connectTimeoutMS=200"},
+        "anthropic": {"api_key": "no probe"},
+    }
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await probe_all(apis, timeout=0.5)
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = run(scenario())
+    assert set(results) == {"stripe", "google_gemini", "openai", "mongodb"}
+    assert results["stripe"] == {**results["stripe"], "success": False, "message": "Stripe test timed out after 0.5s"}
+    assert not results["mongodb"]["success"]
+    assert results["google_gemini"]["success"] and results["openai"]["success"]
+    assert elapsed < 0.9  # one timeout, not the sum of them
+    assert ticks >= 5  # the event loop kept running while probing
+
+
+def test_results_are_cached_and_shared(stub_server):
+    apis = {"openai": {"api_key": "good"}}
+
+    async def scenario():
+        first, second = await asyncio.gather(probe_all(apis), probe_all(apis))
+        third = await probe_all(apis)
+        changed = await probe_all({"openai": {"api_key": "bad"}})
+        return first, second, third, changed
+
+    first, second, third, changed = run(scenario())
+    assert first["openai"] is second["openai"] is third["openai"]
+    assert not changed["openai"]["success"]
+    assert len(StubHandler.hits) == 2
+    clear_probe_cache("openai")
+    run(probe_all(apis))
+    assert len(StubHandler.hits) == 3
@@ -0,0 +1,98 @@
+"""
+Unit tests for the buffered audit log sink
+Tests batching, draining on shutdown, spooling while MongoDB is down and idempotent replay
+"""
+
+import asyncio
+from datetime import datetime
+from pymongo.errors import AutoReconnect
+from backend.services.audit_sink import AuditSink
+
+
+def go_offline(collection):
+    async def refuse(*args, **kwargs):
+        raise AutoReconnect("connection refused")
+    collection.insert_many = refuse
+
+
+def go_online(collection):
+    del collection.insert_many
+
+
+def entry(n):
+    return {"user_id": f"u{n}", "action": "file_download", "timestamp": datetime(2026, 10, 19, 12, 0, n % 60)}
+
+
+def test_sink_batches_by_size_and_drains_on_stop(tmp_path, mongo_db):
+    collection = mongo_db.audit_logs
+
+    async def scenario():
+        sink = AuditSink(collection, max_batch=10, flush_interval=60, spool_dir=str(tmp_path))
+        await sink.start()
+        for n in range(25):
+            await sink.submit(entry(n))
+        await asyncio.sleep(0)  # let the size-triggered flush run
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(scenario())
+    assert len(collection.docs) == 25
+    assert collection.calls["insert_many"] == 3
+    assert sink.stats["written"] == 25
+
+
+def test_sink_flushes_on_interval(tmp_path, mongo_db):
+    collection = mongo_db.audit_logs
+
+    async def scenario():
+        sink = AuditSink(collection, max_batch=100, flush_interval=0.01, spool_dir=str(tmp_path))
+        await sink.start()
+        await sink.submit(entry(1))
+        await asyncio.sleep(0.05)
+        written = len(collection.docs)
+        await sink.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_sink_spools_while_mongo_is_down_and_replays(tmp_path, mongo_db):
+    collection = mongo_db.audit_logs
+    go_offline(collection)
+
+    async def scenario():
+        sink = AuditSink(collection, max_batch=5, flush_interval=0.01, spool_dir=str(tmp_path))
+        await sink.start()
+        for n in range(7):
+            await sink.submit(entry(n))
+        await asyncio.sleep(0.1)
+        assert sink.spool_path.exists()
+        assert sink.stats["spooled"] == 7
+
+        go_online(collection)
+        await sink.submit(entry(99))
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(scenario())
+    assert len(collection.docs) == 8
+    assert sink.stats["replayed"] == 7
+    assert not sink.spool_path.exists()
+
+
+def test_replay_skips_entries_that_were_already_written(tmp_path, mongo_db):
+    collection = mongo_db.audit_logs
+
+    async def scenario():
+        sink = AuditSink(collection, max_batch=5, flush_interval=60, spool_dir=str(tmp_path))
+        written = entry(1)
+        await collection.insert_many([written])
+        # Simulate a batch that reached MongoDB but was spooled anyway
+        await sink._spool([written, entry(2)])
+        await sink.start()
+        await sink.stop()
+        return sink
+
+    sink = asyncio.run(scenario())
+    assert len(collection.docs) == 2
+    assert sink.stats["replayed"] == 1
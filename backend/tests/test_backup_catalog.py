@@ -0,0 +1,81 @@
+"""
+Unit tests for the backup catalog
+Tests GFS retention selection, catalog entry building and archive verification
+"""
+
+from datetime import datetime, timedelta
+from backend.services.backup_catalog import (
+    RetentionPolicy,
+    build_catalog_entry,
+    compute_checksum,
+    select_expired_backups,
+    verify_catalog_entry,
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+def make_entries(days):
+    """Catalog entries created `days` days before NOW, newest first"""
+    return [
+        {"id": f"b{d}", "filename": f"mongodb_backup_{d}.gz", "created_at": NOW - timedelta(days=d)}
+        for d in sorted(days)
+    ]
+
+
+def test_gfs_keeps_daily_weekly_monthly_representatives():
+    entries = make_entries(range(0, 120))
+    expired = select_expired_backups(entries, RetentionPolicy(daily=7, weekly=4, monthly=3), now=NOW)
+    kept = {e["id"] for e in entries} - {e["id"] for e in expired}
+
+    # Last 7 days are all kept
+    assert {f"b{d}" for d in range(7)} <= kept
+    # Nothing older than the 3-month window (August-October) survives
+    assert all(int(k[1:]) < 80 for k in kept)
+    # Daily (7) + at most 4 weekly + at most 3 monthly representatives
+    assert len(kept) <= 7 + 4 + 3
+
+
+def test_gfs_keeps_only_newest_backup_per_day():
+    entries = [
+        {"id": "late", "created_at": NOW - timedelta(hours=1)},
+        {"id": "early", "created_at": NOW - timedelta(hours=10)},
+    ]
+    expired = select_expired_backups(entries, RetentionPolicy(daily=1, weekly=0, monthly=0), now=NOW)
+    assert [e["id"] for e in expired] == ["early"]
+
+
+def test_gfs_always_keeps_latest_backup():
+    entries = make_entries([400])
+    assert select_expired_backups(entries, RetentionPolicy(daily=1, weekly=1, monthly=1), now=NOW) == []
+
+
+def test_build_catalog_entry_from_backup_result():
+    entry = build_catalog_entry(
+        {
+            "filename": "files_backup_20261019_120000.tar.gz",
+            "local_path": "/backups/files_backup_20261019_120000.tar.gz",
+            "size": 42,
+            "checksum": "abc",
+            "timestamp": "20261019_120000",
+        },
+        parent_id="parent-1",
+    )
+    assert entry["type"] == "files"
+    assert entry["parent_id"] == "parent-1"
+    assert entry["status"] == "available"
+    assert entry["created_at"] == datetime(2026, 10, 19, 12, 0, 0)
+
+
+def test_verify_catalog_entry(tmp_path):
+    archive = tmp_path / "mongodb_backup_20261019_120000.gz"
+    archive.write_bytes(b"backup contents")
+    entry = {"local_path": str(archive), "checksum": compute_checksum(archive)}
+    assert verify_catalog_entry(entry) == "available"
+
+    archive.write_bytes(b"tampered")
+    assert verify_catalog_entry(entry) == "corrupt"
+
+    archive.unlink()
+    assert verify_catalog_entry(entry) == "missing"
+    assert verify_catalog_entry({**entry, "s3_key": "backups/x.gz"}) == "available"
@@ -0,0 +1,129 @@
+"""
+Unit tests for the public content cache
+Tests read-through loading, node and util-info generations, category
+validation and conditional requests
+"""
+
+import asyncio
+import json
+import pytest
+from starlette.requests import Request
+from backend.routes import documents
+from backend.services import content_cache
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    async def redis_client():
+        return fake_redis
+
+    monkeypatch.setattr(content_cache, "get_redis_client", redis_client)
+    return fake_redis
+
+
+def make_request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_get_or_load_caches_until_invalidated(redis):
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return {"title": "Étape", "version": len(loads)}
+
+    async def scenario():
+        key = await content_cache.node_key("n1")
+        first = await content_cache.get_or_load(key, loader)
+        second = await content_cache.get_or_load(key, loader)
+        await content_cache.invalidate_node("n1")
+        new_key = await content_cache.node_key("n1")
+        third = await content_cache.get_or_load(new_key, loader)
+        return key, new_key, first, second, third, await redis.ttl(new_key)
+
+    key, new_key, first, second, third, ttl = asyncio.run(scenario())
+    assert first == second
+    assert len(loads) == 2
+    assert new_key != key
+    assert third[1] != first[1]
+    assert 0 < ttl <= content_cache.CACHE_TTL_SECONDS
+
+
+def test_load_racing_an_invalidation_is_not_served(redis):
+    """A response loaded before a write lands under the old generation."""
+
+    async def scenario():
+        stale_key = await content_cache.node_key("n1")
+        await content_cache.invalidate_node("n1")  # the write finishes meanwhile
+
+        async def stale():
+            return {"version": 1}
+
+        async def fresh():
+            return {"version": 2}
+
+        await content_cache.get_or_load(stale_key, stale)
+        body, _ = await content_cache.get_or_load(await content_cache.node_key("n1"), fresh)
+        return json.loads(body)
+
+    assert asyncio.run(scenario()) == {"version": 2}
+
+
+def test_util_info_invalidation_moves_to_a_new_generation(redis):
+    async def scenario():
+        before = await content_cache.util_info_key("categories")
+        await content_cache.invalidate_util_info()
+        return before, await content_cache.util_info_key("categories")
+
+    before, after = asyncio.run(scenario())
+    assert before != after
+
+
+def test_missing_content_is_not_cached(monkeypatch):
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr(content_cache, "get_redis_client", no_redis)
+
+    async def loader():
+        return None
+
+    assert asyncio.run(content_cache.get_or_load("k", loader)) is None
+
+
+def test_unknown_util_info_categories_are_not_cached(redis, mongo_db):
+    mongo_db.util_info_documents.sync.insert_many([
+        {"id": "d1", "title": "Approbation", "category": "land-specific", "content_type": "text",
+         "is_active": True, "order_priority": 1},
+        {"id": "d2", "title": "Old", "category": "archive", "content_type": "text", "is_active": False},
+    ])
+
+    async def scenario():
+        responses = {}
+        for category in ("land-specific", "archive", "x" * 200):
+            response = await documents.get_public_util_info_docs(make_request(), category=category, db=mongo_db)
+            responses[category] = json.loads(response.body)
+        return responses, sorted(await redis.keys(f"{content_cache.KEY_PREFIX}:*"))
+
+    responses, keys = asyncio.run(scenario())
+    assert [doc["id"] for doc in responses["land-specific"]] == ["d1"]
+    assert responses["archive"] == responses["x" * 200] == []
+    assert keys == [
+        f"{content_cache.KEY_PREFIX}:util_info:0:categories",
+        f"{content_cache.KEY_PREFIX}:util_info:0:docs:land-specific",
+    ]
+
+
+def test_cached_response_honours_if_none_match():
+    body, etag = content_cache.render({"id": "n1"})
+
+    full = content_cache.cached_response(make_request(), body, etag)
+    assert full.status_code == 200
+    assert full.body == body
+    assert full.headers["etag"] == etag
+    assert "stale-while-revalidate" in full.headers["cache-control"]
+
+    not_modified = content_cache.cached_response(make_request(f'"other", {etag}'), body, etag)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
@@ -0,0 +1,103 @@
+"""
+Unit tests for the GDPR data export
+Tests the NDJSON archive layout, uploaded file inclusion and the streamed JSON export
+"""
+
+import asyncio
+import json
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from backend.services.data_export import EXPORT_COLLECTIONS, iter_json_export, write_export_archive
+
+
+def make_db(mongo_db):
+    mongo_db.users.sync.insert_one({"id": "u1", "email": "a@b.de", "password_hash": "x"})
+    mongo_db.personal_files.sync.insert_many([
+        {"id": "f1", "user_id": "u1", "type": "file", "title": "diploma.pdf", "file_path": "abc.pdf"},
+        {"id": "f2", "user_id": "u1", "type": "file", "title": "evil", "file_path": "../../etc/passwd"},
+        {"id": "n1", "user_id": "u2", "type": "note", "title": "other user"},
+    ])
+    mongo_db.audit_logs.sync.insert_many([
+        {"user_id": "u1", "action": "login", "timestamp": datetime(2026, 1, 1)} for _ in range(1000)
+    ])
+    return mongo_db
+
+
+def test_export_archive_streams_collections_and_files(tmp_path, mongo_db):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    (uploads / "abc.pdf").write_bytes(b"%PDF-1.4")
+    progress = []
+
+    summary = write_export_archive(
+        make_db(mongo_db).sync, "u1", tmp_path / "export.zip", upload_dir=uploads,
+        progress=lambda done, total, stage: progress.append((done, total, stage))
+    )
+
+    assert summary["documents"]["audit_logs"] == 1000
+    assert summary["documents"]["personal_files"] == 2
+    assert summary["files"] == 1
+    assert progress[-1] == (len(EXPORT_COLLECTIONS) + 1, len(EXPORT_COLLECTIONS) + 1, "files")
+
+    with zipfile.ZipFile(tmp_path / "export.zip") as archive:
+        users = [json.loads(line) for line in archive.read("data/users.ndjson").splitlines()]
+        assert users == [{"id": "u1", "email": "a@b.de"}]
+        assert len(archive.read("data/audit_logs.ndjson").splitlines()) == 1000
+        assert archive.read("files/f1_diploma.pdf") == b"%PDF-1.4"
+        assert not any("passwd" in name for name in archive.namelist())
+
+
+def test_json_export_is_valid_streamed_document(mongo_db):
+    db = make_db(mongo_db)
+
+    async def collect():
+        return "".join([chunk async for chunk in iter_json_export(db, {"id": "u1"}, "u1")])
+
+    document = json.loads(asyncio.run(collect()))
+    assert document["data"]["user_profile"] == {"id": "u1"}
+    assert len(document["data"]["personal_files"]) == 2
+    assert document["data"]["transactions"] == []
+    assert document["data"]["progress"] is None
+
+
+def test_chat_history_is_exported(tmp_path, mongo_db):
+    db = make_db(mongo_db)
+    db.chat_history.sync.insert_many([
+        {"user_id": "u1", "message": "Was ist eine Approbation?", "timestamp": datetime(2026, 1, 2)},
+        {"user_id": "u2", "message": "other user", "timestamp": datetime(2026, 1, 2)},
+    ])
+
+    summary = write_export_archive(db.sync, "u1", tmp_path / "export.zip", upload_dir=tmp_path)
+
+    assert summary["documents"]["chat_history"] == 1
+    with zipfile.ZipFile(tmp_path / "export.zip") as archive:
+        chats = [json.loads(line) for line in archive.read("data/chat_history.ndjson").splitlines()]
+    assert [chat["message"] for chat in chats] == ["Was ist eine Approbation?"]
+
+
+def test_failed_enqueue_does_not_leave_a_pending_request(monkeypatch, mongo_db):
+    from backend.routes import gdpr
+    from backend.tasks.gdpr_tasks import export_user_data_task
+
+    async def database():
+        return mongo_db
+
+    def broker_down(*args):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(gdpr, "get_database", database)
+    monkeypatch.setattr(export_user_data_task, "delay", broker_down)
+    user = SimpleNamespace(id="u1")
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(gdpr.request_data_export(user))
+    assert raised.value.status_code == 503
+    assert [request["status"] for request in mongo_db.data_export_requests.docs] == ["failed"]
+
+    # The next request is not blocked by the failed one
+    monkeypatch.setattr(export_user_data_task, "delay", lambda *args: SimpleNamespace(id="task-1"))
+    response = asyncio.run(gdpr.request_data_export(user))
+    assert response["message"] == "Data export started"
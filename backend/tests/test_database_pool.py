@@ -0,0 +1,30 @@
+"""
+Unit tests for the shared MongoDB client configuration
+Tests pool options taken from settings and the checkout wait metrics
+"""
+
+from types import SimpleNamespace
+from backend.database import CHECKOUT_WAIT_BUCKETS_MS, PoolMetrics, client_options, pool_metrics
+from backend.settings import settings
+
+
+def test_client_options_follow_settings():
+    options = client_options()
+    assert options["maxPoolSize"] == settings.mongo_max_pool_size
+    assert options["minPoolSize"] == settings.mongo_min_pool_size
+    assert pool_metrics in options["event_listeners"]
+
+
+def test_checkout_waits_are_bucketed():
+    metrics = PoolMetrics()
+    for duration in (0.0005, 0.02, 30.0):
+        metrics.connection_checked_out(SimpleNamespace(duration=duration))
+    metrics.connection_checked_in(SimpleNamespace())
+    metrics.connection_check_out_failed(SimpleNamespace(duration=0.2))
+
+    stats = metrics.snapshot()
+    assert (stats["checkouts"], stats["checked_out"], stats["checkout_failures"]) == (3, 2, 1)
+    assert stats["checkout_wait_max_ms"] == 30000.0
+    buckets = stats["checkout_wait_buckets_ms"]
+    assert (buckets["1"], buckets["25"], buckets["250"], buckets["+Inf"]) == (1, 1, 1, 1)
+    assert len(buckets) == len(CHECKOUT_WAIT_BUCKETS_MS) + 1
@@ -0,0 +1,46 @@
+"""
+Import-time benchmark for the API server
+Profiles `import backend.server` with -X importtime: the optional SDKs must
+not be imported at startup and the whole import must stay within budget
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+# Cumulative budget for `import backend.server`, generous for slow CI machines
+IMPORT_BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", "2500"))
+LAZY_MODULES = (
+    "google.generativeai",
+    "boto3",
+    "sentry_sdk",
+    "paypalrestsdk",
+    "google.oauth2.id_token",
+    "cryptography.fernet",
+)
+
+
+def profile_import(module: str):
+    env = {**os.environ, "SENTRY_DSN": ""}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, total_us, name = line.split("|")
+            cumulative[name.strip()] = int(total_us) / 1000
+    return cumulative
+
+
+def test_server_import_defers_optional_sdks_and_stays_in_budget():
+    imported = profile_import("backend.server")
+
+    assert not [module for module in LAZY_MODULES if module in imported]
+    assert imported["backend.server"] < IMPORT_BUDGET_MS, (
+        f"import backend.server took {imported['backend.server']:.0f}ms (budget {IMPORT_BUDGET_MS}ms)"
+    )
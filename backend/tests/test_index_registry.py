@@ -0,0 +1,118 @@
+"""
+Unit tests for the declarative index registry
+Tests the declared-vs-existing diff, option mismatches and rebuilds,
+idempotent builds and (against a live MongoDB) that every registered query
+shape is served by an index
+"""
+
+import asyncio
+import pytest
+from pymongo.errors import DuplicateKeyError
+from backend.services.index_registry import (
+    build_missing_indexes, compare_indexes, declared_indexes, declared_queries, existing_signature, key_signature,
+    mismatched_indexes, missing_indexes, rebuild_mismatched_indexes
+)
+
+
+DECLARED = {
+    "threads": [
+        ([("forum_id", 1), ("created_at", -1)], {}),
+        ([("forum_id", 1), ("updated_at", -1)], {}),
+    ],
+    "user_game_stats": [([("user_id", 1)], {"unique": True})],
+    "content_notifications": [([("timestamp", 1)], {"expireAfterSeconds": 3600})],
+}
+
+
+def test_only_missing_indexes_are_built_once(mongo_db):
+    db = mongo_db
+    db.threads.sync.create_index([("forum_id", 1), ("created_at", -1)])
+    db.user_game_stats.sync.create_index("user_id", unique=True)
+    db.content_notifications.sync.create_index("timestamp", expireAfterSeconds=3600)
+
+    missing = asyncio.run(missing_indexes(db, DECLARED))
+    assert missing == {"threads": [([("forum_id", 1), ("updated_at", -1)], {})]}
+
+    assert asyncio.run(build_missing_indexes(db, DECLARED)) == {"threads": ["forum_id_1_updated_at_-1"]}
+    assert asyncio.run(build_missing_indexes(db, DECLARED)) == {}
+    assert db.threads.calls["create_indexes"] == 1
+
+
+def test_text_indexes_compare_by_their_fields():
+    existing = {"key": {"_fts": "text", "_ftsx": 1}, "name": "node_content_text", "weights": {"description": 1, "title": 1}}
+    assert existing_signature(existing) == key_signature([("title", "text"), ("description", "text")])
+
+
+def test_indexes_with_other_options_are_reported_and_rebuilt(mongo_db):
+    db = mongo_db
+    db.threads.sync.create_index([("forum_id", 1), ("created_at", -1)], name="legacy_name")
+    db.threads.sync.create_index([("forum_id", 1), ("updated_at", -1)])
+    db.user_game_stats.sync.create_index("user_id")
+    db.content_notifications.sync.create_index("timestamp", expireAfterSeconds=60)
+    declared = {**DECLARED, "threads": [([("forum_id", 1), ("created_at", -1)], {"name": "threads_by_created"})]}
+
+    missing, mismatched = asyncio.run(compare_indexes(db, declared))
+    assert missing == {}
+    assert {name: [m[3] for m in found] for name, found in mismatched.items()} == {
+        "threads": [{"name": ("threads_by_created", "legacy_name")}],
+        "user_game_stats": [{"unique": (True, None)}],
+        "content_notifications": [{"expireAfterSeconds": (3600, 60)}],
+    }
+
+    rebuilt = asyncio.run(rebuild_mismatched_indexes(db, mismatched))
+    assert rebuilt == {
+        "threads": ["threads_by_created"], "user_game_stats": ["user_id_1"], "content_notifications": ["timestamp_1"]
+    }
+    assert asyncio.run(compare_indexes(db, declared)) == ({}, {})
+    assert {index["name"] for index in db.threads.sync.list_indexes()} == {
+        "_id_", "threads_by_created", "forum_id_1_updated_at_-1"
+    }
+
+
+def test_failed_rebuild_restores_the_previous_index(mongo_db):
+    db = mongo_db
+    db.user_game_stats.sync.create_index("user_id", name="user_id_lookup")
+    db.user_game_stats.sync.insert_many([{"user_id": "u1"}, {"user_id": "u1"}])
+    declared = {"user_game_stats": DECLARED["user_game_stats"]}
+
+    mismatched = asyncio.run(mismatched_indexes(db, declared))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(rebuild_mismatched_indexes(db, mismatched))
+    indexes = {index["name"]: index for index in db.user_game_stats.sync.list_indexes()}
+    assert set(indexes) == {"_id_", "user_id_lookup"} and not indexes["user_id_lookup"].get("unique")
+
+
+def test_registry_covers_hot_query_collections():
+    declared = declared_indexes()
+    signatures = {name: {key_signature(keys) for keys, _ in specs} for name, specs in declared.items()}
+    assert (("user_id", 1), ("target_id", 1), ("target_type", 1)) in signatures["votes"]
+    assert (("thread_id", 1), ("is_deleted", 1), ("created_at", 1)) in signatures["comments"]
+    assert (("user_id", 1), ("timestamp", -1)) in signatures["chat_history"]
+    assert {query[0] for query in declared_queries()} <= set(declared)
+
+
+def _stages(plan):
+    yield plan["stage"]
+    for child in (plan.get("inputStage"), *plan.get("inputStages", ())):
+        if child:
+            yield from _stages(child)
+
+
+def test_registered_queries_use_an_index(live_mongo_db):
+    """Runs explain() for every registered query shape; needs a reachable MongoDB."""
+
+    async def scenario(db):
+        await build_missing_indexes(db)
+        plans = {}
+        for collection, query, sort in declared_queries():
+            cursor = db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            explained = await cursor.explain()
+            winning = explained["queryPlanner"]["winningPlan"]
+            plans[(collection, str(query))] = set(_stages(winning.get("queryPlan", winning)))
+        return plans
+
+    plans = live_mongo_db(scenario)
+    scans = [shape for shape, stages in plans.items() if "COLLSCAN" in stages]
+    assert not scans, f"COLLSCAN for registered queries: {scans}"
@@ -0,0 +1,88 @@
+"""
+Unit tests for admin IP allowlists
+Tests range matching, per-admin caching and invalidation, and batched access logs
+"""
+
+import asyncio
+import ipaddress
+import random
+import time
+from types import SimpleNamespace
+from backend.middleware.ip_security import AdminAllowlist, IPSecurityMiddleware
+
+
+def request_from(ip):
+    return SimpleNamespace(headers={}, client=SimpleNamespace(host=ip))
+
+
+def security_with(db, configs, **kwargs):
+    db.admin_security_config.sync.insert_many([{"admin_email": email, **config} for email, config in configs.items()])
+    security = IPSecurityMiddleware(**kwargs)
+    security.db = db
+    return security
+
+
+def test_allowlist_ranges():
+    allowlist = AdminAllowlist(["10.0.0.0/24", "10.0.1.0/24", "192.168.1.7", "2001:db8::/32", "not-an-ip"])
+    for ip in ("10.0.0.1", "10.0.1.255", "192.168.1.7", "2001:db8::1", "::ffff:10.0.0.5"):
+        assert allowlist.allows(ip), ip
+    for ip in ("10.0.2.0", "192.168.1.8", "2001:db9::1", "9.255.255.255", "garbage"):
+        assert not allowlist.allows(ip), ip
+    assert not AdminAllowlist(["not-an-ip"]).allows("10.0.0.1")
+
+
+def test_allowlist_matches_linear_scan():
+    rng = random.Random(7)
+    networks = [f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.0/{rng.choice((16, 20, 24, 28))}"
+                for _ in range(500)]
+    parsed = [ipaddress.ip_network(network, strict=False) for network in networks]
+    allowlist = AdminAllowlist(networks)
+    for _ in range(2000):
+        ip = ipaddress.ip_address(rng.getrandbits(32))
+        assert allowlist.allows(str(ip)) == any(ip in network for network in parsed)
+
+
+def test_admin_checks_use_the_cached_allowlist(mongo_db):
+    async def scenario():
+        security = security_with(mongo_db, {"admin@example.com": {"allowed_ips": ["10.0.0.0/8"]}})
+        admin = SimpleNamespace(email="admin@example.com")
+        other = SimpleNamespace(email="other@example.com")
+        assert await security.verify_admin_access(request_from("10.1.2.3"), admin)
+        assert not await security.verify_admin_access(request_from("11.0.0.1"), admin)
+        assert await security.verify_admin_access(request_from("11.0.0.1"), other)  # unrestricted
+        assert await security.verify_admin_access(request_from("11.0.0.2"), other)
+        assert mongo_db.admin_security_config.calls["find_one"] == 2
+
+        await security.set_admin_allowlist("admin@example.com", ["11.0.0.0/8"])
+        assert await security.verify_admin_access(request_from("11.0.0.1"), admin)
+        assert mongo_db.admin_security_config.calls["find_one"] == 3
+
+    asyncio.run(scenario())
+
+
+def test_cached_allowlist_expires(mongo_db):
+    async def scenario():
+        security = security_with(mongo_db, {"admin@example.com": {"allowed_ips": ["10.0.0.0/8"]}}, cache_seconds=0.01)
+        admin = SimpleNamespace(email="admin@example.com")
+        assert not await security.verify_admin_access(request_from("11.0.0.1"), admin)
+        await mongo_db.admin_security_config.update_one(  # changed by another worker
+            {"admin_email": "admin@example.com"}, {"$set": {"allowed_ips": []}}
+        )
+        time.sleep(0.02)
+        assert await security.verify_admin_access(request_from("11.0.0.1"), admin)
+
+    asyncio.run(scenario())
+
+
+def test_access_attempts_go_to_the_sink(monkeypatch):
+    submitted = []
+
+    class Sink:
+        async def submit(self, entry):
+            submitted.append(entry)
+
+    monkeypatch.setattr("backend.middleware.ip_security.get_access_log_sink", lambda: Sink())
+    security = IPSecurityMiddleware()
+    asyncio.run(security.log_admin_access_attempt("admin@example.com", "10.0.0.1", True))
+    assert security.db is None
+    assert submitted[0]["admin_email"] == "admin@example.com" and submitted[0]["allowed"] is True
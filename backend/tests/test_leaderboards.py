@@ -0,0 +1,103 @@
+"""
+Unit tests for materialized leaderboards
+Tests ranking order, sorted-set rebuilds, rank lookups and cached display names
+"""
+
+import asyncio
+import pytest
+from backend.models import GameResult
+from backend.services import leaderboards
+from backend.services.leaderboards import display_name, ranking_score
+
+
+def entry(user_id, best, avg, played=3):
+    return {"game_type": "fachbegriffe", "user_id": user_id, "best_score": best, "avg_score": avg,
+            "games_played": played, "total_score": avg * played}
+
+
+ENTRIES = [entry("u1", 90, 70.0), entry("u2", 95, 60.0), entry("u3", 90, 85.5), entry("u4", 40, 40.0)]
+
+
+def use_redis(monkeypatch, redis):
+    async def client():
+        return redis
+    monkeypatch.setattr(leaderboards, "get_redis_client", client)
+
+
+@pytest.fixture
+def db(mongo_db):
+    mongo_db.game_leaderboards.sync.insert_many([dict(e) for e in ENTRIES])
+    return mongo_db
+
+
+def game(user_id, score):
+    return GameResult(user_id=user_id, game_type="fachbegriffe", score=score, total_questions=10,
+                      correct_answers=score // 10, time_spent_seconds=30)
+
+
+def test_ranking_score_orders_by_best_then_average():
+    pairs = [(90, 70.0), (95, 60.0), (90, 85.5), (40, 40.0), (90, 100.0), (89, 100.0)]
+    assert sorted(pairs, key=lambda p: ranking_score(*p), reverse=True) == sorted(pairs, reverse=True)
+
+
+def test_empty_sorted_set_is_rebuilt_and_ranks_users(monkeypatch, fake_redis, db):
+    redis = fake_redis
+    use_redis(monkeypatch, redis)
+
+    async def scenario():
+        top = await leaderboards.top_entries(db, "fachbegriffe", 3)
+        position = await leaderboards.user_position(db, "fachbegriffe", "u1")
+        newcomer = await leaderboards.user_position(db, "fachbegriffe", "u9")
+        return top, position, newcomer, await redis.zcard("leaderboard:fachbegriffe"), \
+            await redis.exists("leaderboard:fachbegriffe:rebuild")
+
+    top, position, newcomer, cached, locked = asyncio.run(scenario())
+    assert [e["user_id"] for e in top] == ["u2", "u3", "u1"]
+    assert cached == len(ENTRIES)
+    assert not locked
+    assert (position["rank"], position["total_players"]) == (3, 4)
+    assert (newcomer["rank"], newcomer["total_players"]) == (None, 4)
+
+
+def test_without_redis_mongodb_ranks_users(monkeypatch, db):
+    use_redis(monkeypatch, None)
+    top = asyncio.run(leaderboards.top_entries(db, "fachbegriffe", 2))
+    assert [e["user_id"] for e in top] == ["u2", "u3"]
+    position = asyncio.run(leaderboards.user_position(db, "fachbegriffe", "u1"))
+    assert (position["rank"], position["total_players"]) == (3, 4)
+
+
+def test_results_update_the_entry_and_the_sorted_set(monkeypatch, fake_redis, db):
+    use_redis(monkeypatch, fake_redis)
+
+    async def scenario():
+        # The first result finds no sorted set; it must not pose as the whole board
+        await leaderboards.record_result(db, game("u4", 100))
+        await leaderboards.top_entries(db, "fachbegriffe", 1)
+        await leaderboards.record_result(db, game("u5", 50))
+        return await leaderboards.top_entries(db, "fachbegriffe", 2), \
+            await leaderboards.user_position(db, "fachbegriffe", "u5")
+
+    top, newcomer = asyncio.run(scenario())
+    assert [(e["user_id"], e["best_score"], e["avg_score"], e["games_played"]) for e in top] == [
+        ("u4", 100, 55.0, 4), ("u2", 95, 60.0, 3)
+    ]
+    assert (newcomer["rank"], newcomer["total_players"]) == (5, 5)
+
+
+def test_display_names_come_from_the_directory_cache(monkeypatch, fake_redis, mongo_db):
+    asyncio.run(fake_redis.set("user_directory:u1", "Cached N."))
+    use_redis(monkeypatch, fake_redis)
+    mongo_db.users.sync.insert_many([
+        {"id": "u1", "first_name": "Stale", "last_name": "Name"},
+        {"id": "u2", "first_name": "Anna", "last_name": "Schmidt"},
+    ])
+
+    names = asyncio.run(leaderboards.display_names(mongo_db, ["u1", "u2", "deleted-user-id"]))
+    assert names == {"u1": "Cached N.", "u2": "Anna S.", "deleted-user-id": "User deleted-"}
+    assert asyncio.run(fake_redis.get("user_directory:u2")) == "Anna S."
+
+
+def test_display_name_without_first_name_is_a_placeholder():
+    assert display_name({"id": "abcdef123456", "first_name": None, "last_name": "Meyer"}) == "User abcdef12"
+    assert display_name({"id": "x", "first_name": "Lena"}) == "Lena"
@@ -0,0 +1,81 @@
+"""
+Unit tests for the Prometheus instrumentation
+Tests per-route latency and status metrics, attribution of MongoDB commands
+to requests and the event loop lag gauge; per-request overhead:
+scripts/benchmark_metrics_middleware.py
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from backend.middleware.metrics import MetricsMiddleware
+from backend.services.metrics import command_metrics, monitor_event_loop_lag, render_metrics
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/metrics-test/items/{item_id}")
+    async def get_item(item_id: str):
+        # Motor runs PyMongo in an executor with a copy of the context
+        for _ in range(3):
+            await asyncio.to_thread(
+                command_metrics.succeeded, SimpleNamespace(command_name="find", duration_micros=2000)
+            )
+        return {"id": item_id}
+
+    @app.get("/metrics-test/missing")
+    async def missing():
+        return {"ok": True}
+
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def test_requests_are_labelled_by_route_template_with_db_work():
+    client = TestClient(build_app())
+    route = "/metrics-test/items/{item_id}"
+    before = sample("http_request_db_commands_sum", method="GET", route=route)
+
+    for item_id in ("a", "b"):
+        assert client.get(f"/metrics-test/items/{item_id}").status_code == 200
+    client.get("/metrics-test/nowhere")
+
+    assert sample("http_requests_total", method="GET", route=route, status="200") == 2
+    assert sample("http_request_duration_seconds_count", method="GET", route=route) == 2
+    assert sample("http_request_db_commands_sum", method="GET", route=route) - before == 6
+    assert abs(sample("http_request_db_seconds_sum", method="GET", route=route) - 0.012) < 1e-9
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") >= 1
+
+
+def test_commands_outside_requests_are_still_counted():
+    before = sample("mongodb_command_duration_seconds_count", command="insert", outcome="error")
+    command_metrics.failed(SimpleNamespace(command_name="insert", duration_micros=500))
+    assert sample("mongodb_command_duration_seconds_count", command="insert", outcome="error") == before + 1
+
+
+def test_exposition_format():
+    body, content_type = render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b"# TYPE http_request_duration_seconds histogram" in body
+    assert b"event_loop_lag_seconds" in body
+
+
+def test_event_loop_lag_gauge():
+    async def scenario():
+        monitor = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+        await asyncio.sleep(0)
+        time.sleep(0.05)  # block the loop
+        await asyncio.sleep(0.005)  # the overdue probe wakes up first and records the lag
+        monitor.cancel()
+
+    asyncio.run(scenario())
+    assert sample("event_loop_lag_seconds") >= 0.03
+
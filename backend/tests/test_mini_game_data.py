@@ -0,0 +1,124 @@
+"""
+Unit tests for mini-game data access
+Tests result queries and projections, legacy dates, stats upserts, result
+recording order and merging duplicate stats rows
+"""
+
+import asyncio
+from datetime import datetime
+import pytest
+from pymongo.errors import DuplicateKeyError
+from backend.models import GameResult, GameResultResponse
+from backend.services import leaderboards
+from backend.services.mini_game_data import (
+    GAME_INDEXES, RESULT_PROJECTION, fetch_game_results, merge_duplicate_game_stats, parse_legacy_date,
+    record_game_result, update_game_stats
+)
+
+
+def game(game_type, score, streak=None, created_at=None):
+    result = GameResult(
+        user_id="u1", game_type=game_type, score=score, total_questions=10,
+        correct_answers=score // 10, time_spent_seconds=30, streak=streak
+    )
+    if created_at:
+        result.created_at = created_at
+    return result
+
+
+@pytest.fixture
+def db(monkeypatch, mongo_db):
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr(leaderboards, "get_redis_client", no_redis)
+    return mongo_db
+
+
+def test_results_are_read_newest_first_with_the_response_projection(db):
+    db.game_results.sync.insert_many([
+        {**game(game_type, 10 * n, created_at=datetime(2026, 3, n + 1)).dict(), "answers": ["a"] * 50}
+        for n, game_type in enumerate(["fachbegriffe", "clinical_cases", "fachbegriffe", "fachbegriffe"])
+    ])
+    db.game_results.sync.insert_one({**game("fachbegriffe", 99).dict(), "user_id": "u2"})
+
+    everything = asyncio.run(fetch_game_results(db, "u1", None, 20))
+    assert [result["score"] for result in everything] == [30, 20, 10, 0]
+    assert all(set(result) <= set(RESULT_PROJECTION) for result in everything)
+
+    latest = asyncio.run(fetch_game_results(db, "u1", "fachbegriffe", 2))
+    assert [result["score"] for result in latest] == [30, 20]
+
+
+def test_projection_matches_response_fields_only():
+    included = {field for field, flag in RESULT_PROJECTION.items() if flag}
+    assert RESULT_PROJECTION["_id"] == 0
+    assert included == set(GameResultResponse.__fields__)
+
+
+def test_parse_legacy_date():
+    assert parse_legacy_date("2026-03-01T10:15:30.123456") == datetime(2026, 3, 1, 10, 15, 30, 123456)
+    native = datetime(2026, 3, 1)
+    assert parse_legacy_date(native) is native
+    assert parse_legacy_date("not a date") == "not a date"
+
+
+def test_stats_accumulate_from_no_document(db):
+    for result in (game("fachbegriffe", 80, streak=3), game("fachbegriffe", 60, streak=5), game("clinical_cases", 90)):
+        asyncio.run(update_game_stats(db, result))
+
+    doc, = db.user_game_stats.docs
+    assert doc["total_games_played"] == 3
+    assert doc["total_time_spent_seconds"] == 90
+    assert (doc["fachbegriffe_played"], doc["fachbegriffe_best_score"], doc["fachbegriffe_best_streak"]) == (2, 80, 5)
+    assert doc["fachbegriffe_average_score"] == 70
+    assert (doc["clinical_cases_played"], doc["clinical_cases_average_score"]) == (1, 90)
+
+
+def test_stats_keep_identity_fields_on_update(db):
+    created = datetime(2026, 1, 1)
+    db.user_game_stats.sync.insert_one({"user_id": "u1", "id": "stats-1", "created_at": created})
+    asyncio.run(update_game_stats(db, game("interactive_quiz", 50)))
+    doc, = db.user_game_stats.docs
+    assert (doc["id"], doc["created_at"], doc["total_games_played"]) == ("stats-1", created, 1)
+    assert "interactive_quiz_played" not in doc
+
+
+def test_result_is_stored_before_stats_and_leaderboard(db):
+    result = game("fachbegriffe", 70)
+    asyncio.run(record_game_result(db, result))
+    assert db.user_game_stats.docs[0]["fachbegriffe_played"] == 1
+    assert db.game_leaderboards.docs[0]["games_played"] == 1
+
+    # A result that cannot be stored is not counted anywhere
+    db.game_results.sync.create_index("id", unique=True)
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(record_game_result(db, result))
+    assert db.user_game_stats.docs[0]["fachbegriffe_played"] == 1
+    assert db.game_leaderboards.docs[0]["games_played"] == 1
+
+
+def test_duplicate_stats_rows_are_merged_before_the_unique_index(db):
+    db.user_game_stats.sync.insert_many([
+        {"id": "first", "user_id": "u1", "created_at": datetime(2026, 1, 1), "updated_at": datetime(2026, 1, 2),
+         "total_games_played": 2, "total_time_spent_seconds": 60, "fachbegriffe_played": 2,
+         "fachbegriffe_total_score": 100, "fachbegriffe_best_score": 70, "fachbegriffe_best_streak": 4},
+        {"id": "racing", "user_id": "u1", "created_at": datetime(2026, 1, 1), "updated_at": datetime(2026, 1, 3),
+         "total_games_played": 1, "total_time_spent_seconds": 30, "fachbegriffe_played": 1,
+         "fachbegriffe_total_score": 80, "fachbegriffe_best_score": 80, "fachbegriffe_best_streak": 2},
+        {"id": "empty", "user_id": "u1", "total_games_played": 0},
+        {"id": "other", "user_id": "u2", "total_games_played": 5},
+    ])
+
+    assert asyncio.run(merge_duplicate_game_stats(db)) == 2
+    merged, other = db.user_game_stats.docs
+    assert (merged["id"], merged["created_at"], merged["updated_at"]) == ("first", datetime(2026, 1, 1), datetime(2026, 1, 3))
+    assert (merged["total_games_played"], merged["total_time_spent_seconds"]) == (3, 90)
+    assert (merged["fachbegriffe_played"], merged["fachbegriffe_best_score"], merged["fachbegriffe_best_streak"]) == (3, 80, 4)
+    assert merged["fachbegriffe_average_score"] == 60
+    assert merged["clinical_cases_average_score"] == 0
+    assert other["total_games_played"] == 5
+
+    (keys, options), = GAME_INDEXES["user_game_stats"]
+    db.user_game_stats.sync.create_index(keys, **options)
+    assert asyncio.run(merge_duplicate_game_stats(db)) == 0
@@ -0,0 +1,93 @@
+"""
+Unit tests for content notification fan-out
+Tests local delivery to every subscriber, Redis subscription confirmation,
+slow-client backpressure, SSE framing and stream tokens
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from backend.auth import create_access_token, create_stream_token, get_current_user_for_stream, verify_token
+from backend.services import notification_hub as hub_module
+from backend.services.notification_hub import NotificationHub, SUBSCRIBER_QUEUE_SIZE, format_sse
+
+
+async def no_redis():
+    return None
+
+
+def test_publish_without_redis_reaches_every_local_subscriber(monkeypatch):
+    monkeypatch.setattr(hub_module, "get_redis_client", no_redis)
+    hub = NotificationHub()
+
+    async def scenario():
+        async with hub.subscribe() as first, hub.subscribe() as second:
+            assert hub.subscriber_count == 2
+            delivered_via_redis = await hub.publish('{"seq": 1}')
+            return delivered_via_redis, await first.get(), await second.get()
+
+    assert asyncio.run(scenario()) == (False, '{"seq": 1}', '{"seq": 1}')
+    assert hub.subscriber_count == 0
+
+
+def test_subscribe_returns_once_redis_confirmed_the_channel(monkeypatch, fake_redis):
+    async def redis_client():
+        return fake_redis
+
+    monkeypatch.setattr(hub_module, "get_redis_client", redis_client)
+    hub = NotificationHub()
+
+    async def scenario():
+        async with hub.subscribe() as queue:
+            # Published right after subscribing, e.g. between a client's
+            # subscription and its catch-up read of the buffer
+            delivered_via_redis = await hub.publish('{"seq": 7}')
+            return delivered_via_redis, await asyncio.wait_for(queue.get(), 2)
+
+    assert asyncio.run(scenario()) == (True, '{"seq": 7}')
+
+
+def test_slow_subscribers_drop_oldest_messages(monkeypatch):
+    monkeypatch.setattr(hub_module, "get_redis_client", no_redis)
+    hub = NotificationHub()
+
+    async def scenario():
+        async with hub.subscribe() as queue:
+            for seq in range(SUBSCRIBER_QUEUE_SIZE + 5):
+                hub.dispatch(str(seq))
+            return queue.qsize(), await queue.get()
+
+    assert asyncio.run(scenario()) == (SUBSCRIBER_QUEUE_SIZE, "5")
+
+
+def test_format_sse_uses_sequence_as_event_id():
+    notification = {"seq": 42, "node_id": "n1", "updated_by": "admin@example.com"}
+    event = format_sse(notification, include_author=False)
+    lines = event.strip().split("\n")
+    assert lines[0] == "id: 42"
+    assert lines[1] == "event: content_update"
+    assert json.loads(lines[2][len("data: "):]) == {"seq": 42, "node_id": "n1"}
+    assert event.endswith("\n\n")
+
+
+def stream_request(authorization=""):
+    return SimpleNamespace(headers={"authorization": authorization} if authorization else {})
+
+
+def test_streams_accept_stream_tokens_but_not_access_tokens_in_the_url(mongo_db):
+    db = mongo_db
+    db.users.sync.insert_one({"id": "u1", "email": "user@example.com", "password_hash": "x", "is_active": True})
+    access_token = create_access_token({"sub": "u1"})
+    stream_token = create_stream_token("u1")
+
+    user = asyncio.run(get_current_user_for_stream(stream_request(), stream_token=stream_token, db=db))
+    assert user.id == "u1"
+    user = asyncio.run(get_current_user_for_stream(stream_request(f"Bearer {access_token}"), db=db))
+    assert user.id == "u1"
+
+    with pytest.raises(HTTPException):
+        asyncio.run(get_current_user_for_stream(stream_request(), stream_token=access_token, db=db))
+    with pytest.raises(HTTPException):  # a leaked stream token is no access token
+        verify_token(stream_token)
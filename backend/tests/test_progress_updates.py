@@ -0,0 +1,116 @@
+"""
+Unit tests for partial progress updates
+Tests the guarded positional operations, the step-state pipeline and applied
+counts, and their effect on a live MongoDB (skipped when none is reachable)
+"""
+
+import asyncio
+from datetime import datetime
+from pymongo.results import BulkWriteResult
+from backend.models import ProgressUpdate
+from backend.services.progress_updates import (
+    apply_progress_updates, build_progress_operations, initial_steps, TOTAL_STEPS
+)
+
+
+def test_each_toggle_is_a_guarded_set_and_push():
+    now = datetime(2026, 5, 1)
+    operations = build_progress_operations(
+        "u1", [ProgressUpdate(step_id=2, task_id=7, completed=True)], now=now
+    )
+    seed, set_existing, push_new, step_state = [op._doc for op in operations]
+    filters = [op._filter for op in operations]
+
+    assert operations[0]._upsert is True
+    assert len(seed["$setOnInsert"]["steps"]) == TOTAL_STEPS
+
+    assert filters[1]["steps"]["$elemMatch"] == {"step_id": "2", "tasks.task_id": "7"}
+    assert set_existing["$set"]["steps.$[s].tasks.$[t].completed"] is True
+    assert set_existing["$set"]["steps.$[s].tasks.$[c].completed_at"] == now
+    assert operations[1]._array_filters == [
+        {"s.step_id": "2"}, {"t.task_id": "7"}, {"c.task_id": "7", "c.completed": {"$ne": True}}
+    ]
+
+    assert filters[2]["steps"]["$elemMatch"] == {"step_id": "2", "tasks.task_id": {"$ne": "7"}}
+    pushed = push_new["$push"]["steps.$.tasks"]
+    assert (pushed["task_id"], pushed["completed"], pushed["viewed"]) == ("7", True, True)
+
+    # Step completion and unlocking run as an update pipeline on the server
+    assert isinstance(step_state, list)
+    assert "unlocked" in str(step_state[-1])
+
+
+def test_only_first_step_starts_unlocked():
+    assert [step["unlocked"] for step in initial_steps()] == [True] + [False] * (TOTAL_STEPS - 1)
+
+
+def test_applied_count_excludes_seed_and_pipeline(mongo_db, monkeypatch):
+    # mongomock has no array filters: answer the bulk write with the counts MongoDB reports
+    calls = []
+
+    def answer_with(matched, upserted):
+        def bulk_write(operations, ordered=True):
+            calls.append((operations, ordered))
+            return BulkWriteResult({"nMatched": matched, "nUpserted": upserted}, True)
+        monkeypatch.setattr(mongo_db.user_progress.sync, "bulk_write", bulk_write)
+
+    updates = [ProgressUpdate(step_id=1, task_id=n, completed=True) for n in range(3)]
+
+    # Existing document: seed matched, pipeline matched, one toggle hit an unknown step
+    answer_with(matched=4, upserted=0)
+    assert asyncio.run(apply_progress_updates(mongo_db, "u1", updates)) == 2
+    operations, ordered = calls[0]
+    assert ordered is True
+    assert len(operations) == 1 + 2 * len(updates) + 1
+
+    # New document: the seed inserted instead of matching
+    answer_with(matched=4, upserted=1)
+    assert asyncio.run(apply_progress_updates(mongo_db, "u1", updates)) == 3
+    assert mongo_db.user_progress.calls["bulk_write"] == 2
+
+
+def toggle(step_id, task_id, completed=True):
+    return ProgressUpdate(step_id=step_id, task_id=task_id, completed=completed)
+
+
+def test_toggles_on_mongodb(live_mongo_db):
+    async def scenario(db):
+        async def steps():
+            progress = await db.user_progress.find_one({"user_id": "u1"})
+            return {step["step_id"]: step for step in progress["steps"]}
+
+        results = {"first": await apply_progress_updates(db, "u1", [toggle(1, 1), toggle(1, 2, completed=False)])}
+        results["after_first"] = await steps()
+        results["repeat"] = await apply_progress_updates(db, "u1", [toggle(1, 1)])
+        results["after_repeat"] = await steps()
+        results["finish"] = await apply_progress_updates(db, "u1", [toggle(1, 2), toggle(99, 1)])
+        results["after_finish"] = await steps()
+        results["undo"] = await apply_progress_updates(db, "u1", [toggle(1, 1, completed=False)])
+        results["after_undo"] = await steps()
+        return results
+
+    results = live_mongo_db(scenario)
+
+    # New document: both toggles applied as new tasks, step 1 not finished yet
+    assert results["first"] == 2
+    step = results["after_first"]["1"]
+    assert [(t["task_id"], t["completed"]) for t in step["tasks"]] == [("1", True), ("2", False)]
+    assert step["tasks"][0]["completed_at"] is not None
+    assert not step["completed"] and not results["after_first"]["2"]["unlocked"]
+
+    # Repeating a toggle matches the task but changes nothing, not even completed_at
+    assert results["repeat"] == 1
+    assert results["after_repeat"]["1"]["tasks"] == step["tasks"]
+
+    # Finishing the last task completes step 1 and unlocks step 2; unknown steps are not applied
+    assert results["finish"] == 1
+    assert results["after_finish"]["1"]["completed"] and results["after_finish"]["1"]["completed_at"]
+    assert results["after_finish"]["2"]["unlocked"] and not results["after_finish"]["3"]["unlocked"]
+    assert "99" not in results["after_finish"]
+
+    # Undoing a task reopens the step; unlocked steps stay unlocked
+    assert results["undo"] == 1
+    task = results["after_undo"]["1"]["tasks"][0]
+    assert (task["completed"], task["completed_at"]) == (False, None)
+    assert not results["after_undo"]["1"]["completed"] and results["after_undo"]["1"]["completed_at"] is None
+    assert results["after_undo"]["2"]["unlocked"]
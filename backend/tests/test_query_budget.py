@@ -0,0 +1,195 @@
+"""
+Unit tests for per-request query budgets
+Tests query shapes, budget and N+1 checks in the metrics middleware, the
+query_tracer fixture and the budgeted endpoints on a live MongoDB
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.auth import create_access_token
+from backend.database import get_database
+from backend.middleware.metrics import MetricsMiddleware
+from backend.routes import admin, badges, content_management, reddit_forum
+from backend.services.metrics import command_metrics
+from backend.services.query_budget import QueryBudgetExceeded, query_budget, query_shape
+
+
+def issue(command_name, command):
+    """What PyMongo reports when Motor sends a command from its executor."""
+    return asyncio.to_thread(
+        command_metrics.started, SimpleNamespace(command_name=command_name, command=command)
+    )
+
+
+def build_app(mode):
+    app = FastAPI()
+
+    @app.get("/budget-test/batched")
+    @query_budget(2)
+    async def batched():
+        await issue("find", {"find": "threads", "filter": {"forum_id": "f1"}})
+        await issue("aggregate", {"aggregate": "comments", "pipeline": [
+            {"$match": {"thread_id": {"$in": ["t1", "t2"]}}}, {"$group": {"_id": "$thread_id"}}
+        ]})
+        await issue("getMore", {"getMore": 1, "collection": "threads"})
+        return {"ok": True}
+
+    @app.get("/budget-test/n-plus-one")
+    async def n_plus_one():
+        for thread_id in ("t1", "t2", "t3", "t4"):
+            await issue("count", {"count": "comments", "query": {"thread_id": thread_id}})
+        return {"ok": True}
+
+    @app.get("/budget-test/over-budget")
+    @query_budget(1)
+    async def over_budget():
+        await issue("find", {"find": "users", "filter": {"id": "u1"}})
+        await issue("find", {"find": "badges", "filter": {"badge_id": "b1"}})
+        return {"ok": True}
+
+    app.add_middleware(MetricsMiddleware, query_budget_mode=mode)
+    return app
+
+
+def test_query_shape_strips_values():
+    assert query_shape("find", {"find": "users", "filter": {"id": "u1"}}) == "find users {id: ?}"
+    assert query_shape("find", {"find": "users", "filter": {"id": {"$in": ["a", "b"]}}}) == \
+        "find users {id: {$in: [...]}}"
+    assert query_shape("count", {"count": "comments", "query": {"thread_id": "t1", "is_deleted": False}}) == \
+        "count comments {is_deleted: ?, thread_id: ?}"
+    assert query_shape("update", {"update": "users", "updates": [{"q": {"id": "u1"}, "u": {}}]}) == \
+        "update users {id: ?}"
+    assert query_shape("getMore", {"getMore": 1}) is None
+
+
+def test_batched_endpoint_within_budget():
+    client = TestClient(build_app("raise"))
+    assert client.get("/budget-test/batched").status_code == 200
+
+
+def test_query_in_loop_raises():
+    client = TestClient(build_app("raise"))
+    with pytest.raises(QueryBudgetExceeded, match=r"N\+1: 4x count comments \{thread_id: \?\}"):
+        client.get("/budget-test/n-plus-one")
+
+
+def test_declared_budget_raises():
+    client = TestClient(build_app("raise"))
+    with pytest.raises(QueryBudgetExceeded, match=r"2 queries \(budget 1\)"):
+        client.get("/budget-test/over-budget")
+
+
+def test_log_mode_only_warns(caplog):
+    client = TestClient(build_app("log"))
+    with caplog.at_level(logging.WARNING, logger="backend.services.query_budget"):
+        assert client.get("/budget-test/n-plus-one").status_code == 200
+    assert "GET /budget-test/n-plus-one: N+1" in caplog.text
+
+
+def test_off_mode_does_not_trace():
+    client = TestClient(build_app("off"))
+    assert client.get("/budget-test/over-budget").status_code == 200
+
+
+def test_query_tracer_fixture(query_tracer):
+    with query_tracer(max_queries=2) as stats:
+        command_metrics.started(SimpleNamespace(command_name="find", command={"find": "users", "filter": {}}))
+    assert stats.queries == 1
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_tracer():
+            for user_id in ("a", "b", "c", "d"):
+                command_metrics.started(
+                    SimpleNamespace(command_name="find", command={"find": "users", "filter": {"id": user_id}})
+                )
+
+
+async def seed(db, n=8):
+    """An admin with a premium plan and ``n`` of everything the budgeted endpoints read."""
+    now = datetime.utcnow()
+    users = [{
+        "id": f"u{i}", "email": f"user{i}@example.com", "password_hash": "x", "first_name": f"User{i}",
+        "subscription_tier": "PREMIUM", "is_admin": i == 0, "created_at": now - timedelta(minutes=i)
+    } for i in range(n)]
+    await db.users.insert_many(users)
+    await db.personal_files.insert_many([{"id": f"f{i}", "user_id": f"u{i % n}"} for i in range(2 * n)])
+    await db.user_progress.insert_many([
+        {"user_id": f"u{i}", "steps": [{"tasks": [{"task_id": "t1"}, {"task_id": "t2"}]}]} for i in range(n)
+    ])
+    await db.badges.insert_many([
+        {"badge_id": f"b{i}", "name": f"Badge {i}", "icon": f"b{i}.svg"} for i in range(4)
+    ])
+    await db.user_badges.insert_many([
+        {"user_id": f"u{i}", "badge_id": f"b{j}", "awarded_at": now - timedelta(days=j)}
+        for i in range(n) for j in range(i % 4 + 1)
+    ])
+    await db.forums.insert_one({"id": "forum1", "slug": "general", "is_active": True})
+    await db.threads.insert_many([{
+        "id": f"t{i}", "forum_id": "forum1", "author_id": f"u{i}", "title": f"Thread {i}", "body": "...",
+        "attachments": [], "up_votes": i, "down_votes": 0, "created_at": now, "updated_at": now - timedelta(hours=i),
+        "is_locked": False, "is_pinned": False
+    } for i in range(n)])
+    await db.comments.insert_many([
+        {"id": f"c{i}", "thread_id": f"t{i % n}", "author_id": "u1", "is_deleted": False} for i in range(2 * n)
+    ])
+    await db.votes.insert_many([
+        {"user_id": "u0", "target_id": f"t{i}", "target_type": "thread", "value": 1} for i in range(0, n, 2)
+    ])
+    await db.node_content.insert_many([{
+        "id": f"n{i}", "node_id": f"node{i}", "node_type": "step", "title": f"Node {i}", "version_count": i,
+        "created_by": "u0", "updated_by": "u0", "created_at": now - timedelta(minutes=i), "updated_at": now
+    } for i in range(n)])
+    await db.content_stats.insert_many([{"content_id": f"n{i}", "view_count": i} for i in range(n)])
+    await db.content_previews.insert_many([
+        {"content_id": f"n{i}", "expires_at": now + timedelta(hours=1)} for i in range(0, n, 2)
+    ])
+
+
+def test_budgeted_endpoints_stay_within_budget(live_mongo_db, monkeypatch):
+    app = FastAPI()
+    for module in (admin, badges, content_management, reddit_forum):
+        app.include_router(module.router)
+    app.add_middleware(MetricsMiddleware, query_budget_mode="raise")
+
+    async def scenario(db):
+        await seed(db)
+        app.dependency_overrides[get_database] = lambda: db
+        monkeypatch.setattr(reddit_forum, "db", db)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'u0'})}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+            return {
+                path: await client.get(path)
+                for path in ("/forums/general/threads", "/badges/leaderboard", "/admin/users", "/content/nodes")
+            }
+
+    responses = live_mongo_db(scenario)
+    for path, response in responses.items():
+        assert response.status_code == 200, (path, response.text)
+
+    threads = responses["/forums/general/threads"].json()
+    assert [t["id"] for t in threads][:3] == ["t0", "t1", "t2"]
+    assert all(t["comment_count"] == 2 for t in threads)
+    assert [t["user_vote"] for t in threads][:2] == [1, None]
+
+    leaderboard = responses["/badges/leaderboard"].json()
+    assert leaderboard[0]["badge_count"] == 4 and len(leaderboard[0]["top_badges"]) == 3
+    assert leaderboard[0]["top_badges"][0]["badge_id"] == "b0"
+
+    users = {user["id"]: user for user in responses["/admin/users"].json()}
+    assert len(users) == 8
+    assert users["u1"]["total_files"] == 2 and users["u1"]["total_progress_steps"] == 2
+
+    nodes = responses["/content/nodes"].json()
+    assert nodes["total"] == 8 and [c["id"] for c in nodes["contents"]][:2] == ["n0", "n1"]
+    assert nodes["contents"][0]["has_preview"] and not nodes["contents"][1]["has_preview"]
+    assert nodes["contents"][1]["stats"]["view_count"] == 1
@@ -0,0 +1,90 @@
+"""
+Unit tests for randomized question decks
+Tests per-user permutations, pass boundaries, skipping recently solved items
+and rejecting unknown filters
+"""
+
+import asyncio
+from datetime import datetime
+from backend.services import question_decks
+from backend.services.question_decks import new_walk, walk_indices
+
+
+def make_db(mongo_db, term_count):
+    mongo_db.fachbegriffe_terms.sync.insert_many(
+        {"id": f"t{n}", "is_active": True, "category": "anatomy", "difficulty": "easy"} for n in range(term_count)
+    )
+    return mongo_db
+
+
+def play_rounds(db, user_id, rounds, size, category=None, difficulty=None):
+    async def scenario():
+        return [
+            await question_decks.next_round(db, user_id, "fachbegriffe", category, difficulty, size)
+            for _ in range(rounds)
+        ]
+    return asyncio.run(scenario())
+
+
+def setup_function():
+    question_decks._deck_cache.clear()
+    question_decks._facet_cache.clear()
+
+
+def test_walk_is_a_permutation():
+    for n in (1, 2, 12, 97, 100):
+        walk = new_walk(n)
+        assert sorted(walk_indices(walk, n, n)) == list(range(n))
+
+
+def test_a_full_pass_shows_every_item_once_then_reshuffles(mongo_db):
+    db = make_db(mongo_db, 20)
+    rounds = play_rounds(db, "u1", 5, 5)
+
+    first_pass = [item for round_ids in rounds[:4] for item in round_ids]
+    assert sorted(first_pass) == sorted(f"t{n}" for n in range(20))
+    assert len(rounds[4]) == 5
+    assert db.user_decks.docs[0]["passes"] == 1
+    # The deck is built once and then served from the process cache
+    assert db.fachbegriffe_terms.calls["find"] == 1
+
+
+def test_users_get_their_own_order(mongo_db):
+    db = make_db(mongo_db, 200)
+    first = play_rounds(db, "u1", 1, 10)[0]
+    second = play_rounds(db, "u2", 1, 10)[0]
+    assert first != second
+
+
+def test_recently_solved_items_are_skipped(mongo_db):
+    db = make_db(mongo_db, 30)
+    solved = [f"t{n}" for n in range(0, 30, 2)]
+    db.game_results.sync.insert_one({
+        "user_id": "u1", "game_type": "fachbegriffe", "created_at": datetime.utcnow(), "correct_item_ids": solved
+    })
+
+    served = [item for round_ids in play_rounds(db, "u1", 3, 5) for item in round_ids]
+    assert len(served) == 15
+    assert not set(served) & set(solved)
+
+
+def test_invalidated_deck_is_rebuilt_and_restarts_users(mongo_db):
+    db = make_db(mongo_db, 10)
+    play_rounds(db, "u1", 1, 4)
+    db.fachbegriffe_terms.sync.insert_one({"id": "new", "is_active": True})
+    asyncio.run(question_decks.invalidate_decks(db, "fachbegriffe"))
+
+    served = [item for round_ids in play_rounds(db, "u1", 1, 11) for item in round_ids]
+    assert sorted(served) == sorted([f"t{n}" for n in range(10)] + ["new"])
+
+
+def test_only_known_filters_with_items_get_a_stored_deck(mongo_db):
+    db = make_db(mongo_db, 5)
+    db.fachbegriffe_terms.sync.insert_one({"id": "hard", "is_active": True, "category": "symptoms", "difficulty": "hard"})
+
+    assert len(play_rounds(db, "u1", 1, 3, category="anatomy", difficulty="easy")[0]) == 3
+    for category, difficulty in (("made-up", None), (None, "x" * 100), ("anatomy", "hard")):
+        assert play_rounds(db, "u1", 1, 3, category=category, difficulty=difficulty) == [[]]
+
+    assert db.question_decks.sync.distinct("_id") == ["fachbegriffe:anatomy:easy"]
+    assert set(question_decks._deck_cache) == {"fachbegriffe:anatomy:easy", "fachbegriffe:anatomy:hard"}
@@ -0,0 +1,133 @@
+"""
+Unit tests for the ASGI rate limiting middleware
+Tests limit parsing, the token bucket fallback and request keying; per-request
+overhead: scripts/benchmark_rate_limit.py
+"""
+
+import pytest
+from fastapi import FastAPI, APIRouter, Request
+from fastapi.testclient import TestClient
+from backend.auth import create_access_token
+from backend.security import safe_rate_limit
+from backend.middleware.rate_limit import (
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    TokenBucketLimiter,
+    parse_rate_limit,
+    resolve_policy,
+)
+
+
+def build_app(**middleware_kwargs):
+    app = FastAPI()
+    router = APIRouter(prefix="/api")
+
+    @router.post("/login")
+    @safe_rate_limit("login")
+    async def login(request: Request):
+        return {"ok": True}
+
+    @router.delete("/users/{user_id}")
+    @safe_rate_limit("1 per minute")
+    async def delete_user(user_id: str, request: Request):
+        return {"deleted": user_id}
+
+    @router.get("/open")
+    async def open_route():
+        return {"ok": True}
+
+    app.include_router(router)
+    app.add_middleware(RateLimitMiddleware, config={"login": "2 per minute"}, **middleware_kwargs)
+    return app
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("10 per minute") == ((10, 60),)
+    assert parse_rate_limit("200 per day, 50 per hour") == ((200, 86400), (50, 3600))
+    assert parse_rate_limit("5/second") == ((5, 1),)
+    with pytest.raises(ValueError):
+        parse_rate_limit("lots per fortnight")
+
+
+def test_resolve_policy_uses_config_budget_names():
+    policy = resolve_policy("login", {"login": "10 per minute"})
+    assert policy.name == "login"
+    assert policy.limits == ((10, 60),)
+    assert resolve_policy("3 per hour", {}).limits == ((3, 3600),)
+
+
+def test_token_bucket_allows_burst_then_refills():
+    limiter = TokenBucketLimiter()
+    policy = RateLimitPolicy(name="t", limits=((2, 60),))
+
+    assert limiter.hit("k", policy, now=0).allowed
+    assert limiter.hit("k", policy, now=0).allowed
+    rejected = limiter.hit("k", policy, now=0)
+    assert not rejected.allowed
+    assert rejected.retry_after == 30
+    # One token refills every 30 seconds
+    assert limiter.hit("k", policy, now=30).allowed
+
+
+def test_token_bucket_evicts_least_recently_used_keys():
+    limiter = TokenBucketLimiter(max_keys=2)
+    policy = RateLimitPolicy(name="t", limits=((1, 60),))
+    for key in ("a", "b", "c"):
+        limiter.hit(key, policy, now=0)
+    # "a" was evicted, so it starts with a full bucket again
+    assert limiter.hit("a", policy, now=0).allowed
+    assert not limiter.hit("c", policy, now=0).allowed
+
+
+def test_middleware_limits_declared_routes_only():
+    client = TestClient(build_app())
+
+    assert client.post("/api/login").status_code == 200
+    response = client.post("/api/login")
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-remaining"] == "0"
+
+    blocked = client.post("/api/login")
+    assert blocked.status_code == 429
+    assert blocked.json()["error"] == "Rate limit exceeded"
+    assert int(blocked.headers["retry-after"]) > 0
+
+    # Routes with path parameters are matched too
+    assert client.delete("/api/users/1").status_code == 200
+    assert client.delete("/api/users/2").status_code == 429
+
+    # Undeclared routes are never limited
+    for _ in range(5):
+        assert client.get("/api/open").status_code == 200
+
+
+def test_middleware_keys_authenticated_requests_by_user():
+    client = TestClient(build_app())
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob'})}"}
+
+    for _ in range(2):
+        assert client.post("/api/login", headers=alice).status_code == 200
+    assert client.post("/api/login", headers=alice).status_code == 429
+    # Same IP, different user: separate budget
+    assert client.post("/api/login", headers=bob).status_code == 200
+    # Forged tokens fall back to the IP budget
+    assert client.post("/api/login", headers={"Authorization": "Bearer forged"}).status_code == 200
+
+
+class FailingRedis:
+    def register_script(self, script):
+        async def run(keys, args):
+            raise ConnectionError("redis down")
+        return run
+
+
+def test_middleware_falls_back_to_token_bucket_when_redis_fails():
+    async def redis_factory():
+        return FailingRedis()
+
+    client = TestClient(build_app(redis_factory=redis_factory))
+    assert client.post("/api/login").status_code == 200
+    assert client.post("/api/login").status_code == 200
+    assert client.post("/api/login").status_code == 429
+
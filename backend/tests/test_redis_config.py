@@ -0,0 +1,33 @@
+"""
+Unit tests for the shared Redis pool
+Tests that every event loop gets its own pool, as Celery tasks run each on a new loop
+"""
+
+import asyncio
+from backend import redis_config
+
+
+def test_each_event_loop_gets_its_own_client(monkeypatch):
+    async def ping(self):
+        return True
+
+    monkeypatch.setattr(redis_config.redis.Redis, "ping", ping)
+
+    async def task_body():
+        client = await redis_config.get_redis_client()
+        assert await redis_config.get_redis_client() is client
+        assert redis_config.get_redis_pool_stats()["initialized"]
+        return client
+
+    async def task_closing_its_pool():
+        client = await task_body()
+        await redis_config.close_redis_pool()
+        return client
+
+    first = asyncio.run(task_body())
+    second = asyncio.run(task_closing_its_pool())
+    third = asyncio.run(task_body())
+
+    assert len({id(first), id(second), id(third)}) == 3
+    assert first.connection_pool is not second.connection_pool
+    assert not redis_config.get_redis_pool_stats()["initialized"]  # no running loop
@@ -0,0 +1,42 @@
+"""
+Unit tests for audit/activity retention
+Tests retention classes, expiry stamping and audit log keyset cursors
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from backend.services.retention import (
+    AUDIT_RETENTION_DAYS,
+    apply_audit_retention,
+    classify_audit_entry,
+    decode_audit_cursor,
+    encode_audit_cursor,
+)
+
+
+def test_classify_audit_entry():
+    assert classify_audit_entry({"action": "file_download", "details": {}}) == "standard"
+    assert classify_audit_entry({"action": "data_access", "details": {"compliance_log": True}}) == "compliance"
+    assert classify_audit_entry({"action": "admin_delete_user", "details": None}) == "compliance"
+    assert classify_audit_entry({"action": "privacy_export", "details": {"gdpr_compliance": True}}) == "gdpr"
+
+
+def test_apply_audit_retention_stamps_expiry_once():
+    timestamp = datetime(2026, 1, 1)
+    entry = apply_audit_retention({"action": "privacy_export", "details": {"gdpr_compliance": True}, "timestamp": timestamp})
+    assert entry["retention_class"] == "gdpr"
+    assert entry["expires_at"] == timestamp + timedelta(days=AUDIT_RETENTION_DAYS["gdpr"])
+
+    explicit = {"action": "login", "timestamp": timestamp, "expires_at": timestamp}
+    assert apply_audit_retention(explicit)["expires_at"] == timestamp
+
+
+def test_audit_cursor_round_trip():
+    entry = {"_id": ObjectId(), "timestamp": datetime(2026, 10, 19, 12, 30, 15, 250000)}
+    query = decode_audit_cursor(encode_audit_cursor(entry))
+    assert query["$or"][0] == {"timestamp": {"$lt": entry["timestamp"]}}
+    assert query["$or"][1] == {"timestamp": entry["timestamp"], "_id": {"$lt": entry["_id"]}}
+
+    with pytest.raises(ValueError):
+        decode_audit_cursor("not-a-cursor")
@@ -0,0 +1,75 @@
+"""
+Unit tests for the security headers middleware
+Tests default and per-route headers and streaming responses; throughput
+against the previous implementation: scripts/benchmark_security_headers.py
+"""
+
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from backend.middleware.security_headers import (
+    DEFAULT_CSP,
+    DOCS_CSP,
+    DOWNLOAD_CSP,
+    SecurityHeadersMiddleware,
+    content_security_policy,
+)
+
+
+def build_app(tmp_path=None, **middleware_kwargs):
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page():
+        return PlainTextResponse("ok")
+
+    @app.get("/download")
+    @content_security_policy(DOWNLOAD_CSP)
+    async def download():
+        path = tmp_path / "upload.html"
+        path.write_text("<script>alert(1)</script>")
+        return FileResponse(path)
+
+    @app.get("/framed")
+    async def framed():
+        return PlainTextResponse("ok", headers={"X-Frame-Options": "SAMEORIGIN"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"data: {i}\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    app.add_middleware(SecurityHeadersMiddleware, **middleware_kwargs)
+    return app
+
+
+def test_default_headers(tmp_path):
+    response = TestClient(build_app(tmp_path=tmp_path)).get("/page")
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.headers["strict-transport-security"] == "max-age=31536000; includeSubDomains"
+    assert response.headers["content-security-policy"] == DEFAULT_CSP
+
+
+def test_route_and_path_overrides(tmp_path):
+    client = TestClient(build_app(tmp_path=tmp_path, path_policies={"/docs": DOCS_CSP}))
+    for _ in range(2):  # second request uses the cached headers
+        response = client.get("/download")
+        assert response.text == "<script>alert(1)</script>"
+        assert response.headers["content-security-policy"] == DOWNLOAD_CSP
+    assert client.get("/docs").headers["content-security-policy"] == DOCS_CSP
+    assert client.get("/missing").headers["content-security-policy"] == DEFAULT_CSP
+
+
+def test_headers_set_by_the_response_win(tmp_path):
+    response = TestClient(build_app(tmp_path=tmp_path)).get("/framed")
+    assert response.headers.get_list("x-frame-options") == ["SAMEORIGIN"]
+
+
+def test_streaming_response_passes_through(tmp_path):
+    response = TestClient(build_app(tmp_path=tmp_path)).get("/stream")
+    assert response.text == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+    assert response.headers["content-security-policy"] == DEFAULT_CSP
+
@@ -0,0 +1,79 @@
+"""
+Unit tests for spaced-repetition term reviews
+Tests SM-2 scheduling, the due-now query and batched answer submission
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from backend.models import TermReviewAnswer
+from backend.services.term_reviews import MIN_EASE, REVIEW_PROJECTION, due_reviews, record_answers, schedule
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def test_sm2_intervals_grow_and_reset_on_lapse():
+    state = None
+    intervals = []
+    for grade in (5, 4, 4, 4):
+        state = schedule(state, grade, NOW)
+        intervals.append(state["interval_days"])
+    assert intervals[:2] == [1, 6]
+    assert intervals[2] > intervals[1] and intervals[3] > intervals[2]
+
+    lapsed = schedule(state, 1, NOW)
+    assert (lapsed["interval_days"], lapsed["repetitions"], lapsed["lapses"]) == (1, 0, 1)
+    assert lapsed["ease"] < state["ease"]
+    assert lapsed["due_at"] == NOW + timedelta(days=1)
+
+
+def test_ease_never_drops_below_minimum():
+    state = None
+    for _ in range(20):
+        state = schedule(state, 0, NOW)
+    assert state["ease"] == MIN_EASE
+
+
+def make_db(mongo_db):
+    mongo_db.fachbegriffe_terms.sync.insert_many([{"id": "t1"}, {"id": "t2"}])
+    mongo_db.term_reviews.sync.insert_one(
+        {"user_id": "u1", "term_id": "t1", "ease": 2.5, "interval_days": 6, "repetitions": 2, "lapses": 0,
+         "due_at": NOW - timedelta(days=1)}
+    )
+    return mongo_db
+
+
+def test_due_reviews_are_the_most_overdue_of_the_user(mongo_db):
+    db = make_db(mongo_db)
+    db.term_reviews.sync.insert_many([
+        {"user_id": "u1", "term_id": f"d{n}", "due_at": NOW - timedelta(days=n)} for n in range(2, 6)
+    ] + [
+        {"user_id": "u1", "term_id": "later", "due_at": NOW + timedelta(minutes=1)},
+        {"user_id": "u2", "term_id": "t1", "due_at": NOW - timedelta(days=30)},
+    ])
+
+    due = asyncio.run(due_reviews(db, "u1", 3, now=NOW))
+    assert [review["term_id"] for review in due] == ["d5", "d4", "d3"]
+    assert all(set(review) <= set(REVIEW_PROJECTION) for review in due)
+
+
+def test_session_answers_are_one_bulk_write(mongo_db):
+    db = make_db(mongo_db)
+    answers = [
+        TermReviewAnswer(term_id="t1", grade=5),
+        TermReviewAnswer(term_id="t2", grade=2),
+        TermReviewAnswer(term_id="t2", grade=4),
+        TermReviewAnswer(term_id="unknown", grade=5),
+    ]
+
+    states = asyncio.run(record_answers(db, "u1", answers, now=NOW))
+
+    assert [s["term_id"] for s in states] == ["t1", "t2"]
+    assert states[0]["interval_days"] == 15  # third successful repetition: 6 * 2.6
+    assert (states[1]["repetitions"], states[1]["interval_days"]) == (1, 1)
+    assert db.term_reviews.calls["bulk_write"] == 1
+
+    stored = {review["term_id"]: review for review in db.term_reviews.docs}
+    assert set(stored) == {"t1", "t2"}
+    assert stored["t1"]["due_at"] == NOW + timedelta(days=15) and "created_at" not in stored["t1"]
+    assert (stored["t2"]["user_id"], stored["t2"]["created_at"]) == ("u1", NOW)
+    assert asyncio.run(due_reviews(db, "u1", 10, now=NOW + timedelta(days=1)))[0]["term_id"] == "t2"
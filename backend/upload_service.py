@@ -4,7 +4,6 @@ Handles file uploads for forum attachments with proper validation and storage
 """
 
 import os
-import boto3
 import hashlib
 import mimetypes
 from typing import Optional
@@ -29,6 +28,7 @@ class UploadService:
         self.r2_client = None
         if all([self.r2_endpoint, self.r2_bucket, self.r2_access_key, self.r2_secret_key]):
             try:
+                import boto3
                 self.r2_client = boto3.client(
                     's3',
                     endpoint_url=self.r2_endpoint,
@@ -107,6 +107,18 @@ class ApiService {
     return response.data;
   }
 
+  async updateProgressBatch(updates) {
+    const response = await this.client.patch('/progress', {
+      updates: updates.map(({ stepId, taskId, completed, viewed = true }) => ({
+        step_id: stepId,
+        task_id: taskId,
+        completed,
+        viewed
+      }))
+    });
+    return response.data;
+  }
+
   async syncProgress(progressData) {
     const response = await this.client.post('/progress/sync', progressData);
     return response.data;
@@ -82,6 +82,45 @@ export const contentApi = {
     return await api.get(`/content/notifications?${params.toString()}`);
   },
 
+  // Push notifications over Server-Sent Events. The stream is opened with a
+  // short-lived stream token (EventSource cannot send headers); once the
+  // browser gives up reconnecting (e.g. the token expired), a new token is
+  // fetched and the stream resumes after the last event. Returns an
+  // unsubscribe function.
+  subscribeToContentNotifications: (onNotification) => {
+    const baseUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+    let source = null;
+    let lastEventId = '';
+    let closed = false;
+
+    const connect = async () => {
+      let streamToken;
+      try {
+        ({ stream_token: streamToken } = await api.post('/content/notifications/stream-token'));
+      } catch (error) {
+        if (!closed) setTimeout(connect, 5000);
+        return;
+      }
+      if (closed) return;
+      const params = new URLSearchParams({ stream_token: streamToken });
+      if (lastEventId) params.append('last_event_id', lastEventId);
+      source = new EventSource(`${baseUrl}/api/content/notifications/stream?${params.toString()}`);
+      source.addEventListener('content_update', (event) => {
+        lastEventId = event.lastEventId;
+        onNotification(JSON.parse(event.data));
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !closed) setTimeout(connect, 5000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (source) source.close();
+    };
+  },
+
   // Content Templates
   getContentTemplates: async () => {
     return await api.get('/content/templates');
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Backfill the denormalized node_content.version_count counter from
+content_versions. Run once after deploying the single-aggregation CMS
+listing; new versions keep the counter up to date themselves.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+
+from backend.database import get_database
+
+
+async def backfill_content_version_counts():
+    print("Backfilling node_content.version_count...")
+    db = await get_database()
+
+    counts = await db.content_versions.aggregate([
+        {"$group": {"_id": "$content_id", "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+
+    updates = [UpdateOne({"id": group["_id"]}, {"$set": {"version_count": group["count"]}}) for group in counts]
+    if updates:
+        result = await db.node_content.bulk_write(updates, ordered=False)
+        print(f"✓ Updated {result.modified_count} of {len(updates)} content documents")
+
+    result = await db.node_content.update_many({"version_count": {"$exists": False}}, {"$set": {"version_count": 0}})
+    print(f"✓ Initialized {result.modified_count} content documents without versions")
+
+if __name__ == "__main__":
+    asyncio.run(backfill_content_version_counts())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Build the materialized game_leaderboards collection from game_results.
+Run once after deploying materialized leaderboards; new results keep the
+entries up to date themselves. The Redis sorted sets are dropped so they
+are rebuilt from the fresh entries on the next read.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import get_database
+from backend.models import GameType
+from backend.redis_config import get_redis_client
+from backend.services.index_registry import build_missing_indexes
+from backend.services.leaderboards import LEADERBOARD_INDEXES, LEADERBOARD_KEY
+
+
+async def backfill_game_leaderboards():
+    print("Building game_leaderboards from game_results...")
+    db = await get_database()
+
+    # $merge needs the unique (game_type, user_id) index
+    await build_missing_indexes(db, LEADERBOARD_INDEXES)
+
+    await db.game_results.aggregate([
+        {"$group": {
+            "_id": {"game_type": "$game_type", "user_id": "$user_id"},
+            "games_played": {"$sum": 1},
+            "total_score": {"$sum": "$score"},
+            "best_score": {"$max": "$score"},
+            "updated_at": {"$max": "$created_at"},
+        }},
+        {"$project": {
+            "_id": 0,
+            "game_type": "$_id.game_type",
+            "user_id": "$_id.user_id",
+            "games_played": 1,
+            "total_score": 1,
+            "best_score": 1,
+            "avg_score": {"$divide": ["$total_score", "$games_played"]},
+            "updated_at": 1,
+        }},
+        {"$merge": {"into": "game_leaderboards", "on": ["game_type", "user_id"], "whenMatched": "replace"}},
+    ], allowDiskUse=True).to_list(length=None)
+
+    for game_type in GameType:
+        entries = await db.game_leaderboards.count_documents({"game_type": game_type.value})
+        print(f"✓ {game_type.value}: {entries} leaderboard entries")
+
+    redis = await get_redis_client()
+    if redis is not None:
+        await redis.delete(*(LEADERBOARD_KEY.format(game_type=game_type.value) for game_type in GameType))
+        print("✓ Cached sorted sets cleared")
+
+if __name__ == "__main__":
+    asyncio.run(backfill_game_leaderboards())
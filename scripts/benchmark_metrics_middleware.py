@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Measure the per-request overhead of the request metrics middleware
+(backend/middleware/metrics.py) against a bare ASGI app. Requests are
+driven straight through the ASGI app, with query budgets off as in
+production.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.middleware.metrics import MetricsMiddleware
+
+route = SimpleNamespace(path="/metrics-bench/items/{id}")
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def seconds_per_request(target, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await target({"type": "http", "method": "GET", "path": "/metrics-bench/items/1"}, receive, send)
+    return (time.perf_counter() - start) / n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000, help="requests per measurement")
+    args = parser.parse_args()
+
+    middleware = MetricsMiddleware(bare_app, query_budget_mode="off")
+    baseline = asyncio.run(seconds_per_request(bare_app, args.requests))
+    overhead = asyncio.run(seconds_per_request(middleware, args.requests)) - baseline
+    print(f"Metrics middleware: {overhead * 1e6:.2f} µs per request")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measure the per-request overhead of the rate limiting middleware
+(backend/middleware/rate_limit.py) against a bare ASGI app, for a route
+without a limit and for a limited route served from the local token
+bucket (no Redis). Requests are driven straight through the ASGI app.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, APIRouter, Request
+
+from backend.middleware.rate_limit import RateLimitMiddleware
+from backend.security import safe_rate_limit
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(prefix="/api")
+
+    @router.post("/login")
+    @safe_rate_limit("login")
+    async def login(request: Request):
+        return {"ok": True}
+
+    @router.get("/open")
+    async def open_route():
+        return {"ok": True}
+
+    app.include_router(router)
+    return app
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+def scope(method, path):
+    return {"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.1", 1234)}
+
+
+async def seconds_per_request(target, method: str, path: str, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await target(scope(method, path), receive, send)
+    return (time.perf_counter() - start) / n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000, help="requests per measurement")
+    args = parser.parse_args()
+
+    middleware = RateLimitMiddleware(bare_app, config={"login": "1000000 per minute"})
+    middleware._build_route_table(build_app())
+
+    baseline = asyncio.run(seconds_per_request(bare_app, "GET", "/api/open", args.requests))
+    unlimited = asyncio.run(seconds_per_request(middleware, "GET", "/api/open", args.requests)) - baseline
+    limited = asyncio.run(seconds_per_request(middleware, "POST", "/api/login", args.requests)) - baseline
+    print(f"Unlimited route:              {unlimited * 1e6:.2f} µs per request")
+    print(f"Limited route (local bucket): {limited * 1e6:.2f} µs per request")
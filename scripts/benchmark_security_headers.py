@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare the requests per second through the security headers middleware
+(backend/middleware/security_headers.py) with the BaseHTTPMiddleware
+implementation it replaced. Requests are driven straight through the ASGI
+app, without a network stack, so the numbers only show the middleware's
+overhead; compare them on the same machine.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.middleware.security_headers import DEFAULT_CSP, SecurityHeadersMiddleware
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """The implementation the pure ASGI middleware replaced."""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        response.headers["Content-Security-Policy"] = DEFAULT_CSP
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page():
+        return PlainTextResponse("ok")
+
+    app.add_middleware(middleware)
+    return app
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def scope():
+    return {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": "/page",
+        "raw_path": b"/page", "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+
+
+async def requests_per_second(app, n: int) -> float:
+    await app(scope(), receive, send)  # build the middleware stack
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(scope(), receive, send)
+    return n / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000, help="requests per implementation")
+    args = parser.parse_args()
+
+    legacy = asyncio.run(requests_per_second(build_app(LegacySecurityHeadersMiddleware), args.requests))
+    current = asyncio.run(requests_per_second(build_app(SecurityHeadersMiddleware), args.requests))
+    print(f"BaseHTTPMiddleware: {legacy:.0f} req/s")
+    print(f"Pure ASGI:          {current:.0f} req/s ({current / legacy:.1f}x)")
@@ -9,10 +9,12 @@ import sys
 import os
 from pathlib import Path
 
-# Add backend to path
-sys.path.append(str(Path(__file__).parent.parent / "backend"))
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
 
-from services.backup_service import backup_service
+from motor.motor_asyncio import AsyncIOMotorClient
+from backend.services.backup_service import get_backup_service
+from backend.services.backup_catalog import BackupCatalog
 import logging
 
 # Setup logging
@@ -30,26 +32,33 @@ logger = logging.getLogger(__name__)
 async def main():
     """Run daily backup tasks."""
     
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    catalog = BackupCatalog(client[os.environ["DB_NAME"]])
+    backup_service = get_backup_service()
+    
     try:
         logger.info("Starting daily backup process...")
         
         # Create database backup
         logger.info("Creating database backup...")
         db_backup = await backup_service.create_database_backup()
+        await catalog.record(db_backup)
         logger.info(f"Database backup created: {db_backup['filename']}")
         
         # Create files backup
         logger.info("Creating files backup...")
         files_backup = await backup_service.create_files_backup()
+        if files_backup.get("filename"):
+            await catalog.record(files_backup)
         logger.info(f"Files backup created: {files_backup.get('filename', 'No files')}")
         
-        # Cleanup old backups (keep 30 days)
+        # Cleanup old backups (GFS retention policy from BACKUP_KEEP_* env vars)
         logger.info("Cleaning up old backups...")
-        cleanup_result = await backup_service.cleanup_old_backups(30)
+        cleanup_result = await backup_service.cleanup_old_backups(catalog)
         logger.info(f"Cleaned up {cleanup_result['deleted_count']} old backup files")
         
         # Get backup status
-        status = await backup_service.get_backup_status()
+        status = await backup_service.get_backup_status(catalog)
         logger.info(f"Backup status: {status['backup_count']} total backups, "
                    f"{status['total_size']} bytes total size")
         
@@ -58,6 +67,8 @@ async def main():
     except Exception as e:
         logger.error(f"Daily backup failed: {str(e)}")
         sys.exit(1)
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Build the MongoDB indexes declared in the index registry
+(backend/services/index_registry.py) that do not exist yet. Existing
+indexes are left alone, so it is safe to run on every deploy. Indexes
+whose keys exist with other options (unique, TTL, partial filter, name)
+are reported; --rebuild drops and rebuilds them as declared. With
+--check nothing is built and the exit code is 1 if indexes are missing
+or mismatched.
+
+A unique index cannot be built over duplicate values; merge them first
+(user_game_stats: scripts/migrate_mini_game_dates.py).
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import get_database
+from backend.services.index_registry import (
+    build_missing_indexes, compare_indexes, key_signature, rebuild_mismatched_indexes
+)
+
+
+async def ensure_indexes(check_only: bool, rebuild: bool) -> int:
+    db = await get_database()
+    missing, mismatched = await compare_indexes(db)
+
+    for collection, specs in missing.items():
+        for keys, _ in specs:
+            print(f"- {collection}: {key_signature(keys)} missing")
+    for collection, mismatches in mismatched.items():
+        for keys, _, index, differences in mismatches:
+            changes = ", ".join(f"{option} {found!r} -> {wanted!r}" for option, (wanted, found) in differences.items())
+            print(f"- {collection}: {key_signature(keys)} ({index['name']}) differs: {changes}")
+    if not missing and not mismatched:
+        print("✓ All declared indexes exist")
+        return 0
+    if check_only:
+        return 1
+
+    status = 0
+    if missing:
+        print("Building missing indexes...")
+        for collection, names in (await build_missing_indexes(db, missing)).items():
+            print(f"✓ {collection}: {', '.join(names)}")
+    if mismatched and rebuild:
+        print("Rebuilding mismatched indexes...")
+        for collection, mismatches in mismatched.items():
+            try:
+                rebuilt = await rebuild_mismatched_indexes(db, {collection: mismatches})
+            except Exception as e:
+                print(f"✗ {collection}: rebuild failed, previous index kept: {e}")
+                status = 1
+                continue
+            print(f"✓ {collection}: {', '.join(rebuilt.get(collection, []))}")
+    elif mismatched:
+        print("Mismatched indexes left as they are; run with --rebuild to rebuild them")
+        status = 1
+
+    if status == 0:
+        print("\nIndexes are up to date!")
+    return status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true", help="only report missing and mismatched indexes")
+    parser.add_argument("--rebuild", action="store_true", help="drop and rebuild indexes whose options differ")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(ensure_indexes(args.check, args.rebuild)))
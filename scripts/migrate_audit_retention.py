@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Migration script that moves audit_logs and user_activity onto TTL retention.
+Backfills the per-user activity counters first, then stamps expires_at on
+existing entries and creates the TTL indexes. Safe to run more than once.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+
+from backend.database import get_database
+from backend.services.retention import (
+    AUDIT_RETENTION_DAYS,
+    USER_ACTIVITY_RETENTION_DAYS,
+    RETENTION_INDEXES,
+)
+from backend.services.index_registry import build_missing_indexes
+
+DAY_MS = 24 * 60 * 60 * 1000
+BATCH_SIZE = 1000
+
+
+def _expires_after(field: str, days: int) -> list:
+    """Update pipeline setting expires_at to ``field`` + ``days``."""
+    return [{"$set": {"expires_at": {"$add": [f"${field}", days * DAY_MS]}}}]
+
+
+async def backfill_activity_counters(db) -> int:
+    """Store activity counts on user_stats before any user_activity entry can expire."""
+    pipeline = [
+        {"$group": {"_id": {"user_id": "$user_id", "type": "$activity_type"}, "count": {"$sum": 1}}},
+        {"$group": {"_id": "$_id.user_id", "counts": {"$push": {"k": "$_id.type", "v": "$count"}}}},
+    ]
+    updates = []
+    users = 0
+    async for group in db.user_activity.aggregate(pipeline, allowDiskUse=True):
+        counts = {item["k"]: item["v"] for item in group["counts"] if item["k"]}
+        # Counters that were already backfilled are kept: by now some of the
+        # activity they count may have expired
+        updates.append(UpdateOne(
+            {"user_id": group["_id"]},
+            [{"$set": {
+                "activity_counts": {"$cond": [
+                    {"$eq": ["$activity_counts_backfilled", True]},
+                    "$activity_counts",
+                    {"$literal": counts},
+                ]},
+                "activity_counts_backfilled": True,
+            }}],
+            upsert=True,
+        ))
+        if len(updates) >= BATCH_SIZE:
+            users += await _apply(db, updates)
+            updates = []
+    if updates:
+        users += await _apply(db, updates)
+    return users
+
+
+async def _apply(db, updates) -> int:
+    result = await db.user_stats.bulk_write(updates, ordered=False)
+    return result.modified_count + result.upserted_count
+
+
+async def stamp_audit_logs(db) -> int:
+    missing = {"expires_at": {"$exists": False}}
+    stamped = 0
+    for retention_class, match in (
+        ("gdpr", {"details.gdpr_compliance": True}),
+        ("compliance", {"$or": [{"details.compliance_log": True}, {"action": {"$regex": "^admin_"}}]}),
+        ("standard", {}),
+    ):
+        result = await db.audit_logs.update_many(
+            {**missing, **match},
+            [{"$set": {"retention_class": retention_class}},
+             *_expires_after("timestamp", AUDIT_RETENTION_DAYS[retention_class])],
+        )
+        stamped += result.modified_count
+        print(f"✓ audit_logs: {result.modified_count} entries marked {retention_class}")
+    return stamped
+
+
+async def migrate_audit_retention():
+    print("Starting audit/activity retention migration...")
+    db = await get_database()
+
+    users = await backfill_activity_counters(db)
+    print(f"✓ Backfilled activity counters for {users} users")
+
+    await stamp_audit_logs(db)
+
+    result = await db.user_activity.update_many(
+        {"expires_at": {"$exists": False}},
+        _expires_after("created_at", USER_ACTIVITY_RETENTION_DAYS),
+    )
+    print(f"✓ user_activity: {result.modified_count} entries stamped")
+
+    await build_missing_indexes(db, RETENTION_INDEXES)
+    print("✓ TTL indexes created")
+    print("\nMigration completed! Expired entries are removed by MongoDB's TTL monitor.")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_audit_retention())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Migration script that converts mini-game timestamps stored as ISO strings
+into native BSON dates, merges duplicate per-user game statistics and
+creates the mini-game indexes (including the unique user_game_stats index
+the duplicates would block). Only documents that still hold a string or
+are duplicates are touched, so it is safe to run more than once.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to import backend modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+
+from backend.database import get_database
+from backend.services.index_registry import build_missing_indexes
+from backend.services.mini_game_data import (
+    DATE_FIELDS, GAME_INDEXES, merge_duplicate_game_stats, parse_legacy_date
+)
+
+BATCH_SIZE = 1000
+
+
+async def convert_collection(db, collection: str, fields) -> int:
+    string_dates = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    converted = 0
+    updates = []
+    async for doc in db[collection].find(string_dates, projection):
+        changes = {field: parse_legacy_date(doc[field]) for field in fields if isinstance(doc.get(field), str)}
+        updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+        if len(updates) >= BATCH_SIZE:
+            converted += (await db[collection].bulk_write(updates, ordered=False)).modified_count
+            updates = []
+    if updates:
+        converted += (await db[collection].bulk_write(updates, ordered=False)).modified_count
+    return converted
+
+
+async def migrate_mini_game_dates():
+    print("Converting mini-game timestamps to native dates...")
+    db = await get_database()
+
+    for collection, fields in DATE_FIELDS.items():
+        converted = await convert_collection(db, collection, fields)
+        print(f"✓ {collection}: {converted} documents converted")
+
+    removed = await merge_duplicate_game_stats(db)
+    print(f"✓ user_game_stats: {removed} duplicate rows merged")
+
+    await build_missing_indexes(db, GAME_INDEXES)
+    print("✓ Mini-game indexes created")
+    print("\nMigration completed!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate_mini_game_dates())
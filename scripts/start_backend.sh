@@ -52,6 +52,10 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+# Build any missing database indexes (workers only verify them at startup)
+echo "Checking database indexes..."
+python3 scripts/ensure_indexes.py || echo "Warning: index build failed, continuing"
+
 # Initialize admin user if needed
 echo "Checking admin initialization..."
 curl -s -X POST http://localhost:8000/api/admin/initialize-admin || true